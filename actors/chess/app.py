@@ -5,7 +5,7 @@ import toml  # type: ignore
 
 import actors.chess.workers.map
 import actors.chess.workers.source
-from models.actor import Actor
+from models.actor import Actor, options as actor_options
 
 
 @dataclass
@@ -38,6 +38,7 @@ class App:
             ),
             topic=toml_kafka["topic"],
             group=toml_kafka["group"],
+            **actor_options(self._toml_dict, "source"),
         )
 
         struct.actors["source"] = actor_source
@@ -47,6 +48,7 @@ class App:
             handler=actors.chess.workers.map.WorkerMap(
                 app_name=self._app_name,
             ),
+            **actor_options(self._toml_dict, "map"),
         )
 
         struct.actors["map"] = actor_map
@@ -59,9 +61,9 @@ class App:
             actor_src = struct.actors[actor_src_name]
 
             for actor_dst_name in actor_dst_names:
-                # set actor src output queue == actor dst input queue
+                # add actor dst input queue to actor src output queues, messages are fanned out to each dst
                 actor_dst = struct.actors[actor_dst_name]
-                actor_src.output = actor_dst.queue
+                actor_src.output_add(actor_dst.queue)
 
         # schedule actors
 
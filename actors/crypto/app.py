@@ -4,7 +4,7 @@ from dataclasses import dataclass
 import toml  # type: ignore
 
 import actors.crypto.workers.source
-from models.actor import Actor
+from models.actor import Actor, options as actor_options
 
 
 @dataclass
@@ -37,6 +37,7 @@ class App:
             ),
             topic=toml_kafka["topic"],
             group=toml_kafka["group"],
+            **actor_options(self._toml_dict, "source"),
         )
 
         struct.actors["source"] = actor_source
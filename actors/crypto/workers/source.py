@@ -5,8 +5,7 @@ import typing
 from dataclasses import dataclass
 
 import models
-import services.crypto.symmetric
-import services.crypto.symmetric.aesgcm
+import services.crypto.symmetric.key_store
 
 
 @dataclass
@@ -56,20 +55,14 @@ class WorkerSource:
 
         self._logger.info(f"actor '{actor.name}' from '{user_from}'")
 
-        struct_factory = services.crypto.symmetric.Factory(
-            toml_file=self._keys_file,
+        # ciphers are cached per user by the key store
+        struct_decrypt = services.crypto.symmetric.key_store.get(self._keys_file).decrypt(
             user_id=user_from,
-        ).call()
-
-        cipher_name_ = services.crypto.symmetric.cipher_name(struct_factory.cipher)
-
-        if cipher_name_ == "aesgcm":
-            struct_decrypt = services.crypto.symmetric.aesgcm.Decrypt(
-                cipher=struct_factory.cipher,
-                encoded=message_dict["encoded"],
-                nonce=message_dict["nonce"],
-            ).call()
-        else:
-            raise ValueError("invalid cipher")
+            encoded=message_dict["encoded"],
+            nonce=message_dict["nonce"],
+        )
+
+        if struct_decrypt.code != 0:
+            raise ValueError(f"decrypt error {struct_decrypt.errors}")
 
         return struct_decrypt.decoded
@@ -47,11 +47,5 @@ class WorkerSource:
         return message_object
 
     def _deliver(self, actor: Actor, message_object: dict) -> int:
-        if actor.output is None:
-            # nothing to do
-            return 0
-
-        # add message to actor output queue
-        actor.output.put_nowait(message_object)
-
-        return 0
+        # add message to actor output queue, blocks while output queue is full
+        return actor.deliver(message_object)
@@ -7,6 +7,7 @@ import typer
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 import dot_init  # noqa: E402, F401
+import kafka.producer  # noqa: E402
 import log  # noqa: E402
 import services.boot  # noqa: E402
 import services.cities  # noqa: E402
@@ -56,7 +57,10 @@ def _db_publish(entity_ids: set[str]):
                 entity_ids=[entity_id],
             ).call()
 
-    logger.info("[db-cli] publish completed")
+    # wait for enqueued messages to be delivered
+    messages_pending = kafka.producer.flush()
+
+    logger.info(f"[db-cli] publish completed, undelivered {messages_pending}")
 
 
 if __name__ == "__main__":
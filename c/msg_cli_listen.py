@@ -14,6 +14,7 @@ import kafka  # noqa: E402
 import log  # noqa: E402
 import services.database.session  # noqa: E402
 import services.entities  # noqa: E402
+import services.graph.session  # noqa: E402
 import services.kafka.topics  # noqa: E402
 import services.kafka.workers  # noqa: E402
 
@@ -29,13 +30,16 @@ app = typer.Typer()
 
 
 @app.command()
-def graph():
+def graph(
+    batch_size: int = typer.Option(100, "--batch-size", help="max graph sync messages per batch"),
+    batch_linger: float = typer.Option(0.05, "--batch-linger", help="seconds to wait for a graph sync batch to fill"),
+):
     """listen on graph sync topics"""
     uvloop.install()
-    asyncio.run(graph_async())
+    asyncio.run(graph_async(batch_size=batch_size, batch_linger=batch_linger))
 
 
-async def graph_async():
+async def graph_async(batch_size: int, batch_linger: float):
     workers = []
 
     workers.append(
@@ -43,6 +47,8 @@ async def graph_async():
             topic=services.kafka.topics.TOPIC_GRAPH_SYNC,
             group="group-1",
             handler=services.kafka.workers.GraphHandler(),
+            batch_size=batch_size,
+            batch_linger=batch_linger,
         ).call()
     )
 
@@ -56,4 +62,8 @@ async def graph_async():
 
     tasks = [s.task for s in workers]
 
-    await asyncio.gather(*tasks)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # close pooled graph drivers
+        services.graph.session.close_all()
@@ -50,7 +50,10 @@ def change(
 
     message = models.Entity.message_cls(id=entity.entity_id, message="entity.changed")
 
-    services.entities.Publish(message=message, topic=topic_name).call()
+    struct_publish = services.entities.Publish(message=message, topic=topic_name).call()
+
+    # wait for message delivery
+    struct_publish.future.result(timeout=kafka.producer.FLUSH_TIMEOUT)  # type: ignore
 
     logger.info("[db-cli] publish completed")
 
@@ -72,6 +75,9 @@ def error(
 
     message = models.Entity.message_cls(id=entity.entity_id, message="entity.422")
 
-    services.entities.Publish(message=message, topic=topic_name).call()
+    struct_publish = services.entities.Publish(message=message, topic=topic_name).call()
+
+    # wait for message delivery
+    struct_publish.future.result(timeout=kafka.producer.FLUSH_TIMEOUT)  # type: ignore
 
     logger.info("[db-cli] publish completed")
@@ -1,23 +1,31 @@
 import os
+import re
 import sys
 import time
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 import bytewax  # noqa: E402
+import bytewax.dataflow  # noqa: E402
 import bytewax.inputs  # noqa: E402
+import bytewax.outputs  # noqa: E402
 import typer  # noqa: E402
 
 import dot_init  # noqa: E402, F401
 import log  # noqa: E402
 import services.boot  # noqa: E402
 import services.database  # noqa: E402
+import services.data_mappings  # noqa: E402
+import services.data_models  # noqa: E402
 import services.database.session  # noqa: E402
+import services.entities  # noqa: E402
 import services.entities.input  # noqa: E402
 import services.entities.operators  # noqa: E402
+import services.graph.operators  # noqa: E402
 import services.graph.session  # noqa: E402
 import services.timely.flows  # noqa: E402
 import services.timely.inputs  # noqa: E402
+import services.timely.library.cluster  # noqa: E402
 
 logger = log.init("cli")
 
@@ -112,6 +120,68 @@ def json():
     logger.info(f"{__name__} duration {time_end - time_start} seconds")
 
 
+@app.command()
+def cluster(
+    file: str = typer.Option(..., "--file", help="csv, json or jsonl file"),
+    mapping: str = typer.Option("", "--mapping", help="csv data mapping object name"),
+    workers: int = typer.Option(1, "--workers", help="worker threads per process"),
+    procs: int = typer.Option(1, "--procs", help="processes spawned on this host"),
+    addresses: str = typer.Option("", "--addresses", help="comma separated host:port of each cluster process"),
+    proc_id: int = typer.Option(0, "--proc-id", help="cluster process index in addresses"),
+    recovery_dir: str = typer.Option("", "--recovery-dir", help="recovery store directory, resume import after a crash"),
+    epoch_interval: float = typer.Option(10.0, "--epoch-interval", help="seconds between recovery snapshots"),
+):
+    """
+    import entities with a multi worker dataflow, each worker reads its own part of the input file and entities are
+    exchanged by key so the same entity is always synced by the same worker
+
+    with a recovery dir, progress is saved every epoch interval and running the same command again after a crash
+    resumes the import from the last snapshot; use a new recovery dir for each import
+    """
+    time_start = time.monotonic()
+
+    flow = bytewax.dataflow.Dataflow()
+    output = bytewax.outputs.ManualOutputConfig(_output_builder)
+
+    if re.search(r"\.csv$", file):
+        with services.database.session.get() as db:
+            data_mapping = services.data_mappings.List(db=db, query=f"obj_name:{mapping}", offset=0, limit=1).call().objects[0]
+
+            data_models = services.data_models.List(
+                db=db,
+                query=f"obj_name:{data_mapping.model_name}",
+                offset=0,
+                limit=1024,
+            ).call().objects
+
+        input = bytewax.inputs.ManualInputConfig(services.timely.inputs.input_csv(file=file))
+
+        flow.input("input", input)
+
+        services.timely.flows.StreamCsv(input=input, output=output, data_mapping=data_mapping, data_models=data_models).steps(flow)
+    else:
+        flow.input("input", bytewax.inputs.ManualInputConfig(services.timely.inputs.input_json(file=file)))
+
+        services.timely.flows.stream_json_steps(flow)
+
+    services.timely.flows.EntityDbSync(input=[]).steps(flow)
+    services.timely.flows.EntityGraphSync(input=[]).steps(flow)
+
+    flow.capture(output)
+
+    services.timely.library.cluster.run(
+        flow,
+        workers=workers,
+        procs=procs,
+        addresses=[address for address in addresses.split(",") if address],
+        proc_id=proc_id,
+        recovery_config=services.timely.library.cluster.recovery(dir=recovery_dir) if recovery_dir else None,
+        epoch_interval=epoch_interval,
+    )
+
+    logger.info(f"{__name__} duration {time.monotonic() - time_start} seconds")
+
+
 @app.command()
 def random(count: int = typer.Option(..., "--count")):
     with services.database.session.get() as db, services.graph.session.get() as neo:
@@ -178,5 +248,68 @@ def random_new(count: int = typer.Option(..., "--count")):
     logger.info(f"{__name__} duration {time_end - time_start} seconds")
 
 
+@app.command()
+def bulk(batch_size: int = typer.Option(1000, "--batch-size")):
+    """initial load, entities are created with version 0 using the bulk create path and synced to the graph in batches"""
+    with services.database.session.get() as db, services.graph.session.get() as neo:
+        services.boot.reset(db=db, neo=neo)
+
+        time_start = time.monotonic()
+
+        struct_dms = services.data_models.Hash(db=db, query="").call()
+
+        struct_create = services.entities.CreateBulk(
+            db=db,
+            entities=_entities_stream(data_models=struct_dms.object),
+            batch_size=batch_size,
+        ).call()
+
+        struct_graph = services.graph.operators.GraphSyncBulk(
+            db=db,
+            neo=neo,
+            entity_ids=sorted(struct_create.entity_ids),
+            batch_size=batch_size,
+        ).call()
+
+        time_end = time.monotonic()
+
+        logger.info(
+            f"{__name__} bulk code {struct_create.code} entities {struct_create.entity_count} rows {struct_create.count} "
+            f"conflicts {struct_create.conflicts} locations {len(struct_create.location_ids)}"
+        )
+
+        logger.info(
+            f"{__name__} bulk graph code {struct_graph.code} nodes created {struct_graph.nodes_created} "
+            f"edges created {struct_graph.edges_created}"
+        )
+
+    logger.info(f"{__name__} duration {time_end - time_start} seconds")
+
+
+def _output_builder(worker_index: int, worker_count: int):
+    def output_handler(item: dict):
+        logger.info(f"{__name__} worker {worker_index} graph sync item {item}")
+
+    return output_handler
+
+
+def _entities_stream(data_models: dict):
+    """normalize json objects into entity rows, with fingerprint set per object"""
+    for _, object in services.entities.input.stream_json(file=file_path):
+        entities = services.entities.Normalize(
+            object=object,
+            properties=object["properties"],
+            data_models=data_models,
+        ).call().entities
+
+        fingerprint = services.entities.fingerprint_entities(entities=entities)
+
+        for entity in entities:
+            entity.fingerprint = fingerprint
+            entity.version = 0
+
+            yield entity
+
+
 if __name__ == "__main__":
     app()
@@ -39,8 +39,8 @@ class Query:
         ).call()  # type: ignore
 
     @strawberry.field
-    def nodes_list(self, info: Info, query: str = "", offset: int = 0, limit: int = 10) -> gql.types.GqlNodesList:
-        logger.info(f"{context.rid_get()} gql.{info.field_name} query {query}")
+    def nodes_list(self, info: Info, query: str = "", offset: int = 0, limit: int = 10, cursor: str = "") -> gql.types.GqlNodesList:
+        logger.info(f"{context.rid_get()} gql.{info.field_name} query {query} cursor {cursor}")
 
         with services.graph.session.get() as neo:
             return services.nodes.List(
@@ -49,6 +49,9 @@ class Query:
                 query=query,
                 offset=offset,
                 limit=limit,
+                cursor=cursor,
+                session_factory=services.graph.session.get,
+                cache=True,
             ).call()  # type: ignore
 
     @strawberry.field
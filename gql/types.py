@@ -74,6 +74,12 @@ class GqlEdge:
     tgt_nid: str
 
 
+@strawberry.type
+class GqlPageInfo:
+    end_cursor: typing.Optional[str]
+    has_next_page: bool
+
+
 @strawberry.type
 class GqlNodesList:
     code: int
@@ -84,6 +90,7 @@ class GqlNodesList:
     nodes_count: int
     edges: list[GqlEdge]
     edges_count: int
+    page_info: GqlPageInfo
 
 
 @strawberry.type
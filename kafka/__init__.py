@@ -1,5 +1,6 @@
 from .consumer import consumer  # noqa: F401
-from .handler import Handler  # noqa: F401
+from .handler import BatchHandler, Handler  # noqa: F401
+from .producer import Producer  # noqa: F401
 from .reader import Reader  # noqa: F401
 from .scheduler import Scheduler  # noqa: F401
 from .service_check import service_check  # noqa: F401
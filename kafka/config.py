@@ -13,7 +13,11 @@ def config_reader(group_id: str) -> dict:
 
 
 def config_writer() -> dict:
+    """producer config, messages are batched for up to linger ms or batch size bytes and compressed per batch"""
     return {
+        "batch.size": int(os.environ.get("KAFKA_BATCH_SIZE", 65536)),
         "bootstrap.servers": os.environ.get("KAFKA_BROKERS"),
         "client.id": socket.gethostname(),
+        "compression.type": os.environ.get("KAFKA_COMPRESSION", "lz4"),
+        "linger.ms": int(os.environ.get("KAFKA_LINGER_MS", 5)),
     }
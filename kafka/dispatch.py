@@ -0,0 +1,174 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import functools
+import inspect
+import time
+import typing
+
+EXECUTOR_LOOP = "loop"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+
+EXECUTORS = [EXECUTOR_LOOP, EXECUTOR_PROCESS, EXECUTOR_THREAD]
+
+ORDERING_KEY = "key"
+ORDERING_PARTITION = "partition"
+
+
+@dataclasses.dataclass
+class ActorRef:
+    """
+    picklable actor passed to handlers running in a process pool
+
+    messages delivered by the handler are collected and returned to the parent process, which delivers them to the
+    actor output queues once the handler returns
+    """
+
+    name: str
+    delivered: list[typing.Any] = dataclasses.field(default_factory=list)
+
+    def deliver(self, message: typing.Any) -> int:
+        self.delivered.append(message)
+        return 0
+
+
+class Dispatch:
+    """
+    Call handler to process a message.
+
+    Async handlers are awaited on the event loop. Sync handlers are run on a thread pool by default, so they can not
+    stall the event loop, or on a process pool for cpu bound handlers. Process pool handlers must be picklable and are
+    passed an ActorRef instead of the actor, messages the handler delivers to the ActorRef are delivered to the actor
+    when the handler returns.
+
+    Handlers with a 'call_batch' method can also be called with a list of messages, see kafka.BatchHandler.
+
+    Handler latency and errors, exceptions or a non zero result code, are recorded in metrics if specified.
+    """
+
+    def __init__(self, handler: typing.Any, executor: typing.Optional[str] = None, workers: int = 1, metrics: typing.Any = None):
+        self._handler = handler
+        self._workers = max(workers, 1)
+        self._metrics = metrics
+
+        self._handler_async = inspect.iscoroutinefunction(self._handler.call)
+
+        # handlers implementing kafka.Handler are called with msg only, actor handlers are also passed the actor
+        self._handler_actor = "actor" in inspect.signature(self._handler.call).parameters
+
+        self._handler_batch = callable(getattr(self._handler, "call_batch", None))
+
+        if executor is None:
+            executor = EXECUTOR_LOOP if self._handler_async else EXECUTOR_THREAD
+
+        if executor not in EXECUTORS:
+            raise ValueError(f"invalid executor '{executor}'")
+
+        if self._handler_async and executor != EXECUTOR_LOOP:
+            raise ValueError("async handlers must use executor 'loop'")
+
+        if self._handler_batch and inspect.iscoroutinefunction(self._handler.call_batch) and executor != EXECUTOR_LOOP:
+            raise ValueError("async batch handlers must use executor 'loop'")
+
+        self._executor = executor
+        self._pool: typing.Optional[concurrent.futures.Executor] = None
+
+    @property
+    def batch(self) -> bool:
+        """handler can process message batches"""
+        return self._handler_batch
+
+    @property
+    def executor(self) -> str:
+        return self._executor
+
+    async def call(self, actor: typing.Any, msg: typing.Any) -> typing.Any:
+        if self._metrics is None:
+            return await self._call(actor, msg)
+
+        t_start = time.monotonic()
+        error = True
+
+        try:
+            result = await self._call(actor, msg)
+            error = getattr(result, "code", 0) != 0
+            return result
+        finally:
+            self._metrics.process(msec=(time.monotonic() - t_start) * 1000, error=error)
+
+    async def call_batch(self, actor: typing.Any, msgs: list[typing.Any]) -> typing.Any:
+        """call handler to process a list of messages, metrics record the batch latency for each message"""
+        if not self._handler_batch:
+            raise ValueError("handler does not support batches")
+
+        if self._metrics is None:
+            return await self._call(actor, msgs, method="call_batch")
+
+        t_start = time.monotonic()
+        error = True
+
+        try:
+            result = await self._call(actor, msgs, method="call_batch")
+            error = getattr(result, "code", 0) != 0
+            return result
+        finally:
+            self._metrics.process(msec=(time.monotonic() - t_start) * 1000, error=error, count=len(msgs))
+
+    def close(self, wait: bool = True) -> int:
+        """shutdown pool, pending calls are cancelled; with wait, blocks until running calls are done"""
+        if self._pool:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+        return 0
+
+    async def _call(self, actor: typing.Any, msg: typing.Any, method: str = "call") -> typing.Any:
+        if self._executor == EXECUTOR_PROCESS:
+            if isinstance(msg, list):
+                # kafka messages are not picklable
+                msg = [msg_.detach() if hasattr(msg_, "detach") else msg_ for msg_ in msg]
+            elif hasattr(msg, "detach"):
+                # kafka messages are not picklable
+                msg = msg.detach()
+
+        args = (actor, msg) if self._handler_actor else (msg,)
+
+        if self._executor == EXECUTOR_LOOP:
+            result = getattr(self._handler, method)(*args)
+
+            if inspect.isawaitable(result):
+                result = await result
+
+            return result
+
+        if self._executor == EXECUTOR_PROCESS and self._handler_actor:
+            func = functools.partial(_handler_call_ref, self._handler, method, ActorRef(name=actor.name), msg)
+
+            result, delivered = await asyncio.get_running_loop().run_in_executor(self._pool_get(), func)
+
+            for message in delivered:
+                await actor.deliver_async(message)
+
+            return result
+
+        func = functools.partial(_handler_call, self._handler, method, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool_get(), func)
+
+    def _pool_get(self) -> concurrent.futures.Executor:
+        if self._pool is None:
+            if self._executor == EXECUTOR_PROCESS:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="actor")
+
+        return self._pool
+
+
+def _handler_call(handler: typing.Any, method: str, *args: typing.Any) -> typing.Any:
+    return getattr(handler, method)(*args)
+
+
+def _handler_call_ref(handler: typing.Any, method: str, actor: ActorRef, msg: typing.Any) -> tuple[typing.Any, list[typing.Any]]:
+    return getattr(handler, method)(actor, msg), actor.delivered
@@ -5,3 +5,10 @@ class Handler(typing.Protocol):
     # circular import error when using models.KafkaMessage, so use typing.Any as temporary fix
     async def call(self, msg: typing.Any) -> typing.Any:
         """process message"""
+
+
+class BatchHandler(Handler, typing.Protocol):
+    """handler that can also process a batch of messages, readers call batch handlers with message batches"""
+
+    async def call_batch(self, msgs: list[typing.Any]) -> typing.Any:
+        """process list of messages, in order, the result code applies to every message"""
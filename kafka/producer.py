@@ -0,0 +1,135 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+import typing
+
+import confluent_kafka
+
+import kafka.config
+import log
+
+POLL_INTERVAL: float = 0.1  # seconds, delivery report poll interval
+FLUSH_TIMEOUT: float = 10.0  # seconds
+
+logger = log.init("app")
+
+
+class Producer:
+    """
+    Long lived kafka producer.
+
+    Messages are enqueued with produce and batched by librdkafka according to the linger, batch size and compression
+    settings in config_writer. Delivery reports are served by a background poll thread and surfaced as futures, which
+    resolve to the delivered confluent_kafka.Message or fail with a confluent_kafka.KafkaException.
+    """
+
+    def __init__(self, config: typing.Optional[dict] = None):
+        self._producer = confluent_kafka.Producer(config or kafka.config.config_writer())
+
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._poll, name="kafka-producer-poll", daemon=True)
+        self._thread.start()
+
+    def produce(self, topic: str, key: typing.Optional[str], value: typing.Union[bytes, str]) -> concurrent.futures.Future:
+        """enqueue message, returns future resolved by its delivery report"""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def _delivered(error, message) -> None:
+            if error:
+                future.set_exception(confluent_kafka.KafkaException(error))
+            else:
+                future.set_result(message)
+
+        while True:
+            try:
+                self._producer.produce(topic, key=key, value=value, on_delivery=_delivered)
+                break
+            except BufferError:
+                # local queue is full, wait for in flight messages to be delivered
+                self._producer.poll(POLL_INTERVAL)
+
+        return future
+
+    def produce_async(self, topic: str, key: typing.Optional[str], value: typing.Union[bytes, str]) -> asyncio.Future:
+        """enqueue message, returns awaitable resolved by its delivery report"""
+        return asyncio.wrap_future(self.produce(topic=topic, key=key, value=value))
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> int:
+        """wait for enqueued messages to be delivered, returns number of messages still enqueued"""
+        return self._producer.flush(timeout)
+
+    def close(self, timeout: float = FLUSH_TIMEOUT) -> int:
+        """flush enqueued messages and stop poll thread, returns number of messages not delivered"""
+        pending = self.flush(timeout=timeout)
+
+        self._closed.set()
+        self._thread.join()
+
+        return pending
+
+    def __len__(self) -> int:
+        return len(self._producer)
+
+    def _poll(self) -> None:
+        while not self._closed.is_set():
+            try:
+                self._producer.poll(POLL_INTERVAL)
+            except Exception as e:
+                logger.error(f"{__name__} poll exception {e}")
+
+
+# process-wide producer, producers are thread safe and not shared across forked processes
+_producer: typing.Optional[Producer] = None
+_producer_lock = threading.Lock()
+_producer_pid: int = os.getpid()
+
+
+def get() -> Producer:
+    """get shared producer, creating it on first use"""
+    global _producer, _producer_pid
+
+    if _producer_pid != os.getpid():
+        # forked process, drop producer inherited from parent process
+        with _producer_lock:
+            _producer = None
+            _producer_pid = os.getpid()
+
+    if producer := _producer:
+        return producer
+
+    with _producer_lock:
+        if _producer is None:
+            _producer = Producer()
+
+        return _producer
+
+
+def flush(timeout: float = FLUSH_TIMEOUT) -> int:
+    """flush shared producer, returns number of messages still enqueued"""
+    if _producer is None or _producer_pid != os.getpid():
+        return 0
+
+    return _producer.flush(timeout=timeout)
+
+
+def close(timeout: float = FLUSH_TIMEOUT) -> int:
+    """flush and close shared producer, returns number of messages not delivered"""
+    global _producer
+
+    with _producer_lock:
+        producer, _producer = _producer, None
+
+    if producer is None or _producer_pid != os.getpid():
+        return 0
+
+    pending = producer.close(timeout=timeout)
+
+    if pending:
+        logger.error(f"{__name__} close messages undelivered {pending}")
+
+    return pending
+
+
+atexit.register(close)
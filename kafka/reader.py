@@ -1,13 +1,24 @@
 import asyncio
 import dataclasses
 import sys
+import threading
+import time
+import typing
+import zlib
 
 import confluent_kafka
 
 import kafka.config
+import kafka.dispatch
 import log
 import models
 
+BATCH_LINGER: float = 0.0  # seconds a batch handler worker waits for a batch to fill
+BATCH_SIZE: int = 100  # max messages per consume call, and per batch handler call
+COMMIT_INTERVAL: float = 1.0  # seconds between batched offset commits
+CONCURRENCY: int = 1  # worker tasks, max messages in flight
+QUEUE_SIZE: int = 1000  # max messages buffered between poll thread and handlers
+
 
 @dataclasses.dataclass
 class Struct:
@@ -16,12 +27,46 @@ class Struct:
 
 
 class Reader:
-    """reader class to consume kafka messages and call handler to process each message"""
+    """
+    reader class to consume kafka messages and call handler to process each message
+
+    Messages are consumed in batches by a dedicated poll thread and handed to the event loop through a bounded queue.
+    Messages are fanned out to concurrency worker tasks keyed by partition, or by message key, so messages with the
+    same partition or key are processed in order. Sync handlers are dispatched to a thread or process pool.
+
+    Batch handlers, see kafka.BatchHandler, are called with up to batch size messages from a worker queue, each worker
+    waits up to batch linger seconds for its batch to fill.
+
+    Offsets are committed asynchronously by the poll thread every commit interval, up to the first message of each
+    partition still being processed.
+    """
 
-    def __init__(self, topic: str, group: str, handler: kafka.Handler):
+    def __init__(
+        self,
+        topic: str,
+        group: str,
+        handler: kafka.Handler,
+        concurrency: int = CONCURRENCY,
+        batch_size: int = BATCH_SIZE,
+        batch_linger: float = BATCH_LINGER,
+        commit_interval: float = COMMIT_INTERVAL,
+        queue_size: int = QUEUE_SIZE,
+        ordering: str = kafka.dispatch.ORDERING_PARTITION,
+        executor: typing.Optional[str] = None,
+        actor: typing.Any = None,
+        metrics: typing.Any = None,
+    ):
         self._topic = topic
         self._group = group
         self._handler = handler
+        self._concurrency = max(concurrency, 1)
+        self._ordering = ordering
+        self._actor = actor
+        self._metrics = metrics
+        self._batch_size = max(batch_size, 1)
+        self._batch_linger = batch_linger
+        self._commit_interval = commit_interval
+        self._queue_size = queue_size
 
         self._consumer = confluent_kafka.Consumer(
             kafka.config.config_reader(group_id=self._group)
@@ -30,48 +75,63 @@ class Reader:
         self._topics = [self._topic]
         self._logger = log.init("service")
 
+        if self._ordering not in [kafka.dispatch.ORDERING_KEY, kafka.dispatch.ORDERING_PARTITION]:
+            raise ValueError(f"invalid ordering '{self._ordering}'")
+
+        self._dispatch = kafka.dispatch.Dispatch(handler=self._handler, executor=executor, workers=self._concurrency, metrics=self._metrics)
+
+        self._inflight: dict[tuple[str, int], set[int]] = {}  # [topic, partition] => offsets being processed
+        self._acked: dict[tuple[str, int], int] = {}  # [topic, partition] => next offset after last handled message
+        self._offsets: dict[tuple[str, int], int] = {}  # [topic, partition] => next offset to commit
+        self._offsets_lock = threading.Lock()
+        self._shutdown = threading.Event()
+
     async def call(self):
         struct = Struct(0, [])
 
         self._task = asyncio.current_task()
         self._log_subject = f"actor '{self._task.get_name()}' {__name__}"
 
-        # create default actor used for callback during message processing
-        self._actor = models.Actor(name=self._task.get_name(), handler=self)
+        if self._actor is None:
+            # create default actor used for callback during message processing
+            self._actor = models.Actor(name=self._task.get_name(), handler=self)
 
         self._logger.info(f"{self._log_subject} listening topics {self._topics}")
 
+        loop = asyncio.get_running_loop()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        queues = [asyncio.Queue(maxsize=self._queue_size) for _ in range(self._concurrency)]
+        worker_process = self._worker_process_batch if self._dispatch.batch else self._worker_process
+
+        workers = [
+            asyncio.create_task(worker_process(queue_worker), name=f"{self._task.get_name()}-{index}")
+            for index, queue_worker in enumerate(queues)
+        ]
+
+        poller = threading.Thread(target=self._poll, args=(loop, queue), name=f"kafka-poll-{self._topic}", daemon=True)
+
         try:
-            self._consumer.subscribe(self._topics)
+            self._consumer.subscribe(self._topics, on_revoke=self._on_revoke)
+
+            poller.start()
 
             while True:
-                msg = self._consumer.poll(timeout=self._timeout)
+                msg = await queue.get()
 
-                if msg is None:
-                    await self._asyncio_yield()
-                    continue
+                if isinstance(msg, BaseException):
+                    raise msg
 
-                if msg.error():
-                    # whoops, some type of read error
-                    if msg.error().code() == confluent_kafka.KafkaError._PARTITION_EOF:
-                        self._logger.info(f"{self._log_subject} partition eof")
-                        # todo:
-                        continue
-                    elif msg.error():
-                        raise confluent_kafka.KafkaException(msg.error())
+                if self._metrics:
+                    self._metrics.receive()
 
-                # call handler to process message
-                struct_handler = self._handler.call(
-                    actor=self._actor,
-                    msg=models.KafkaMessage(msg),
-                )
+                key = (msg.topic(), msg.partition())
 
-                # check return code and ack
-                if struct_handler.code == 0:
-                    self._logger.info(f"{self._log_subject} ack")
-                    self._consumer.commit(asynchronous=False)
+                with self._offsets_lock:
+                    self._inflight.setdefault(key, set()).add(msg.offset())
 
-                await self._asyncio_yield()
+                # route message to its worker, blocks when worker queue is full
+                await queues[self._worker_index(msg)].put(msg)
         except confluent_kafka.KafkaException as e:
             self._logger.error(f"{self._log_subject} exception {e}")
         except asyncio.exceptions.CancelledError:
@@ -82,16 +142,171 @@ class Reader:
             self._logger.error(f"{self._log_subject} exception {sys.exc_info()[0]}")
             raise
         finally:
-            self._consumer.close()
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            self._dispatch.close(wait=False)
+
+            # poll thread commits handled offsets and closes consumer
+            self._shutdown.set()
+
+            if poller.is_alive():
+                await asyncio.to_thread(poller.join)
+            else:
+                self._consumer.close()
+
             self._logger.info(f"{self._log_subject} exiting")
 
         return struct
 
-    # play nicely with asyncio
-    async def _asyncio_yield(self, seconds: float = 0.1) -> int:
-        if self._task is None:
+    async def _worker_process(self, queue: asyncio.Queue) -> None:
+        """process worker messages in order"""
+        while True:
+            msg = await queue.get()
+
+            try:
+                struct_handler = await self._dispatch.call(self._actor, models.KafkaMessage(msg))
+            except Exception as e:
+                self._logger.error(f"{self._log_subject} handler exception {e}")
+                struct_handler = None
+
+            # check return code and ack
+            self._offset_done(msg, acked=bool(struct_handler and struct_handler.code == 0))
+
+            queue.task_done()
+
+    async def _worker_process_batch(self, queue: asyncio.Queue) -> None:
+        """process worker messages in order, in batches"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            msgs = [await queue.get()]
+
+            linger_at = loop.time() + self._batch_linger
+
+            while len(msgs) < self._batch_size:
+                if not queue.empty():
+                    msgs.append(queue.get_nowait())
+                    continue
+
+                timeout = linger_at - loop.time()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    msgs.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+                except TimeoutError:
+                    break
+
+            try:
+                struct_handler = await self._dispatch.call_batch(self._actor, [models.KafkaMessage(msg) for msg in msgs])
+            except Exception as e:
+                self._logger.error(f"{self._log_subject} handler exception {e}")
+                struct_handler = None
+
+            # check return code and ack batch
+            for msg in msgs:
+                self._offset_done(msg, acked=bool(struct_handler and struct_handler.code == 0))
+                queue.task_done()
+
+    def _offset_done(self, msg: confluent_kafka.Message, acked: bool) -> None:
+        """mark message as processed, commit offset is the first offset still in flight, if any, or the last acked offset"""
+        key = (msg.topic(), msg.partition())
+
+        with self._offsets_lock:
+            inflight = self._inflight.get(key, set())
+            inflight.discard(msg.offset())
+
+            if acked:
+                self._acked[key] = max(self._acked.get(key, 0), msg.offset() + 1)
+
+            if key not in self._acked:
+                return
+
+            offset = min(min(inflight), self._acked[key]) if inflight else self._acked[key]
+
+            if offset > self._offsets.get(key, -1):
+                self._offsets[key] = offset
+
+    def _worker_index(self, msg: confluent_kafka.Message) -> int:
+        if self._ordering == kafka.dispatch.ORDERING_KEY and msg.key() is not None:
+            return zlib.crc32(msg.key()) % self._concurrency
+
+        return msg.partition() % self._concurrency
+
+    def _poll(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue) -> None:
+        """poll thread, consume message batches and commit handled offsets"""
+        commit_at = time.monotonic() + self._commit_interval
+
+        try:
+            while not self._shutdown.is_set():
+                msgs = self._consumer.consume(num_messages=self._batch_size, timeout=self._timeout)
+
+                for msg in msgs:
+                    if msg.error():
+                        # whoops, some type of read error
+                        if msg.error().code() == confluent_kafka.KafkaError._PARTITION_EOF:
+                            self._logger.info(f"{self._log_subject} partition eof")
+                            continue
+
+                        raise confluent_kafka.KafkaException(msg.error())
+
+                    # blocks when queue is full, until handlers catch up
+                    if not self._queue_put(loop, queue, msg):
+                        return
+
+                if time.monotonic() >= commit_at:
+                    self._offsets_commit(asynchronous=True)
+                    commit_at = time.monotonic() + self._commit_interval
+        except Exception as e:
+            self._queue_put(loop, queue, e)
+        finally:
+            try:
+                self._offsets_commit(asynchronous=False)
+            finally:
+                self._consumer.close()
+
+    def _queue_put(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, item: typing.Any) -> bool:
+        """put item on event loop queue, returns False if reader is shutting down"""
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+
+        while not self._shutdown.is_set():
+            try:
+                future.result(timeout=self._timeout)
+                return True
+            except TimeoutError:
+                continue
+
+        future.cancel()
+
+        return False
+
+    def _offsets_commit(self, asynchronous: bool, partitions: typing.Optional[list] = None) -> int:
+        """commit handled offsets, returns number of partitions committed"""
+        with self._offsets_lock:
+            if partitions is None:
+                offsets, self._offsets = self._offsets, {}
+            else:
+                offsets = {key: self._offsets.pop(key) for key in partitions if key in self._offsets}
+
+        if not offsets:
             return 0
 
-        await asyncio.sleep(seconds)
+        self._consumer.commit(
+            offsets=[confluent_kafka.TopicPartition(topic, partition, offset) for (topic, partition), offset in offsets.items()],
+            asynchronous=asynchronous,
+        )
+
+        self._logger.info(f"{self._log_subject} ack partitions {len(offsets)}")
 
-        return 0
+        return len(offsets)
+
+    def _on_revoke(self, consumer: confluent_kafka.Consumer, partitions: list) -> None:
+        """commit handled offsets of revoked partitions before rebalance"""
+        try:
+            self._offsets_commit(asynchronous=False, partitions=[(p.topic, p.partition) for p in partitions])
+        except confluent_kafka.KafkaException as e:
+            self._logger.error(f"{self._log_subject} revoke commit exception {e}")
@@ -3,6 +3,8 @@ import dataclasses
 import typing
 
 import kafka
+import kafka.dispatch
+import kafka.reader
 import log
 
 
@@ -14,12 +16,37 @@ class Struct:
 
 
 class Scheduler:
-    def __init__(self, topic: str, group: str, handler: kafka.Handler):
+    """
+    schedule reader task, messages are processed by concurrency workers keyed by partition or message key
+
+    batch handlers are called with up to batch size messages, waiting up to batch linger seconds for a batch to fill
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        group: str,
+        handler: kafka.Handler,
+        concurrency: int = kafka.reader.CONCURRENCY,
+        ordering: str = kafka.dispatch.ORDERING_PARTITION,
+        executor: typing.Optional[str] = None,
+        batch_size: int = kafka.reader.BATCH_SIZE,
+        batch_linger: float = kafka.reader.BATCH_LINGER,
+    ):
         self._topic = topic
         self._group = group
         self._handler = handler
 
-        self._reader = kafka.Reader(self._topic, self._group, self._handler)
+        self._reader = kafka.Reader(
+            self._topic,
+            self._group,
+            self._handler,
+            concurrency=concurrency,
+            ordering=ordering,
+            executor=executor,
+            batch_size=batch_size,
+            batch_linger=batch_linger,
+        )
         self._logger = log.init("service")
 
     def call(self) -> Struct:
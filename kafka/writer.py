@@ -1,26 +1,33 @@
+import concurrent.futures
 import dataclasses
 import json
 import typing
 
-import confluent_kafka
-
-import kafka.config
+import kafka.producer
 
 
 @dataclasses.dataclass
 class Struct:
     code: int
+    future: typing.Optional[concurrent.futures.Future]  # resolved by message delivery report
     errors: list[str]
 
 
 class Writer:
-    def __init__(self, topic: str):
+    """
+    Write messages to a kafka topic using the shared process producer.
+
+    Messages are enqueued and batched by the producer, set flush to wait for delivery of each message.
+    """
+
+    def __init__(self, topic: str, flush: bool = False):
         self._topic = topic
+        self._flush = flush
 
-        self._producer = confluent_kafka.Producer(kafka.config.config_writer())
+        self._producer = kafka.producer.get()
 
-    def call(self, key: str, message: typing.Union[dict, str]):
-        struct = Struct(0, [])
+    def call(self, key: str, message: typing.Union[dict, str]) -> Struct:
+        struct = Struct(0, None, [])
 
         if type(message) is dict:
             value_str = json.dumps(message)
@@ -29,7 +36,9 @@ class Writer:
         else:
             raise ValueError("invalid message")
 
-        self._producer.produce(self._topic, key=key, value=value_str)
-        self._producer.flush()
+        struct.future = self._producer.produce(self._topic, key=key, value=value_str)
+
+        if self._flush:
+            self._producer.flush()
 
         return struct
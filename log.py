@@ -1,9 +1,20 @@
+import atexit
+import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
+import sys
+import threading
 
 import coloredlogs
 
-LOG_LEVEL: str = "DEBUG"
+LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "DEBUG")
+
+# log handler format and mode, override with LOG_FORMAT=color|json|text and LOG_ASYNC=1
+LOG_ASYNC: bool = os.environ.get("LOG_ASYNC", "0") in ["1", "true"]
+LOG_FORMAT: str = os.environ.get("LOG_FORMAT", "color")
 
 FORMAT: str = "%(asctime)s - %(name)s - %(message)s"
 # FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -91,11 +102,123 @@ logging_config = {
 }
 
 
-def init(name: str):
-    logging.config.dictConfig(logging_config)
+# loggers are configured once per process and cached by name
+_loggers: dict[str, logging.Logger] = {}
+_loggers_lock = threading.Lock()
+_configured: bool = False
+_queue_handler: logging.handlers.QueueHandler | None = None
+_queue_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """structured log formatter, one json object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        object = {
+            "time": self.formatTime(record),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            object["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(object)
+
+
+def init(name: str) -> logging.Logger:
+    if logger := _loggers.get(name):
+        return logger
 
-    logger = logging.getLogger(name)
+    with _loggers_lock:
+        if name in _loggers:
+            return _loggers[name]
 
-    coloredlogs.install(level="DEBUG", logger=logger, milliseconds=True, fmt=FORMAT)
+        _configure()
+
+        logger = logging.getLogger(name)
+
+        if LOG_ASYNC:
+            # log records are queued and written by the listener thread
+            logger.handlers = [_queue_handler]  # type: ignore
+        elif LOG_FORMAT == "json":
+            _handlers_format(logger=logger, formatter=JsonFormatter())
+        elif LOG_FORMAT == "text":
+            _handlers_format(logger=logger, formatter=logging.Formatter(FORMAT))
+        else:
+            coloredlogs.install(level=LOG_LEVEL, logger=logger, milliseconds=True, fmt=FORMAT)
+
+        _loggers[name] = logger
 
     return logger
+
+
+def shutdown() -> int:
+    """flush and stop async log listener"""
+    global _queue_listener
+
+    if _queue_listener:
+        _queue_listener.stop()
+        _queue_listener = None
+
+    return 0
+
+
+def _configure() -> int:
+    """configure logging once per process"""
+    global _configured, _queue_handler, _queue_listener
+
+    if _configured:
+        return 0
+
+    logging.config.dictConfig(logging_config)
+
+    if LOG_ASYNC:
+        handler = logging.StreamHandler()
+        handler.setFormatter(_formatter())
+
+        _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _queue_listener = logging.handlers.QueueListener(_queue_handler.queue, handler, respect_handler_level=True)
+        _queue_listener.start()
+
+        atexit.register(shutdown)
+        os.register_at_fork(after_in_child=_fork_child)
+
+    _configured = True
+
+    return 0
+
+
+def _fork_child() -> int:
+    """
+    re-create async log listener in a forked child, the listener thread is not copied by fork and the queue may hold
+    records or a lock of the parent; loggers keep the same queue handler, which gets a new queue
+    """
+    global _queue_listener
+
+    if not _queue_handler or not _queue_listener:
+        return 0
+
+    _queue_handler.queue = queue.SimpleQueue()
+    _queue_listener = logging.handlers.QueueListener(_queue_handler.queue, *_queue_listener.handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+    return 0
+
+
+def _formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+
+    if LOG_FORMAT == "text" or not sys.stderr.isatty():
+        return logging.Formatter(FORMAT)
+
+    return coloredlogs.ColoredFormatter(fmt=FORMAT)
+
+
+def _handlers_format(logger: logging.Logger, formatter: logging.Formatter) -> int:
+    for handler in logger.handlers:
+        handler.setFormatter(formatter)
+
+    return 0
@@ -16,11 +16,14 @@ import dot_init  # noqa: F401
 
 import context  # noqa: E402
 import gql  # noqa: E402
+import kafka.producer  # noqa: E402
 import log  # noqa: E402
 import models  # noqa: E402
 import routers
 import services.database.session  # noqa: E402
 import services.entities  # noqa: E402
+import services.graph.session  # noqa: E402
+import services.llm  # noqa: E402
 import services.openid
 import services.users  # noqa: E402
 import services.webauthn.auth
@@ -39,6 +42,21 @@ async def lifespan(app: fastapi.FastAPI):
 
     yield
 
+    # deliver enqueued kafka messages
+    messages_pending = kafka.producer.close()
+
+    logger.info(f"api.shutdown kafka messages undelivered {messages_pending}")
+
+    # close pooled graph drivers
+    drivers_closed = services.graph.session.close_all()
+
+    logger.info(f"api.shutdown graph drivers closed {drivers_closed}")
+
+    # unload llm models, waits for running generations
+    models_closed = services.llm.close_all()
+
+    logger.info(f"api.shutdown llm models closed {models_closed}")
+
 # create app object
 app = fastapi.FastAPI(lifespan=lifespan)
 
@@ -1,5 +1,6 @@
 from .actor import Actor  # noqa: F401
 from .actor_log import ActorLog  # noqa: F401
+from .actor_metrics import ActorMetrics  # noqa: F401
 from .actor_message import ActorMessage  # noqa: F401
 from .category import Category  # noqa: F401
 from .city import City  # noqa: F401
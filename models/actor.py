@@ -1,12 +1,49 @@
 import asyncio
 import sys
+import threading
 import typing
+import weakref
 
 import kafka
+import kafka.dispatch
 import log
 
+from .actor_metrics import ActorMetrics, Metrics
+
+QUEUE_SIZE: int = 1000  # default input queue bound, puts block when queue is full
+
+
+def options(toml_dict: dict, name: str) -> dict:
+    """
+    actor options for the named stage from the app toml 'actors' section, e.g.
+
+    [actors.map]
+    workers = 4
+    executor = "thread"
+    queue_size = 100
+    """
+    toml_actor = toml_dict.get("actors", {}).get(name, {})
+
+    return {key: toml_actor[key] for key in ["executor", "ordering", "queue_size", "workers"] if key in toml_actor}
+
+
+def metrics_all() -> list[Metrics]:
+    """metrics for each scheduled actor in this process"""
+    return [actor.metrics() for actor in list(_actors.values())]
+
 
 class Actor:
+    """
+    Actor reading messages from a kafka topic or an input queue, and calling its handler to process each message.
+
+    Messages are processed by worker tasks; kafka messages are keyed to workers by partition, or by message key, so
+    they are processed in order. Sync handlers are dispatched to a thread pool, or a process pool, so they do not
+    block the event loop.
+
+    Messages delivered by the handler are fanned out to every output queue; input queues are bounded, so a slow stage
+    applies backpressure to the stages delivering to it.
+    """
+
     def __init__(
         self,
         name: str,
@@ -15,15 +52,25 @@ class Actor:
         topic: str = None,
         group: str = None,
         output: asyncio.Queue = None,
+        workers: int = 1,
+        executor: typing.Optional[str] = None,
+        queue_size: int = QUEUE_SIZE,
+        ordering: str = kafka.dispatch.ORDERING_PARTITION,
     ):
         self._name = name
         self._handler = handler
         self._queue = queue
         self._topic = topic
         self._group = group
-        self._output = output
+        self._outputs: list[asyncio.Queue] = [output] if output is not None else []
+        self._workers = max(workers, 1)
+        self._executor = executor
+        self._ordering = ordering
+        self._queue_size = queue_size
 
         self._task: typing.Optional[asyncio.Task] = None
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._metrics = ActorMetrics()
 
         if self._handler is None:
             raise ValueError("handler missing")
@@ -33,7 +80,7 @@ class Actor:
 
         if self._topic is None and self._queue is None:
             # no topic, create default input queue
-            self._queue = asyncio.Queue(maxsize=0)
+            self._queue = asyncio.Queue(maxsize=queue_size)
 
         self._logger = log.init("actor")
 
@@ -41,6 +88,32 @@ class Actor:
         if self._task:
             self._task.cancel()
 
+    def deliver(self, message: typing.Any) -> int:
+        """
+        add message to actor output queues, blocks while an output queue is full
+
+        safe to call from handlers running in a thread pool, handlers running on the event loop must use deliver_async,
+        otherwise asyncio.QueueFull is raised when an output queue is full
+        """
+        if not self._outputs:
+            # nothing to do
+            return 0
+
+        if self._loop is None or threading.get_ident() == self._loop_thread:
+            for output in self._outputs:
+                output.put_nowait(message)
+        else:
+            asyncio.run_coroutine_threadsafe(self.deliver_async(message), self._loop).result()
+
+        return 0
+
+    async def deliver_async(self, message: typing.Any) -> int:
+        """add message to actor output queues, waits while an output queue is full"""
+        for output in self._outputs:
+            await output.put(message)
+
+        return 0
+
     @property
     def handler(self):
         return self._handler
@@ -49,13 +122,32 @@ class Actor:
     def name(self):
         return self._name
 
+    def metrics(self) -> Metrics:
+        return self._metrics.snapshot(
+            name=self._name,
+            queue_depth=self._queue.qsize() if self._queue else 0,
+            queue_size=self._queue.maxsize if self._queue else 0,
+            outputs_depth=[output.qsize() for output in self._outputs],
+        )
+
     @property
     def output(self):
-        return self._output
+        return self._outputs[0] if self._outputs else None
 
     @output.setter
     def output(self, o):
-        self._output = o
+        self._outputs = [o] if o is not None else []
+
+    def output_add(self, o: asyncio.Queue) -> int:
+        """add output queue, delivered messages are fanned out to all output queues"""
+        if o not in self._outputs:
+            self._outputs.append(o)
+
+        return 0
+
+    @property
+    def outputs(self) -> list[asyncio.Queue]:
+        return self._outputs
 
     @property
     def queue(self):
@@ -63,6 +155,11 @@ class Actor:
 
     # create and schedule actor task
     def schedule(self) -> int:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+        _actors[self._name] = self
+
         if self._topic:
             self._logger.info(f"actor '{self._name}' scheduling task kafka")
             self._task = asyncio.create_task(self._wait_kafka_queue(), name=self._name)
@@ -84,7 +181,17 @@ class Actor:
         self._logger.info(f"actor '{self._name}' running")
 
         try:
-            self._reader = kafka.Reader(self._topic, self._group, self._handler)
+            self._reader = kafka.Reader(
+                self._topic,
+                self._group,
+                self._handler,
+                concurrency=self._workers,
+                ordering=self._ordering,
+                executor=self._executor,
+                queue_size=self._queue_size,
+                actor=self,
+                metrics=self._metrics,
+            )
 
             # read from kafka stream
             await self._reader.call()
@@ -96,20 +203,45 @@ class Actor:
             self._logger.info(f"actor '{self._name}' exiting")
 
     async def _wait_task_queue(self):
-        self._logger.info(f"actor '{self._name}' running")
+        self._logger.info(f"actor '{self._name}' running workers {self._workers}")
 
-        try:
-            while True:
-                # block on queue until message is available
-                message = await self._queue.get()
+        dispatch = kafka.dispatch.Dispatch(handler=self._handler, executor=self._executor, workers=self._workers, metrics=self._metrics)
 
-                self._handler.call(actor=self, message=message)
+        workers = [
+            asyncio.create_task(self._wait_task_queue_worker(dispatch), name=f"{self._name}-{index}")
+            for index in range(self._workers)
+        ]
 
-                # ack message
-                self._queue.task_done()
+        try:
+            await asyncio.gather(*workers)
         except asyncio.exceptions.CancelledError:
             self._logger.error(f"actor '{self._name}' task cancelled exception")
         except KeyboardInterrupt:  # e.g. keyboard interrupt
             self._logger.error(f"actor '{self._name}' task exception {sys.exc_info()[0]}")
         finally:
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+            dispatch.close(wait=False)
+
             self._logger.info(f"actor '{self._name}' exiting")
+
+    async def _wait_task_queue_worker(self, dispatch: kafka.dispatch.Dispatch):
+        while True:
+            # block on queue until message is available
+            message = await self._queue.get()
+
+            self._metrics.receive()
+
+            try:
+                await dispatch.call(self, message)
+            except Exception as e:
+                self._logger.error(f"actor '{self._name}' exception {e}")
+
+            # ack message
+            self._queue.task_done()
+
+
+# scheduled actors by name, for runtime metrics
+_actors: weakref.WeakValueDictionary[str, Actor] = weakref.WeakValueDictionary()
@@ -1,16 +1,255 @@
+import atexit
+import datetime
+import glob
+import gzip
 import json
+import os
+import threading
+import typing
+
+FLUSH_BYTES: int = 64 * 1024  # buffered bytes before a write to the file
+FLUSH_INTERVAL: float = 1.0  # seconds between background flushes
+ROTATE_BYTES: int = 64 * 1024 * 1024  # file size before rotating to a new segment
 
 
 class ActorLog:
-    def __init__(self, app_name: str):
+    """
+    Append only actor json log.
+
+    By default each append opens, writes and closes the log file. In buffered mode, appends are written to a shared
+    per file writer, which keeps the file open, flushes when flush bytes are buffered and every flush interval from a
+    background thread, and rotates the file into timestamped segments by size and, optionally, by date. Rotated
+    segments are optionally gzip compressed.
+    """
+
+    def __init__(
+        self,
+        app_name: str,
+        buffered: bool = False,
+        flush_bytes: int = FLUSH_BYTES,
+        flush_interval: float = FLUSH_INTERVAL,
+        rotate_bytes: int = ROTATE_BYTES,
+        rotate_daily: bool = False,
+        compress: bool = False,
+    ):
         self._app_name = app_name
 
         self._file_name = f"logs/{self._app_name}-log.json"
 
+        self._writer: typing.Optional[_Writer] = None
+
+        if buffered:
+            self._writer = _writer_get(
+                file_name=self._file_name,
+                flush_bytes=flush_bytes,
+                flush_interval=flush_interval,
+                rotate_bytes=rotate_bytes,
+                rotate_daily=rotate_daily,
+                compress=compress,
+            )
+
     def append(self, message: dict) -> int:
+        if self._writer:
+            return self._writer.write(json.dumps(message) + "\n")
+
         # append to log file
         with open(self._file_name, "a") as f:
             f.write(json.dumps(message))
             f.write("\n")
 
         return 0
+
+    def flush(self) -> int:
+        if self._writer:
+            return self._writer.flush()
+
+        return 0
+
+    def read(self) -> typing.Iterator[dict]:
+        """iterate over log messages, across rotated segments in order, then the current log file"""
+        return read(self._file_name)
+
+    def segments(self) -> list[str]:
+        return segments(self._file_name)
+
+
+def read(file_name: str) -> typing.Iterator[dict]:
+    """iterate over log messages in rotated segments, then the current log file"""
+    for segment_name in segments(file_name) + [file_name]:
+        if not os.path.exists(segment_name):
+            continue
+
+        opener = gzip.open if segment_name.endswith(".gz") else open
+
+        with opener(segment_name, "rt") as f:  # type: ignore
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def segments(file_name: str) -> list[str]:
+    """rotated segment file names, oldest first"""
+    root, ext = os.path.splitext(file_name)
+
+    segment_names: dict[str, str] = {}
+
+    # a segment being compressed may exist both plain and compressed, prefer the plain file
+    for segment_name in glob.glob(f"{glob.escape(root)}.*{ext}.gz") + glob.glob(f"{glob.escape(root)}.*{ext}"):
+        segment_names[segment_name.removesuffix(".gz")] = segment_name
+
+    return [segment_names[key] for key in sorted(segment_names.keys())]
+
+
+class _Writer:
+    """buffered log file writer shared by all buffered actor logs for the same file"""
+
+    def __init__(self, file_name: str, flush_bytes: int, flush_interval: float, rotate_bytes: int, rotate_daily: bool, compress: bool):
+        self._file_name = file_name
+        self._flush_bytes = flush_bytes
+        self._flush_interval = flush_interval
+        self._rotate_bytes = rotate_bytes
+        self._rotate_daily = rotate_daily
+        self._compress = compress
+
+        self._buffer: list[str] = []
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+
+        self._file: typing.Optional[typing.TextIO] = None
+        self._file_bytes = 0
+        self._file_date = datetime.date.today()
+
+        self._segments_pending: list[str] = []
+        self._closed = threading.Event()
+
+        self._thread = threading.Thread(target=self._flush_loop, name=f"actor-log-{os.path.basename(file_name)}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> int:
+        with self._lock:
+            self._buffer.append(line)
+            self._buffer_bytes += len(line)
+
+            if self._buffer_bytes >= self._flush_bytes:
+                self._flush()
+
+        return 0
+
+    def flush(self) -> int:
+        with self._lock:
+            self._flush()
+
+        self._segments_compress()
+
+        return 0
+
+    def close(self) -> int:
+        self._closed.set()
+        self._thread.join()
+
+        with self._lock:
+            self._flush()
+
+            if self._file:
+                self._file.close()
+                self._file = None
+
+        self._segments_compress()
+
+        return 0
+
+    def _flush(self) -> None:
+        """write buffer to file, rotating file first if needed, caller must hold lock"""
+        if not self._buffer:
+            return
+
+        if self._rotate_check():
+            self._rotate()
+
+        if self._file is None:
+            self._file = open(self._file_name, "a")
+            self._file_bytes = self._file.tell()
+
+        data = "".join(self._buffer)
+
+        self._file.write(data)
+        self._file.flush()
+
+        self._file_bytes += len(data)
+        self._buffer.clear()
+        self._buffer_bytes = 0
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(timeout=self._flush_interval):
+            self.flush()
+
+    def _rotate(self) -> None:
+        """close current file and rename it to a timestamped segment"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+        if os.path.exists(self._file_name):
+            root, ext = os.path.splitext(self._file_name)
+            segment_name = f"{root}.{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}{ext}"
+
+            os.rename(self._file_name, segment_name)
+
+            if self._compress:
+                self._segments_pending.append(segment_name)
+
+        self._file_bytes = 0
+        self._file_date = datetime.date.today()
+
+    def _rotate_check(self) -> bool:
+        if self._file is None:
+            if not os.path.exists(self._file_name):
+                return False
+
+            self._file_bytes = os.path.getsize(self._file_name)
+            self._file_date = datetime.date.fromtimestamp(os.path.getmtime(self._file_name))
+
+        if self._rotate_bytes and self._file_bytes + self._buffer_bytes > self._rotate_bytes and self._file_bytes > 0:
+            return True
+
+        return self._rotate_daily and self._file_date != datetime.date.today()
+
+    def _segments_compress(self) -> None:
+        """gzip rotated segments, outside the writer lock"""
+        with self._lock:
+            segment_names, self._segments_pending = self._segments_pending, []
+
+        for segment_name in segment_names:
+            with open(segment_name, "rb") as f_src, gzip.open(f"{segment_name}.gz.tmp", "wb") as f_dst:
+                f_dst.writelines(f_src)
+
+            os.rename(f"{segment_name}.gz.tmp", f"{segment_name}.gz")
+            os.remove(segment_name)
+
+
+# buffered writers keyed by file name
+_writers: dict[str, _Writer] = {}
+_writers_lock = threading.Lock()
+
+
+def _writer_get(file_name: str, **kwargs) -> _Writer:
+    with _writers_lock:
+        if file_name not in _writers:
+            _writers[file_name] = _Writer(file_name=file_name, **kwargs)
+
+        return _writers[file_name]
+
+
+def close_all() -> int:
+    """flush and close buffered writers, returns number of writers closed"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+
+    for writer in writers:
+        writer.close()
+
+    return len(writers)
+
+
+atexit.register(close_all)
@@ -0,0 +1,85 @@
+import bisect
+import dataclasses
+import threading
+import time
+
+LATENCY_BUCKETS_MSEC: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+RATE_WINDOW_SECONDS: int = 10
+
+
+@dataclasses.dataclass
+class Metrics:
+    name: str
+    queue_depth: int
+    queue_size: int  # 0 if unbounded
+    outputs_depth: list[int]
+    received: int
+    processed: int
+    errors: int
+    msgs_per_sec: float  # processed messages over the last rate window
+    latency_msec_avg: float
+    latency_msec_max: float
+    latency_histogram: dict[str, int]  # bucket upper bound msec, or 'inf', => count
+
+
+class ActorMetrics:
+    """actor message counters and handler latency histogram, safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.processed = 0
+        self.errors = 0
+
+        self._latency_counts = [0] * (len(LATENCY_BUCKETS_MSEC) + 1)
+        self._latency_msec_total = 0.0
+        self._latency_msec_max = 0.0
+        self._rate_counts: dict[int, int] = {}  # epoch second => processed count
+
+    def receive(self, count: int = 1) -> None:
+        with self._lock:
+            self.received += count
+
+    def process(self, msec: float, error: bool = False, count: int = 1) -> None:
+        """record count messages processed with msec latency, e.g. a message batch"""
+        second = int(time.time())
+
+        with self._lock:
+            self.processed += count
+
+            if error:
+                self.errors += count
+
+            self._latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MSEC, msec)] += count
+            self._latency_msec_total += msec * count
+            self._latency_msec_max = max(self._latency_msec_max, msec)
+
+            self._rate_counts[second] = self._rate_counts.get(second, 0) + count
+
+            if len(self._rate_counts) > RATE_WINDOW_SECONDS:
+                for key in [key for key in self._rate_counts if key <= second - RATE_WINDOW_SECONDS]:
+                    del self._rate_counts[key]
+
+    def snapshot(self, name: str, queue_depth: int, queue_size: int, outputs_depth: list[int]) -> Metrics:
+        second = int(time.time())
+
+        with self._lock:
+            # rate over completed seconds in window
+            count = sum(value for key, value in self._rate_counts.items() if second - RATE_WINDOW_SECONDS <= key < second)
+
+            labels = [f"{bucket:g}" for bucket in LATENCY_BUCKETS_MSEC] + ["inf"]
+
+            return Metrics(
+                name=name,
+                queue_depth=queue_depth,
+                queue_size=queue_size,
+                outputs_depth=outputs_depth,
+                received=self.received,
+                processed=self.processed,
+                errors=self.errors,
+                msgs_per_sec=round(count / RATE_WINDOW_SECONDS, 2),
+                latency_msec_avg=round(self._latency_msec_total / self.processed, 2) if self.processed else 0.0,
+                latency_msec_max=round(self._latency_msec_max, 2),
+                latency_histogram=dict(zip(labels, self._latency_counts)),
+            )
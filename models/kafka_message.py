@@ -1,3 +1,4 @@
+import dataclasses
 import typing
 
 
@@ -37,3 +38,41 @@ class KafkaMessage:
 
     def value_str(self) -> str:
         return self._message.value().decode("utf-8")
+
+    def detach(self) -> "KafkaMessage":
+        """picklable copy of message, e.g. to process message in another process"""
+        return KafkaMessage(
+            _Message(
+                _key=self._message.key(),
+                _offset=self._message.offset(),
+                _partition=self._message.partition(),
+                _topic=self._message.topic(),
+                _value=self._message.value(),
+            )
+        )
+
+
+@dataclasses.dataclass
+class _Message:
+    """kafka message fields, with the confluent_kafka.Message accessors used by KafkaMessage"""
+
+    _key: bytes
+    _offset: int
+    _partition: int
+    _topic: str
+    _value: bytes
+
+    def key(self) -> bytes:
+        return self._key
+
+    def offset(self) -> int:
+        return self._offset
+
+    def partition(self) -> int:
+        return self._partition
+
+    def topic(self) -> str:
+        return self._topic
+
+    def value(self) -> bytes:
+        return self._value
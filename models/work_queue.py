@@ -14,6 +14,10 @@ STATE_ERROR = "error"
 STATE_PROCESSING = "processing"
 STATE_QUEUED = "queued"
 
+LEASE_SECONDS = 60 # processing work objects are reclaimed if their lease is not extended
+RETRY_BACKOFF_SECONDS = 5 # retry delay doubles after each attempt
+RETRY_MAX = 3 # max attempts before work object is marked as error
+
 
 class WorkQueue(sqlmodel.SQLModel, table=True):
     __tablename__ = "work_queue"
@@ -21,9 +25,12 @@ class WorkQueue(sqlmodel.SQLModel, table=True):
 
     id: int | None = sqlmodel.Field(default=None, primary_key=True)
 
+    attempts: int = sqlmodel.Field(default=0, nullable=False)
+    available_at: datetime.datetime = sqlmodel.Field(nullable=True)
     completed_at: datetime.datetime = sqlmodel.Field(nullable=True)
     created_at: datetime.datetime = sqlmodel.Field(default_factory=lambda: datetime.datetime.now(datetime.UTC), nullable=False)
     data: dict = sqlmodel.Field(default_factory=dict, sa_column=sqlmodel.Column(sqlmodel.JSON))
+    lease_expires_at: datetime.datetime = sqlmodel.Field(nullable=True)
     msg: str = sqlmodel.Field(index=False, nullable=False, max_length=50)
     name: str = sqlmodel.Field(index=False, nullable=False, max_length=50)
     partition: int = sqlmodel.Field(index=False, nullable=False)
@@ -1,7 +1,11 @@
+import dataclasses
+
 import fastapi
 
 import log  # noqa: E402
 import main_shared
+import services.graph.cache
+import services.graph.session
 
 app = fastapi.APIRouter(
     tags=["app.health"],
@@ -26,3 +30,13 @@ def api_ping():
         "code": 0,
         "message": "pong",
     }
+
+
+@app.get("/health/graph")
+def api_health_graph():
+    """graph driver pool and query cache metrics"""
+    return {
+        "code": 0,
+        "pools": [dataclasses.asdict(pool_metrics) for pool_metrics in services.graph.session.metrics()],
+        "cache": dataclasses.asdict(services.graph.cache.metrics()),
+    }
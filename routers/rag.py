@@ -1,10 +1,13 @@
+import asyncio
+import contextlib
+import json
 import os
 import time
 import traceback
+import typing
 
 import fastapi
 import fastapi.responses
-import llama_cpp
 import sqlmodel
 
 import context
@@ -14,6 +17,7 @@ import services.corpus
 import services.corpus.fs
 import services.corpus.llm
 import services.corpus.vector
+import services.llm
 import services.work_queue
 
 logger = log.init("app")
@@ -31,7 +35,7 @@ app_version = os.environ["APP_VERSION"]
 
 
 @app.get("/corpus/{corpus_id}/query", response_class=fastapi.responses.HTMLResponse)
-def corpus_query(
+async def corpus_query(
     request: fastapi.Request,
     corpus_id: int,
     mode: str = "query",
@@ -39,7 +43,7 @@ def corpus_query(
     limit: int = 10,
     db_session: sqlmodel.Session = fastapi.Depends(main_shared.get_db),
 ):
-    corpus = services.corpus.get_by_id(db_session=db_session, id=corpus_id)
+    corpus = await asyncio.to_thread(services.corpus.get_by_id, db_session=db_session, id=corpus_id)
 
     modes = [
         "query",
@@ -58,7 +62,8 @@ def corpus_query(
             if mode in ["rag"]:
                 t1 = time.time()
 
-                search_result = services.corpus.vector.search(
+                search_result = await asyncio.to_thread(
+                    services.corpus.vector.search,
                     corpus=corpus,
                     query=query,
                     limit=2, # use a small number here
@@ -73,27 +78,28 @@ def corpus_query(
 
                 logger.info(f"{context.rid_get()} corpus '{corpus.name}' rag llm '{llm_name}'")
 
-                llm = llama_cpp.Llama(
-                    model_path=llm_path,
-                    n_ctx=2048,
-                    verbose=False,
-                )
-
-                llm_response = llm(
-                    services.corpus.llm.prompt_text(scope=llm_scope, query=query),
+                # model is loaded once by the model manager, generation is queued on the model executor
+                llm_result = await services.llm.generate_async(
+                    path=llm_path,
+                    prompt=services.corpus.llm.prompt_text(scope=llm_scope, query=query),
                     max_tokens=None, # set to None to generate up to the end of the context window
                     stop=["Q:", "\n"], # stop generating just before the model would generate a new question
                     temperature=0.1,
                 )
 
-                t3 = time.time()
+                logger.info(f"{context.rid_get()} corpus '{corpus.name}' model '{corpus.model_name}' {mode} response {llm_result}")
 
-                logger.info(f"{context.rid_get()} corpus '{corpus.name}' model '{corpus.model_name}' {mode} response {llm_response}")
-
-                query_ok = f"search response in {round(t2 - t1, 2)}s, llm response in {round(t3 - t2, 2)}s"
-                query_response = llm_response.get("choices")[0].get("text").strip()
+                if llm_result.code != 0:
+                    query_error = f"error: {llm_result.errors[0]}"
+                else:
+                    query_ok = (
+                        f"search response in {round(t2 - t1, 2)}s, llm load {round(llm_result.load_msec / 1000, 2)}s "
+                        f"queue {round(llm_result.queue_msec / 1000, 2)}s response in {round(llm_result.generate_msec / 1000, 2)}s"
+                    )
+                    query_response = llm_result.text
             elif mode in ["query"]:
-                search_result = services.corpus.vector.search(
+                search_result = await asyncio.to_thread(
+                    services.corpus.vector.search,
                     corpus=corpus,
                     query=query,
                     limit=limit,
@@ -141,4 +147,83 @@ def corpus_query(
     if "HX-Request" in request.headers:
         response.headers["HX-Push-Url"] = f"{request.get('path')}?mode={mode}&query={query}"
 
-    return response
\ No newline at end of file
+    return response
+
+
+@app.get("/corpus/{corpus_id}/query/stream")
+async def corpus_query_stream(
+    request: fastapi.Request,
+    corpus_id: int,
+    query: str,
+    db_session: sqlmodel.Session = fastapi.Depends(main_shared.get_db),
+):
+    """
+    rag query as server sent events, vector search results are sent as soon as they are available, followed by each
+    generated token, and timings when generation completes
+
+    generation is cancelled when the client disconnects
+    """
+    corpus = await asyncio.to_thread(services.corpus.get_by_id, db_session=db_session, id=corpus_id)
+
+    logger.info(f"{context.rid_get()} corpus '{corpus.name}' model '{corpus.model_name}' stream query '{query}'")
+
+    return fastapi.responses.StreamingResponse(
+        _corpus_query_stream(request=request, corpus=corpus, query=query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _corpus_query_stream(request: fastapi.Request, corpus: typing.Any, query: str) -> typing.AsyncIterator[str]:
+    tokens = 0
+
+    try:
+        t1 = time.time()
+
+        search_result = await asyncio.to_thread(
+            services.corpus.vector.search,
+            corpus=corpus,
+            query=query,
+            limit=2, # use a small number here
+        )
+
+        t2 = time.time()
+
+        yield _sse(event="search", data={"nodes": [node.text for node in search_result.nodes], "msec": round((t2 - t1) * 1000, 2)})
+
+        llm_scope = "\n".join(node.text for node in search_result.nodes)
+
+        # generation is closed, and stopped, on return or when this stream is closed
+        async with contextlib.aclosing(
+            services.llm.generate_stream(
+                path=os.environ.get("APP_LLM_TEXT_PATH"),
+                prompt=services.corpus.llm.prompt_text(scope=llm_scope, query=query),
+                max_tokens=None, # set to None to generate up to the end of the context window
+                stop=["Q:", "\n"], # stop generating just before the model would generate a new question
+                temperature=0.1,
+            )
+        ) as llm_tokens:
+            async for token in llm_tokens:
+                if tokens == 0:
+                    yield _sse(event="first", data={"msec": round((time.time() - t2) * 1000, 2)})
+
+                tokens += 1
+
+                yield _sse(event="token", data=token)
+
+                if await request.is_disconnected():
+                    logger.info(f"{context.rid_get()} corpus '{corpus.name}' stream client disconnected")
+                    return
+
+        t3 = time.time()
+
+        yield _sse(event="done", data={"tokens": tokens, "search_msec": round((t2 - t1) * 1000, 2), "llm_msec": round((t3 - t2) * 1000, 2)})
+    except Exception as e:
+        logger.error(f"{context.rid_get()} corpus '{corpus.name}' stream exception '{e}' - '{traceback.format_exc()}'")
+
+        yield _sse(event="error", data=f"exception: {e}")
+
+
+def _sse(event: str, data: typing.Any) -> str:
+    """server sent event, data is json encoded so multi-line tokens are a single data line"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,2 +1,3 @@
 from .factory import Factory
+from .key_store import KeyStore
 from .name import cipher_name
@@ -2,9 +2,7 @@ import logging
 import typing
 from dataclasses import dataclass
 
-import toml  # type: ignore
-
-import services.crypto.symmetric.aesgcm
+import services.crypto.symmetric.key_store
 
 
 @dataclass
@@ -24,18 +22,14 @@ class Factory:
     def call(self) -> Struct:
         struct = Struct(0, None, [])
 
-        self.logger.info(f"{__name__}")
-
-        toml_str = toml.load(self._toml_file)
-        toml_dict = toml_str[self._user_id]
-
-        cipher_name = toml_dict["cipher"]
-
-        if "aes-gcm" in cipher_name:
-            struct_load = services.crypto.symmetric.aesgcm.Load(key=toml_dict["key"]).call()
-
-            struct.cipher = struct_load.cipher
-        else:
+        # key material and ciphers are cached by the key store
+        try:
+            struct.cipher = services.crypto.symmetric.key_store.get(self._toml_file).cipher(self._user_id)
+        except KeyError:
+            struct.code = 404
+            struct.errors.append(f"user '{self._user_id}' not found")
+        except ValueError as e:
             struct.code = 422
+            struct.errors.append(str(e))
 
         return struct
@@ -0,0 +1,177 @@
+import base64
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from dataclasses import dataclass
+
+import toml  # type: ignore
+
+import services.crypto.symmetric.aesgcm
+from services.crypto.symmetric.aesgcm.decrypt import Struct as StructDecrypt
+from services.crypto.symmetric.aesgcm.encrypt import Struct as StructEncrypt
+
+CACHE_SIZE: int = 1024  # max cached ciphers
+CACHE_TTL: float = 300.0  # seconds
+CHECK_INTERVAL: float = 1.0  # seconds between keys file mtime checks
+
+
+@dataclass
+class StructDecryptBatch:
+    code: int
+    objects: list[StructDecrypt]  # one decrypt struct per object, in input order
+    errors: list[str]
+
+
+@dataclass
+class StructEncryptBatch:
+    code: int
+    objects: list[StructEncrypt]  # one encrypt struct per object, in input order
+    errors: list[str]
+
+
+class KeyStore:
+    """
+    Symmetric key store backed by a keys toml file.
+
+    Key material is loaded once and reloaded when the file modification time changes. Ciphers are created on first
+    use and cached per user id, cached ciphers expire after ttl seconds and the least recently used ciphers are
+    evicted when the cache is full.
+    """
+
+    def __init__(self, toml_file: str, ttl: float = CACHE_TTL, size: int = CACHE_SIZE, check_interval: float = CHECK_INTERVAL):
+        self._toml_file = toml_file
+        self._ttl = ttl
+        self._size = size
+        self._check_interval = check_interval
+
+        self._ciphers: collections.OrderedDict[str, tuple[typing.Any, float]] = collections.OrderedDict()  # user id => cipher, expires at
+        self._keys: dict[str, dict] = {}
+        self._keys_mtime: float = -1.0
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+        self._data_encoding = "utf-8"
+
+        self._logger = logging.getLogger("service")
+
+    def cipher(self, user_id: str) -> typing.Any:
+        """get cached cipher for user id, raises KeyError if user has no key, ValueError if key cipher is not supported"""
+        time_now = time.monotonic()
+
+        with self._lock:
+            self._reload_check(time_now)
+
+            if (cached := self._ciphers.get(user_id)) and cached[1] > time_now:
+                self._ciphers.move_to_end(user_id)
+                return cached[0]
+
+            cipher = self._cipher_create(user_id)
+
+            self._ciphers[user_id] = (cipher, time_now + self._ttl)
+            self._ciphers.move_to_end(user_id)
+
+            while len(self._ciphers) > self._size:
+                self._ciphers.popitem(last=False)
+
+            return cipher
+
+    def decrypt(self, user_id: str, encoded: str, nonce: str) -> StructDecrypt:
+        return self.decrypt_batch(user_id=user_id, objects=[(encoded, nonce)]).objects[0]
+
+    def decrypt_batch(self, user_id: str, objects: typing.Sequence[tuple[str, str]]) -> StructDecryptBatch:
+        """decrypt list of [encoded, nonce] objects, objects that can not be decrypted have a 422 code"""
+        struct = StructDecryptBatch(0, [], [])
+
+        cipher = self.cipher(user_id)
+
+        for encoded, nonce in objects:
+            struct_decrypt = StructDecrypt(0, "", [])
+
+            try:
+                plaintext_bytes = cipher.decrypt(base64.b64decode(nonce), base64.b64decode(encoded), None)
+                struct_decrypt.decoded = plaintext_bytes.decode(self._data_encoding)
+            except Exception as e:
+                struct_decrypt.code = 422
+                struct_decrypt.errors.append(f"decrypt error {e!r}")
+                struct.code = 422
+
+            struct.objects.append(struct_decrypt)
+
+        return struct
+
+    def encrypt(self, user_id: str, data: dict) -> StructEncrypt:
+        return self.encrypt_batch(user_id=user_id, objects=[data]).objects[0]
+
+    def encrypt_batch(self, user_id: str, objects: typing.Sequence[dict]) -> StructEncryptBatch:
+        """encrypt list of data objects, each with a random nonce"""
+        struct = StructEncryptBatch(0, [], [])
+
+        cipher = self.cipher(user_id)
+
+        for data in objects:
+            nonce_bytes = os.urandom(12)
+            encrypted_bytes = cipher.encrypt(nonce_bytes, json.dumps(data).encode(self._data_encoding), None)
+
+            struct.objects.append(
+                StructEncrypt(
+                    0,
+                    base64.b64encode(encrypted_bytes).decode(self._data_encoding),
+                    base64.b64encode(nonce_bytes).decode(self._data_encoding),
+                    [],
+                )
+            )
+
+        return struct
+
+    def invalidate(self) -> int:
+        """clear cached ciphers and key material, keys file is reloaded on next use"""
+        with self._lock:
+            self._ciphers.clear()
+            self._keys_mtime = -1.0
+            self._checked_at = 0.0
+
+        return 0
+
+    def _cipher_create(self, user_id: str) -> typing.Any:
+        toml_dict = self._keys[user_id]
+
+        if "aes-gcm" not in toml_dict["cipher"]:
+            raise ValueError(f"invalid cipher '{toml_dict['cipher']}'")
+
+        return services.crypto.symmetric.aesgcm.Load(key=toml_dict["key"]).call().cipher
+
+    def _reload_check(self, time_now: float) -> None:
+        """reload keys file if its modification time changed, checked at most every check interval"""
+        if time_now < self._checked_at + self._check_interval:
+            return
+
+        self._checked_at = time_now
+
+        mtime = os.stat(self._toml_file).st_mtime
+
+        if mtime == self._keys_mtime:
+            return
+
+        self._keys = toml.load(self._toml_file)
+        self._keys_mtime = mtime
+        self._ciphers.clear()
+
+        self._logger.info(f"{__name__} loaded '{self._toml_file}' keys {len(self._keys)}")
+
+
+# process-wide key stores keyed by toml file
+_stores: dict[str, KeyStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get(toml_file: str) -> KeyStore:
+    """get cached key store for the specified keys file, creating it on first use"""
+    if store := _stores.get(toml_file):
+        return store
+
+    with _stores_lock:
+        return _stores.setdefault(toml_file, KeyStore(toml_file=toml_file))
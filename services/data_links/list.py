@@ -1,5 +1,4 @@
 import dataclasses
-import re
 
 import sqlmodel
 from sqlmodel.sql.expression import Select, SelectOfScalar
@@ -22,6 +21,16 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.DataLink,
+    fields={
+        "id": services.mql.Field(models.DataLink.id, cast=int),
+        "src_name": services.mql.Field(models.DataLink.src_name, ops=services.mql.OPS_LIKE),
+        "src_slug": services.mql.Field(models.DataLink.src_slug, ops=services.mql.OPS_LIKE),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 20):
         self._db = db
@@ -29,8 +38,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.DataLink
-        self._dataset = sqlmodel.select(self._model)  # default database query
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -38,40 +45,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
-
-        struct_tokens = services.mql.Parse(self._query).call()
-
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
+        # compile query, statements are cached by query shape
 
-        for token in struct_tokens.tokens:
-            value = token["value"]
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
 
-            if token["field"] == "id":
-                # match query
-                self._dataset = self._dataset.where(self._model.id == value)
-            elif token["field"] == "src_name":
-                match = re.match(r"^~", value)
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
 
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.src_name.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.src_name == value)
-            elif token["field"] == "src_slug":
-                match = re.match(r"^~", value)
+        struct.errors += struct_compile.errors
 
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.src_slug.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.src_slug == value)
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
 
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
 
         struct.count = len(struct.objects)
 
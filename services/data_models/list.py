@@ -1,5 +1,4 @@
 import dataclasses
-import re
 
 import sqlmodel
 from sqlmodel.sql.expression import Select, SelectOfScalar
@@ -22,6 +21,22 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.DataModel,
+    fields={
+        "id": services.mql.Field(models.DataModel.id, cast=int),
+        "name": services.mql.Field(models.DataModel.object_name, ops=services.mql.OPS_LIKE),
+        "object_name": services.mql.Field(models.DataModel.object_name, ops=services.mql.OPS_LIKE),
+        "node": services.mql.Field(models.DataModel.object_node, cast=int),
+        "object_node": services.mql.Field(models.DataModel.object_node, cast=int),
+        "object_slug": services.mql.Field(models.DataModel.object_slug, ops=services.mql.OPS_LIKE),
+        "slug": services.mql.Field(models.DataModel.object_slug, ops=services.mql.OPS_LIKE),
+        "object_type": services.mql.Field(models.DataModel.object_type, ops=services.mql.OPS_LIKE),
+        "type": services.mql.Field(models.DataModel.object_type, ops=services.mql.OPS_LIKE),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 20):
         self._db = db
@@ -29,9 +44,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.DataModel
-        self._dataset = sqlmodel.select(models.DataModel)  # default database query
-
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -39,53 +51,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
-
-        struct_tokens = services.mql.Parse(self._query).call()
-
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
-
-        for token in struct_tokens.tokens:
-            value = token["value"]
-
-            if token["field"] == "id":
-                # match query
-                self._dataset = self._dataset.where(self._model.id == value)
-            elif token["field"] in ["object_name", "name"]:
-                match = re.match(r"^~", value)
-
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.object_name.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.object_name == value)
-            elif token["field"] in ["object_node", "node"]:
-                # match query
-                self._dataset = self._dataset.where(self._model.object_node == value)
-            elif token["field"] in ["object_slug", "slug"]:
-                match = re.match(r"^~", value)
-
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.object_slug.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.object_slug == value)
-            elif token["field"] in ["object_type", "type"]:
-                match = re.match(r"^~", value)
-
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.object_type.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.object_type == value)
-
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        # compile query, statements are cached by query shape
+
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
+
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
+
+        struct.errors += struct_compile.errors
+
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
+
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
 
         struct.count = len(struct.objects)
 
@@ -2,6 +2,7 @@ from .count_ids import CountIds  # noqa: F401
 from .count_name_slug_values import CountNameSlugValues  # noqa: F401
 from .count_slug_values import CountSlugValues  # noqa: F401
 from .create import Create  # noqa: F401
+from .create_bulk import CreateBulk  # noqa: F401
 from .delete import delete_by_id  # noqa: F401
 from .fingerprint import fingerprint_entities  # noqa: F401
 from .get import get_all_by_ids, get_random  # noqa: F401
@@ -15,4 +16,5 @@ from .normalize import Normalize  # noqa: F401
 from .publish import Publish  # noqa: F401
 from .replace import Replace  # noqa: F401
 from .resolve import Resolve  # noqa: F401
+from .resolve_batch import ResolveBatch  # noqa: F401
 from .update_version import update_version  # noqa: F401
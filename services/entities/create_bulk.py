@@ -0,0 +1,136 @@
+import csv
+import dataclasses
+import io
+import typing
+
+import more_itertools
+import sqlalchemy
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.dialects.sqlite
+import sqlmodel
+
+import log
+import models
+import services.entity_locations
+
+BATCH_SIZE = 1000
+
+CONSTRAINT_NAME = "_uc_entity_version"
+CONSTRAINT_COLUMNS = ["entity_id", "entity_key", "entity_name", "slug", "type_value", "version"]
+
+STAGING_TABLE = "entities_staging"
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    ids: list[int]
+    count: int
+    conflicts: int
+    entity_ids: set[str]
+    entity_count: int
+    location_ids: list[int]
+    errors: list[str]
+
+
+class CreateBulk:
+    """
+    create entities in batches, skipping rows that conflict with an existing entity version
+
+    postgres batches are copied into a staging table and merged with a single 'insert ... on conflict do nothing' statement,
+    other databases (e.g. sqlite) use a multi-row 'insert ... on conflict do nothing'
+    """
+
+    def __init__(self, db: sqlmodel.Session, entities: typing.Iterable[models.Entity], batch_size: int = BATCH_SIZE, locations: bool = True):
+        self._db = db
+        self._entities = entities
+        self._batch_size = batch_size
+        self._locations = locations
+
+        self._columns = [column.name for column in models.Entity.__table__.columns if column.name != "id"]
+        self._dialect = self._db.get_bind().dialect.name
+
+        self._logger = log.init("service")
+
+    def call(self) -> Struct:
+        struct = Struct(0, [], 0, 0, set(), 0, [], [])
+
+        try:
+            for entities in more_itertools.chunked(self._entities, self._batch_size):
+                rows = [self._entity_row(entity) for entity in entities]
+
+                if self._dialect == "postgresql":
+                    records = self._batch_copy(rows)
+                else:
+                    records = self._batch_insert(rows)
+
+                struct.conflicts += len(rows) - len(records)
+
+                for id, entity_id in records:
+                    struct.ids.append(id)
+                    struct.entity_ids.add(entity_id)
+
+            self._db.commit()
+
+            struct.count = len(struct.ids)
+            struct.entity_count = len(struct.entity_ids)
+
+            self._logger.info(f"{__name__} dialect {self._dialect} created {struct.count} conflicts {struct.conflicts}")
+
+            if self._locations and struct.ids:
+                # create entity locations
+                struct_locations = services.entity_locations.CreateBulk(db=self._db, entity_ids=list(struct.entity_ids)).call()
+
+                struct.location_ids += struct_locations.ids
+        except Exception as e:
+            self._db.rollback()
+            struct.code = 500
+            struct.errors.append(str(e))
+            self._logger.error(f"{__name__} exception {e}")
+
+        return struct
+
+    def _batch_copy(self, rows: list[dict]) -> list[tuple[int, str]]:
+        """copy rows into staging table and merge into entities table, returns inserted [id, entity_id] tuples"""
+        if self._db.get_bind().dialect.driver != "psycopg2":
+            # driver does not support copy
+            return self._batch_insert(rows)
+
+        dbapi_connection = self._db.connection().connection.dbapi_connection
+
+        columns = ", ".join(self._columns)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_STRINGS)
+
+        for row in rows:
+            writer.writerow([row[column] for column in self._columns])
+
+        buffer.seek(0)
+
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f"create temp table if not exists {STAGING_TABLE} on commit drop as select {columns} from entities with no data")
+            cursor.execute(f"truncate {STAGING_TABLE}")
+            cursor.copy_expert(f"copy {STAGING_TABLE} ({columns}) from stdin with (format csv)", buffer)
+            cursor.execute(
+                f"insert into entities ({columns}) select {columns} from {STAGING_TABLE}"
+                + f" on conflict on constraint {CONSTRAINT_NAME} do nothing returning id, entity_id"
+            )
+
+            return [(record[0], record[1]) for record in cursor.fetchall()]
+
+    def _batch_insert(self, rows: list[dict]) -> list[tuple[int, str]]:
+        """multi-row insert, returns inserted [id, entity_id] tuples"""
+        model = models.Entity
+
+        if self._dialect == "postgresql":
+            dataset = sqlalchemy.dialects.postgresql.insert(model).values(rows).on_conflict_do_nothing(constraint=CONSTRAINT_NAME)
+        else:
+            dataset = sqlalchemy.dialects.sqlite.insert(model).values(rows).on_conflict_do_nothing(index_elements=CONSTRAINT_COLUMNS)
+
+        result = self._db.connection().execute(dataset.returning(model.id, model.entity_id))
+
+        return [(record[0], record[1]) for record in result]
+
+    def _entity_row(self, entity: models.Entity) -> dict:
+        return {column: getattr(entity, column) for column in self._columns}
@@ -1,7 +1,5 @@
 import dataclasses
-import re
 
-import sqlalchemy
 import sqlmodel
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
@@ -23,6 +21,23 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.Entity,
+    fields={
+        "entity_id": services.mql.Field(models.Entity.entity_id, ops=services.mql.OPS_LIKE_IN),
+        "entity_key": services.mql.Field(models.Entity.entity_key, ops=services.mql.OPS_LIKE),
+        "entity_name": services.mql.Field(models.Entity.entity_name, ops=services.mql.OPS_LIKE),
+        "name": services.mql.Field(models.Entity.name, ops=services.mql.OPS_LIKE),
+        "name_text": services.mql.Field(models.Entity.name, ops=services.mql.OPS_TEXT),
+        "node": services.mql.Field(models.Entity.node, cast=int),
+        "slug": services.mql.Field(models.Entity.slug, ops=services.mql.OPS_LIKE),
+        "state": services.mql.Field(models.Entity.state),
+        "tags": services.mql.Field(models.Entity.tags, ops=services.mql.OPS_TAGS),
+        "type_value": services.mql.Field(models.Entity.type_value, ops=services.mql.OPS_LIKE),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 100):
         self._db = db
@@ -30,8 +45,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.Entity
-        self._dataset = sqlmodel.select(models.Entity)  # default database query
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -39,86 +52,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
-
-        struct_tokens = services.mql.Parse(self._query).call()
-
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
-
-        for token in struct_tokens.tokens:
-            value = token["value"]
-
-            if token["field"] == "entity_id":
-                if match := re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.entity_id.like("%" + value_normal + "%"))  # type: ignore
-                elif match := re.match(r"\S+\|\S+", value):
-                    values = value.split("|")
-                    self._dataset = self._dataset.where(self._model.entity_id.in_(values))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.entity_id == value)
-            elif token["field"] == "entity_key":
-                match = re.match(r"^~", value)
-
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.entity_key.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.entity_key == value)
-            elif token["field"] == "entity_name":
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.entity_name.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.entity_name == value)
-            elif token["field"] == "name":
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.name.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # equal query
-                    self._dataset = self._dataset.where(self._model.name == value)
-            elif token["field"] == "name_text":
-                # full text search
-                # todo: changes made to sqlalchemy 2.0 that need to be looked into
-                ts_vector = sqlalchemy.func.to_tsvector(models.Entity.name)
-                self._dataset = self._dataset.where(ts_vector.match(value))
-                # self._dataset = self._dataset.where(ts_vector.match(sqlalchemy.func.websearch_to_tsquery(value)))
-            elif token["field"] == "node":
-                # match query
-                self._dataset = self._dataset.where(self._model.node == value)
-            elif token["field"] == "slug":
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.slug.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # equal query
-                    self._dataset = self._dataset.where(models.Entity.slug == value)
-            elif token["field"] == "state":
-                # match query
-                self._dataset = self._dataset.where(self._model.state == value)
-            elif token["field"] == "tags":
-                # like query
-                value_format = f"|{value}|"
-                self._dataset = self._dataset.where(self._model.tags.like("%" + value_format + "%"))  # type: ignore
-            elif token["field"] == "type_value":
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.type_value.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # equal query
-                    self._dataset = self._dataset.where(self._model.type_value == value)
-
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        # compile query, statements are cached by query shape
+
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
+
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
+
+        struct.errors += struct_compile.errors
+
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
+
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
 
         struct.count = len(struct.objects)
 
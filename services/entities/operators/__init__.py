@@ -1,4 +1,6 @@
 from .entity_build import EntityBuild  # noqa: F401
 from .entity_persist import EntityPersist  # noqa: F401
 from .id_resolve import IdResolve  # noqa: F401
+from .id_resolve_batch import IdResolveBatch  # noqa: F401
 from .object_sync import ObjectSync  # noqa: F401
+from .object_sync_batch import ObjectSyncBatch  # noqa: F401
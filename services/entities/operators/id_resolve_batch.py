@@ -0,0 +1,94 @@
+import dataclasses
+
+import sqlmodel
+import ulid
+
+import models
+
+from .id_resolve import Struct as StructId
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    objects: list[StructId]  # one id resolve struct per object, in input order
+    errors: list[str]
+
+
+class IdResolveBatch:
+    """
+    timely operator to map a batch of object ids to existing entity objects, otherwise return new ids
+
+    primary key values are resolved with one 'in' query per distinct entity name and slug; an object with the same new
+    primary key as an earlier object in the batch gets the same id with code 409
+    """
+
+    def __init__(self, db: sqlmodel.Session, objects: list[dict]):
+        self._db = db
+        self._objects = objects
+
+    def call(self) -> Struct:
+        struct = Struct(0, [], [])
+
+        # map each object to its [entity_name, slug, value] primary key, or None if the key is invalid
+        object_keys = [self._object_pk(object) for object in self._objects]
+
+        entity_ids = self._entity_ids_matching(keys=[key for key in object_keys if key])
+        entity_ids_new: dict[tuple[str, str, str], str] = {}
+
+        for key in object_keys:
+            if not key:
+                struct.objects.append(StructId(422, "", []))
+            elif entity_id := entity_ids.get(key):
+                # entity exists
+                struct.objects.append(StructId(200, entity_id, []))
+            elif entity_id := entity_ids_new.get(key):
+                # new entity created by an earlier object in this batch
+                struct.objects.append(StructId(409, entity_id, []))
+            else:
+                entity_ids_new[key] = ulid.new().str
+                struct.objects.append(StructId(201, entity_ids_new[key], []))
+
+        return struct
+
+    def _entity_ids_matching(self, keys: list[tuple[str, str, str]]) -> dict[tuple[str, str, str], str]:
+        """returns dict mapping [entity_name, slug, value] to an existing entity id"""
+        values_grouped: dict[tuple[str, str], set[str]] = {}
+
+        for entity_name, slug, value in keys:
+            values_grouped.setdefault((entity_name, slug), set()).add(value)
+
+        model = models.Entity
+
+        entity_ids: dict[tuple[str, str, str], str] = {}
+
+        for (entity_name, slug), values in values_grouped.items():
+            dataset = (
+                sqlmodel.select(model.type_value, model.entity_id)
+                .where(model.entity_name == entity_name)
+                .where(model.slug == slug)
+                .where(model.type_value.in_(list(values)))  # type: ignore
+            )
+
+            for type_value, entity_id in self._db.exec(dataset).all():
+                entity_ids.setdefault((entity_name, slug, type_value), entity_id)
+
+        return entity_ids
+
+    def _object_pk(self, object: dict) -> tuple[str, str, str] | None:
+        """returns object [entity_name, slug, value] primary key"""
+        entity_pk_keys = [key for key, object_list in object.items() if any(object_dict.get("pk", 0) == 1 for object_dict in object_list)]
+
+        if len(entity_pk_keys) != 1:
+            # todo: support compose keys
+            return None
+
+        entity_pk_key = entity_pk_keys[0]
+
+        if len(object[entity_pk_key]) > 1:
+            # error, can't have multiple values for primary key
+            return None
+
+        entity_name, entity_slug = entity_pk_key.split(".")
+
+        return entity_name, entity_slug, object[entity_pk_key][0]["value"]
@@ -1,8 +1,10 @@
 import dataclasses
+import typing
 
 import sqlmodel
 import ulid
 
+import models
 import services.data_models
 import services.entities
 import services.kafka.topics
@@ -22,36 +24,24 @@ class ObjectSync:
     timely operator to sync object to postgres database
     """
 
-    def __init__(self, db: sqlmodel.Session, object: dict):
+    def __init__(self, db: sqlmodel.Session, object: dict, data_models: typing.Optional[dict] = None):
         self._db = db
         self._object = object
+        self._data_models = data_models  # data models hash, loaded on each call if not specified
 
     def call(self) -> Struct:
         struct = Struct(0, [], set(), [], [])
 
-        struct_dms = services.data_models.Hash(db=self._db, query="").call()
+        if self._data_models is None:
+            self._data_models = services.data_models.Hash(db=self._db, query="").call().object
 
-        object = self._object_props_validate_id_present(self._object)
+        entities = self._object_entities(self._object)
 
-        properties = self._object_props_validate_id_slug_present(
-            object=object,
-            properties=object["properties"],
-        )
-
-        if self._object_props_validate_id(object, properties) != 0:
+        if entities is None:
             struct.code = 422
             struct.errors.append("invalid id")
             return struct
 
-        # normalize object into entity objects
-        struct_normalize = services.entities.Normalize(
-            object=object,
-            properties=properties,
-            data_models=struct_dms.object,
-        ).call()
-
-        entities = struct_normalize.entities
-
         # resolve entities
         struct_resolve = services.entities.Resolve(
             db=self._db,
@@ -97,6 +87,26 @@ class ObjectSync:
 
         return struct
 
+    def _object_entities(self, object: dict) -> typing.Optional[list[models.Entity]]:
+        """validate and normalize object into entity objects, returns None if object id is invalid"""
+        object = self._object_props_validate_id_present(object)
+
+        properties = self._object_props_validate_id_slug_present(
+            object=object,
+            properties=object["properties"],
+        )
+
+        if self._object_props_validate_id(object, properties) != 0:
+            return None
+
+        struct_normalize = services.entities.Normalize(
+            object=object,
+            properties=properties,
+            data_models=self._data_models,  # type: ignore
+        ).call()
+
+        return struct_normalize.entities
+
     def _object_props_validate_id(self, object: dict, properties: list[dict]) -> int:
         """validate object id matches id slug"""
         prop_hash = [prop_hash for prop_hash in properties if prop_hash["slug"] == "id"][0]
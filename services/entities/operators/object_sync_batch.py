@@ -0,0 +1,129 @@
+import dataclasses
+
+import sqlalchemy
+import sqlmodel
+
+import log
+import models
+import services.data_models
+import services.entities
+import services.entity_locations
+
+from .object_sync import ObjectSync
+from .object_sync import Struct as StructObject
+from ..resolve import Struct as StructResolve
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    objects: list[StructObject]  # one object sync struct per object, in input order
+    errors: list[str]
+
+
+class ObjectSyncBatch(ObjectSync):
+    """
+    timely operator to sync a batch of objects to postgres database
+
+    data models are loaded once, all objects are resolved with a single query, and new entity versions are created,
+    and original versions replaced, with a single commit
+    """
+
+    def __init__(self, db: sqlmodel.Session, objects: list[dict], data_models: dict | None = None):
+        super().__init__(db=db, object={}, data_models=data_models)
+
+        self._objects = objects
+
+        self._logger = log.init("service")
+
+    def call(self) -> Struct:  # type: ignore
+        struct = Struct(0, [StructObject(0, [], set(), [], []) for _ in self._objects], [])
+
+        if self._data_models is None:
+            self._data_models = services.data_models.Hash(db=self._db, query="").call().object
+
+        # normalize objects, objects with an entity id already seen in this batch are synced after the batch
+        entity_sets: dict[int, list[models.Entity]] = {}
+        indexes_deferred: list[int] = []
+        entity_ids_seen: set[str] = set()
+
+        for index, object in enumerate(self._objects):
+            entities = self._object_entities(object)
+
+            if entities is None:
+                struct.objects[index].code = 422
+                struct.objects[index].errors.append("invalid id")
+            elif entities[0].entity_id in entity_ids_seen:
+                indexes_deferred.append(index)
+            else:
+                entity_ids_seen.add(entities[0].entity_id)
+                entity_sets[index] = entities
+
+        struct_resolve = services.entities.ResolveBatch(db=self._db, entity_sets=list(entity_sets.values())).call()
+
+        indexes_pending: dict[int, StructResolve] = {}
+
+        for index, resolved in zip(entity_sets.keys(), struct_resolve.objects):
+            if resolved.code == 409:
+                # entity exists
+                struct.objects[index].ids = [entity.id for entity in resolved.entities if entity.id]  # type: ignore
+                struct.objects[index].entity_ids = set([entity.entity_id for entity in resolved.entities])
+                struct.objects[index].code = 409
+            else:
+                indexes_pending[index] = resolved
+
+        if indexes_pending and self._persist(entity_sets=entity_sets, resolved=indexes_pending, struct=struct) != 0:
+            # batch failed, sync pending objects individually
+            indexes_deferred = sorted(indexes_deferred + list(indexes_pending.keys()))
+
+        for index in indexes_deferred:
+            struct.objects[index] = ObjectSync(db=self._db, object=self._objects[index], data_models=self._data_models).call()
+
+        self._logger.info(f"{__name__} objects {len(self._objects)} pending {len(indexes_pending)} deferred {len(indexes_deferred)}")
+
+        return struct
+
+    def _persist(self, entity_sets: dict[int, list[models.Entity]], resolved: dict[int, StructResolve], struct: Struct) -> int:
+        """create new entity versions and replace original versions for all pending objects with a single commit"""
+        try:
+            for index, struct_resolve in resolved.items():
+                for entity in entity_sets[index]:
+                    # set entity version and fingerprint
+                    entity.fingerprint = struct_resolve.fingerprint
+                    entity.version = struct_resolve.version
+                    self._db.add(entity)
+
+                if struct_resolve.code == 200:
+                    # entity changed, mark original version as replaced
+                    for entity in struct_resolve.entities:
+                        entity.state = models.entity.STATE_REPLACED
+                        self._db.add(entity)
+
+            self._db.commit()
+        except sqlalchemy.exc.IntegrityError as e:
+            self._db.rollback()
+            self._logger.error(f"{__name__} error {e}")
+            return 409
+
+        ids = []
+
+        for index, struct_resolve in resolved.items():
+            struct.objects[index].code = struct_resolve.code
+            struct.objects[index].ids = [entity.id for entity in entity_sets[index] if entity.id]  # type: ignore
+            struct.objects[index].entity_ids = set(entity.entity_id for entity in entity_sets[index])
+
+            ids += struct.objects[index].ids
+
+        # create entity locations
+        struct_locations = services.entity_locations.CreateBulk(db=self._db, entity_ids=ids).call()
+
+        location_ids: dict[str, list[int]] = {}
+
+        for location_id, entity_id in zip(struct_locations.ids, struct_locations.entity_ids):
+            location_ids.setdefault(entity_id, []).append(location_id)
+
+        for index in resolved.keys():
+            for entity_id in struct.objects[index].entity_ids:
+                struct.objects[index].location_ids += location_ids.get(entity_id, [])
+
+        return 0
@@ -1,3 +1,4 @@
+import concurrent.futures
 import dataclasses
 import typing
 
@@ -9,10 +10,13 @@ import kafka
 @dataclasses.dataclass
 class Struct:
     code: int
+    future: typing.Optional[concurrent.futures.Future]  # resolved by message delivery report
     errors: list[str]
 
 
 class Publish:
+    """enqueue message on the shared kafka producer, delivery is reported by the returned future"""
+
     def __init__(self, message: dict, topic: str, key: typing.Optional[str] = None):
         self._message = message
         self._topic = topic
@@ -20,14 +24,16 @@ class Publish:
         self._key = key or ulid.new().str
 
     def call(self) -> Struct:
-        struct = Struct(0, [])
+        struct = Struct(0, None, [])
 
         writer = kafka.Writer(topic=self._topic)
 
-        # write message to kafka stream
-        writer.call(
-            key=ulid.new().str,
+        # enqueue message on kafka stream
+        struct_writer = writer.call(
+            key=self._key,
             message=self._message,
         )
 
+        struct.future = struct_writer.future
+
         return struct
@@ -0,0 +1,82 @@
+import dataclasses
+
+import sqlmodel
+
+import models
+import services.entities
+
+from .resolve import Struct as StructResolve
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    objects: list[StructResolve]  # one resolve struct per entity set, in input order
+    errors: list[str]
+
+
+class ResolveBatch:
+    """
+    resolve a batch of entity sets with a single query for all active entity versions
+
+    each entity set is resolved with the same rules as Resolve:
+    - 201 if entities do not exist, indicating this would be a create operation
+    - 200 if entities exist without matching fingerprint, indicating this would be an update operation
+    - 409 if entities exist with matching fingerprint
+    """
+
+    def __init__(self, db: sqlmodel.Session, entity_sets: list[list[models.Entity]]):
+        self._db = db
+        self._entity_sets = entity_sets
+
+    def call(self) -> Struct:
+        struct = Struct(0, [], [])
+
+        entities_matching = self._resolve_matching()
+
+        for entities in self._entity_sets:
+            struct_resolve = StructResolve(0, [], 0, "")
+
+            struct_resolve.fingerprint = services.entities.fingerprint_entities(entities=entities)
+
+            if entities:
+                struct_resolve.entities = entities_matching.get(entities[0].entity_id, [])
+
+            if not struct_resolve.entities:
+                # no matches, new entity
+                struct_resolve.version = 0
+                struct_resolve.code = 201
+            elif services.entities.fingerprint_entities(entities=struct_resolve.entities) == struct_resolve.fingerprint:
+                # matching entities and fingerprint
+                struct_resolve.code = 409
+            else:
+                # fingerprint is different, entity has changed
+                struct_resolve.version = struct_resolve.entities[0].version + 1
+                struct_resolve.code = 200
+
+            struct.objects.append(struct_resolve)
+
+        return struct
+
+    def _resolve_matching(self) -> dict[str, list[models.Entity]]:
+        """return active entities for all entity sets, grouped by entity id"""
+        entity_ids = list(set(entities[0].entity_id for entities in self._entity_sets if entities))
+
+        if not entity_ids:
+            return {}
+
+        model = models.Entity
+
+        dataset = (
+            sqlmodel.select(model)
+            .where(model.entity_id.in_(entity_ids))  # type: ignore
+            .where(model.state == models.entity.STATE_ACTIVE)
+            .order_by(model.id.asc())  # type: ignore
+        )
+
+        entities_matching: dict[str, list[models.Entity]] = {}
+
+        for entity in self._db.exec(dataset).all():
+            entities_matching.setdefault(entity.entity_id, []).append(entity)
+
+        return entities_matching
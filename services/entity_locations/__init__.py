@@ -1,5 +1,6 @@
 from .count_ids import CountIds  # noqa: F401
 from .create import Create  # noqa: F401
+from .create_bulk import CreateBulk  # noqa: F401
 from .delete import delete_by_id  # noqa: F401
 from .get import get_all_by_entity_ids  # noqa: F401
 from .list import List  # noqa: F401
@@ -0,0 +1,103 @@
+import dataclasses
+import typing
+
+import shapely.geometry
+import sqlalchemy
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.dialects.sqlite
+import sqlmodel
+
+import models
+import services.entities
+import services.entity_locations
+
+from .create import Create
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    ids: list[int]
+    entity_ids: list[str]  # entity id for each location id
+    count: int
+    errors: list[str]
+
+
+class CreateBulk(Create):
+    """create entity locations for an entity set, with one query for existing locations and one multi-row insert"""
+
+    def __init__(self, db: sqlmodel.Session, entity_ids: list[str | int]):
+        super().__init__(db=db, entity_ids=entity_ids)
+
+        self._dialect = self._db.get_bind().dialect.name
+        self._city_points: dict[str, typing.Optional[shapely.geometry.Point]] = {}
+
+    def call(self) -> Struct:  # type: ignore
+        struct = Struct(0, [], [], 0, [])
+
+        if not self._entity_ids:
+            return struct
+
+        self._logger.info(f"{__name__} using entity ids {len(self._entity_ids)}")
+
+        entity_list = services.entities.get_all_by_ids(db=self._db, ids=self._entity_ids)
+        entity_groups = self._entities_group(entity_list)
+
+        locations_existing = services.entity_locations.get_all_by_entity_ids(db=self._db, ids=list(entity_groups.keys()))
+        entity_ids_existing = set(location.entity_id for location in locations_existing)
+
+        rows = []
+
+        for entity_id, entities in entity_groups.items():
+            if entity_id in entity_ids_existing:
+                continue
+
+            # map entity set to an entity latlon
+            entity_latlon = self._entity_latlon(entities)
+
+            if entity_latlon.code != 0:
+                # entity set has no location
+                continue
+
+            rows.append({"entity_id": entity_id, "loc": f"Point({entity_latlon.lon} {entity_latlon.lat})"})
+
+        if not rows:
+            return struct
+
+        try:
+            for id, entity_id in self._insert(rows):
+                struct.ids.append(id)
+                struct.entity_ids.append(entity_id)
+
+            struct.count = len(struct.ids)
+
+            self._db.commit()
+        except sqlalchemy.exc.IntegrityError as e:
+            self._db.rollback()
+            struct.code = 409
+            self._logger.error(f"{__name__} error {e}")
+        except Exception as e:
+            self._db.rollback()
+            struct.code = 500
+            self._logger.error(f"{__name__} exception {e}")
+
+        return struct
+
+    def _city_point(self, name: str) -> typing.Optional[shapely.geometry.Point]:
+        """city lookups are cached, entity sets in the same batch often share cities"""
+        if name not in self._city_points:
+            self._city_points[name] = super()._city_point(name=name)
+
+        return self._city_points[name]
+
+    def _insert(self, rows: list[dict]) -> list[tuple[int, str]]:
+        table = models.EntityLocation.__table__
+
+        if self._dialect == "postgresql":
+            dataset = sqlalchemy.dialects.postgresql.insert(table).values(rows).on_conflict_do_nothing(index_elements=["entity_id"])
+        else:
+            dataset = sqlalchemy.dialects.sqlite.insert(table).values(rows).on_conflict_do_nothing(index_elements=["entity_id"])
+
+        result = self._db.connection().execute(dataset.returning(table.c.id, table.c.entity_id))
+
+        return [(record[0], record[1]) for record in result]
@@ -1,5 +1,4 @@
 import dataclasses
-import re
 
 import sqlmodel
 from sqlmodel.sql.expression import Select, SelectOfScalar
@@ -22,6 +21,14 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.EntityLocation,
+    fields={
+        "entity_id": services.mql.Field(models.EntityLocation.entity_id, ops=services.mql.OPS_LIKE_IN),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 100):
         self._db = db
@@ -29,9 +36,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.EntityLocation
-        self._dataset = sqlmodel.select(models.EntityLocation)  # default database query
-
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -39,30 +43,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
-
-        struct_tokens = services.mql.Parse(self._query).call()
+        # compile query, statements are cached by query shape
 
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
 
-        for token in struct_tokens.tokens:
-            value = token["value"]
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
 
-            if token["field"] == "entity_id":
-                # match = re.match(r"^~", value)
+        struct.errors += struct_compile.errors
 
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.entity_id.like("%" + value_normal + "%"))  # type: ignore
-                elif re.match(r"\S+\|\S+", value):
-                    values = value.split("|")
-                    self._dataset = self._dataset.where(self._model.entity_id.in_(values))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.entity_id == value)
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
 
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
 
         struct.count = len(struct.objects)
 
@@ -2,5 +2,6 @@ from .create import Create  # noqa: F401
 from .delete import delete_by_id  # noqa: F401
 from .list import List  # noqa: F401
 from .match import Match  # noqa: F401
+from .match_batch import MatchBatch  # noqa: F401
 from .publish import Publish  # noqa: F401
 from .slurp import Slurp  # noqa: F401
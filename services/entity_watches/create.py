@@ -5,6 +5,7 @@ import sqlmodel
 
 import log
 import models
+import services.entity_watches.matcher
 
 
 @dataclasses.dataclass
@@ -45,4 +46,7 @@ class Create:
 
             self._logger.error(f"{__name__} create error")
 
+        if struct.count:
+            services.entity_watches.matcher.invalidate()
+
         return struct
@@ -1,6 +1,7 @@
 import sqlmodel
 
 import models
+import services.entity_watches.matcher
 
 
 def delete_by_id(db: sqlmodel.Session, ids: list[int]) -> int:
@@ -16,4 +17,6 @@ def delete_by_id(db: sqlmodel.Session, ids: list[int]) -> int:
 
     db.commit()
 
+    services.entity_watches.matcher.invalidate()
+
     return 0
@@ -0,0 +1,161 @@
+import dataclasses
+import math
+import threading
+import typing
+
+CELL_DEGREES: float = 0.1  # grid cell size, about 11km of latitude
+CELLS_MAX: int = 1024  # geofences covering more cells are checked for every point
+
+# neo4j wgs-84 point.distance earth radius
+EARTH_RADIUS_METERS: float = 6378140.0
+
+METERS_PER_DEGREE: float = EARTH_RADIUS_METERS * math.pi / 180
+
+
+@dataclasses.dataclass
+class Geofence:
+    lat: float
+    lon: float
+    meters: float
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """returns True if point is within geofence, same as a 'point.distance(p1, p2) < meters' cypher filter"""
+        return distance(self.lat, self.lon, lat, lon) < self.meters
+
+
+def distance(lat_1: float, lon_1: float, lat_2: float, lon_2: float) -> float:
+    """haversine distance in meters"""
+    phi_1, phi_2 = math.radians(lat_1), math.radians(lat_2)
+    phi_delta = math.radians(lat_2 - lat_1)
+    lambda_delta = math.radians(lon_2 - lon_1)
+
+    a = math.sin(phi_delta / 2) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(lambda_delta / 2) ** 2
+
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """
+    In memory grid index over geofence circles.
+
+    Each object is added with its geofences, it matches a point contained by all of its geofences; objects are indexed
+    in every grid cell covered by the bounding box of their first geofence, so a point is only tested against the
+    objects in its own cell. Objects with no geofences match any point, and objects with very large geofences are
+    tested for every point.
+    """
+
+    def __init__(self, cell_degrees: float = CELL_DEGREES):
+        self._cell_degrees = cell_degrees
+
+        self._cells: dict[tuple[int, int], dict[int, typing.Any]] = {}  # cell => id => object
+        self._cells_by_id: dict[int, list[tuple[int, int]]] = {}
+        self._geofences: dict[int, list[Geofence]] = {}
+        self._large: dict[int, typing.Any] = {}
+        self._unbounded: dict[int, typing.Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._geofences)
+
+    def add(self, id: int, geofences: list[Geofence], object: typing.Any) -> int:
+        with self._lock:
+            self._remove(id)
+
+            self._geofences[id] = geofences
+
+            if not geofences:
+                self._unbounded[id] = object
+                return 0
+
+            cells = self._cells_covered(geofences[0])
+
+            if cells is None:
+                self._large[id] = object
+                return 0
+
+            for cell in cells:
+                self._cells.setdefault(cell, {})[id] = object
+
+            self._cells_by_id[id] = cells
+
+        return 0
+
+    def match(self, lat: typing.Optional[float], lon: typing.Optional[float]) -> list[typing.Any]:
+        """objects with all geofences containing point, or only objects with no geofences if there is no point"""
+        with self._lock:
+            objects = list(self._unbounded.values())
+
+            if lat is None or lon is None:
+                return objects
+
+            candidates = list(self._cells.get(self._cell(lat, lon), {}).items()) + list(self._large.items())
+
+            for id, object in candidates:
+                if all(geofence.contains(lat, lon) for geofence in self._geofences[id]):
+                    objects.append(object)
+
+        return objects
+
+    def objects(self) -> list[typing.Any]:
+        """all objects"""
+        with self._lock:
+            objects = dict(self._unbounded)
+            objects.update(self._large)
+
+            for cell_objects in self._cells.values():
+                objects.update(cell_objects)
+
+        return list(objects.values())
+
+    def remove(self, id: int) -> int:
+        with self._lock:
+            return self._remove(id)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self._cell_degrees), math.floor(lon / self._cell_degrees))
+
+    def _cells_covered(self, geofence: Geofence) -> typing.Optional[list[tuple[int, int]]]:
+        """cells covered by geofence bounding box, or None if it covers more than the max cells"""
+        lat_delta = geofence.meters / METERS_PER_DEGREE
+        lat_min, lat_max = max(geofence.lat - lat_delta, -90.0), min(geofence.lat + lat_delta, 90.0)
+
+        # longitude degrees shrink with latitude, use the widest latitude in the box
+        lat_cos = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+
+        if lat_cos < 1e-6:
+            # box includes a pole
+            return None
+
+        lon_delta = geofence.meters / (METERS_PER_DEGREE * lat_cos)
+
+        cell_min = self._cell(lat_min, geofence.lon - lon_delta)
+        cell_max = self._cell(lat_max, geofence.lon + lon_delta)
+
+        if (cell_max[0] - cell_min[0] + 1) * (cell_max[1] - cell_min[1] + 1) > CELLS_MAX:
+            return None
+
+        # cells wrap at the antimeridian
+        lon_cells = round(360.0 / self._cell_degrees)
+        lon_offset = round(180.0 / self._cell_degrees)
+
+        return [
+            (lat_cell, (lon_cell + lon_offset) % lon_cells - lon_offset)
+            for lat_cell in range(cell_min[0], cell_max[0] + 1)
+            for lon_cell in range(cell_min[1], cell_max[1] + 1)
+        ]
+
+    def _remove(self, id: int) -> int:
+        if self._geofences.pop(id, None) is None:
+            return 404
+
+        self._unbounded.pop(id, None)
+        self._large.pop(id, None)
+
+        for cell in self._cells_by_id.pop(id, []):
+            cell_objects = self._cells[cell]
+            cell_objects.pop(id, None)
+
+            if not cell_objects:
+                del self._cells[cell]
+
+        return 0
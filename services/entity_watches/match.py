@@ -1,5 +1,4 @@
 import dataclasses
-import re
 import typing
 
 import neo4j
@@ -8,12 +7,14 @@ import sqlmodel
 import log
 import models
 import services.entities
+import services.entity_locations
 import services.entity_watches
-import services.graph.distance
+import services.entity_watches.matcher
 import services.graph.query
 import services.graph.session
 import services.graph.tx
-import services.mql
+
+from .matcher import CompiledWatch
 
 
 @dataclasses.dataclass
@@ -25,7 +26,13 @@ class Struct:
 
 
 class Match:
-    """find all matching watches for the specified entity set"""
+    """
+    find all matching watches for the specified entity set
+
+    watches are matched with the process-wide compiled watch matcher, see services.entity_watches.matcher; with geo
+    index, geofence watches are matched locally against the entity location with the matcher geofence index,
+    otherwise each geofence is matched with a graph query
+    """
 
     def __init__(
         self,
@@ -33,18 +40,14 @@ class Match:
         neo: neo4j.Session,
         entity_ids: typing.Sequence[int | str],
         topic: typing.Optional[str] = None,
+        geo_index: bool = True,
     ):
         self._db = db
         self._neo = neo
         self._entity_ids = entity_ids
         self._topic = topic
+        self._geo_index = geo_index
 
-        if self._topic:
-            self._query = f"topic:{self._topic}"
-        else:
-            self._query = ""
-
-        self._tokens_geo = ["geo", "geofence"]
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -56,19 +59,36 @@ class Match:
         if not entities:
             return struct
 
-        # get watches
-        struct_watches = services.entity_watches.List(self._db, self._query, 0, 100).call()
-
-        for watch in struct_watches.objects:
-            if self._watch_entities_matches(watch, entities) != 0:
-                # watch does not match
+        # get watches with predicates matching any entity, and geo watches
+        compiled_watches = services.entity_watches.matcher.get().match(
+            db=self._db,
+            entities=entities,
+            topic=self._topic,
+            geo_index=self._geo_index,
+            point=self._entity_point(entities[0]) if self._geo_index else None,
+        )
+
+        for compiled in compiled_watches:
+            if compiled.geo and not self._geo_index and self._watch_entity_geo_match(compiled, entities[0]) != 0:
+                # geo match failed
                 continue
 
-            struct.watches.append(watch)
+            struct.watches.append(compiled.watch)
             struct.count += 1
 
         return struct
 
+    def _entity_point(self, entity: models.Entity) -> typing.Optional[tuple[float, float]]:
+        """entity location (lat, lon), or None if entity has no location"""
+        entity_locations = services.entity_locations.get_all_by_entity_ids(db=self._db, ids=[entity.entity_id])
+
+        if not entity_locations:
+            return None
+
+        point = entity_locations[0].point
+
+        return (point.y, point.x)
+
     def _get_all_entities(self) -> list[models.Entity]:
         entities = []
 
@@ -77,69 +97,22 @@ class Match:
 
         return entities
 
-    def _tokens_partition(self, tokens: list[dict]) -> dict:
-        hash: dict = {
-            "geo": [],
-            "normal": [],
-        }
-
-        for token in tokens:
-            if token["field"] in self._tokens_geo:
-                hash["geo"].append(token)
-            else:
-                hash["normal"].append(token)
-
-        return hash
-
-    def _watch_entities_matches(self, watch: models.EntityWatch, entities: list[models.Entity]) -> int:
+    def _watch_entity_geo_match(self, compiled: CompiledWatch, entity: models.Entity) -> int:
         """returns 0 if watch matches entity; 1 otherwise"""
 
-        # parse query tokens into normal and geo
-
-        struct_tokens = services.mql.Parse(watch.query).call()
-
-        tokens_hash = self._tokens_partition(tokens=struct_tokens.tokens)
-
-        matches = 0
+        for geofence in compiled.geofences:
+            struct_graph = services.graph.query.match_geo_filtered_from_point(
+                lat=geofence.lat,
+                lon=geofence.lon,
+                meters=geofence.meters,
+                dst_id=entity.entity_id,
+                dst_label=None,
+            )
 
-        for entity in entities:
-            if self._watch_entity_normal_match(watch, entity, tokens_hash["normal"]) == 0:
-                matches += 1
-
-        if not tokens_hash["geo"]:
-            # no geo tokens, match success
-            return 0 if matches > 0 else 1
-
-        if self._watch_entity_geo_match(watch, entities[0], tokens_hash["geo"]) > 0:
-            # geo match failed
-            return -1
-
-        return 0
+            records = self._watch_entity_geo_query(query=struct_graph.query, params=struct_graph.params)
 
-    def _watch_entity_geo_match(self, watch: models.EntityWatch, entity: models.Entity, tokens: list[dict]) -> int:
-        """returns 0 if watch matches entity; 1 otherwise"""
-
-        for token in tokens:
-            field = token["field"]
-            value = token["value"]
-
-            if field == "geofence":
-                lat, lon, radius = value.split(",")
-
-                meters = services.graph.distance.meters(radius)
-
-                struct_graph = services.graph.query.match_geo_filtered_from_point(
-                    lat=float(lat),
-                    lon=float(lon),
-                    meters=meters,
-                    dst_id=entity.entity_id,
-                    dst_label=None,
-                )
-
-                records = self._watch_entity_geo_query(query=struct_graph.query, params=struct_graph.params)
-
-                if not records:
-                    return 1
+            if not records:
+                return 1
 
         return 0
 
@@ -147,42 +120,3 @@ class Match:
         records = self._neo.read_transaction(services.graph.tx.read, query, params)
 
         return records
-
-    def _watch_entity_normal_match(self, watch: models.EntityWatch, entity: models.Entity, tokens: list[dict]) -> int:
-        """returns 0 if watch matches entity; 1 otherwise"""
-
-        for token in tokens:
-            field = token["field"]
-            value = token["value"]
-
-            # check if watch query field matches
-            object_value = entity.__dict__.get(field, None)
-
-            if not object_value:
-                return 1
-
-            # check if watch query value matches
-            if re.match(r"^~", value):
-                # regex match
-                value_normal = re.sub(r"~", "", value)
-
-                if not (re.match(rf"{value_normal}", object_value)):
-                    return 1
-            elif re.match(r"\S+\|\S+", value):  # or version 1
-                # in match
-                values = value.split("|")
-
-                if object_value not in values:
-                    return 1
-            elif re.match(r"\S+\,\S+", value):  # or version 2
-                # in match
-                values = value.split(",")
-
-                if object_value not in values:
-                    return 1
-            else:
-                # equal match
-                if object_value != value:
-                    return 1
-
-        return 0
@@ -0,0 +1,88 @@
+import dataclasses
+import re
+import typing
+
+import sqlmodel
+
+import log
+import models
+import services.entities
+import services.entity_locations
+import services.entity_watches.matcher
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    watches: dict[str, list[models.EntityWatch]]  # entity id => matching watches, in entity id order
+    count: int
+    errors: list[str]
+
+
+class MatchBatch:
+    """
+    find matching watches for each entity in a batch of entity ids
+
+    entities and entity locations for the whole batch are loaded with one query each, then each entity set is matched
+    with the compiled watch matcher, geofence watches are matched with its geofence index; each entity id is matched
+    the same as Match with the geo index
+    """
+
+    def __init__(self, db: sqlmodel.Session, entity_ids: typing.Sequence[int | str], topic: typing.Optional[str] = None):
+        self._db = db
+        self._entity_ids = list(dict.fromkeys(str(id) for id in entity_ids))  # unique, keep order
+        self._topic = topic
+
+        self._logger = log.init("service")
+
+    def call(self) -> Struct:
+        struct = Struct(0, {}, 0, [])
+
+        if not self._entity_ids:
+            return struct
+
+        entities = self._entities_by_id()
+
+        # entity locations keyed by entity id of the first entity in each set
+        entity_locations = {
+            entity_location.entity_id: entity_location
+            for entity_location in services.entity_locations.get_all_by_entity_ids(
+                db=self._db,
+                ids=list({entities_[0].entity_id for entities_ in entities.values()}),
+            )
+        } if entities else {}
+
+        matcher = services.entity_watches.matcher.get()
+
+        for entity_id in self._entity_ids:
+            if not (entities_ := entities.get(entity_id)):
+                continue
+
+            point = None
+
+            if entity_location := entity_locations.get(entities_[0].entity_id):
+                point = (entity_location.point.y, entity_location.point.x)
+
+            compiled_watches = matcher.match(db=self._db, entities=entities_, topic=self._topic, geo_index=True, point=point)
+
+            struct.watches[entity_id] = [compiled.watch for compiled in compiled_watches]
+            struct.count += len(compiled_watches)
+
+        return struct
+
+    def _entities_by_id(self) -> dict[str, list[models.Entity]]:
+        """map entity ids to entity objects, ids are either entity object ids or entity ids"""
+        ids_object = [id for id in self._entity_ids if re.match(r"^\d+$", id)]
+        ids_entity = [id for id in self._entity_ids if not re.match(r"^\d+$", id)]
+
+        entities: dict[str, list[models.Entity]] = {}
+
+        if ids_object:
+            for entity in services.entities.get_all_by_ids(db=self._db, ids=[int(id) for id in ids_object]):  # type: ignore
+                entities.setdefault(str(entity.id), []).append(entity)
+
+        if ids_entity:
+            for entity in services.entities.get_all_by_ids(db=self._db, ids=ids_entity):  # type: ignore
+                entities.setdefault(entity.entity_id, []).append(entity)
+
+        return entities
@@ -0,0 +1,297 @@
+import dataclasses
+import re
+import threading
+import time
+import typing
+
+import sqlalchemy
+import sqlmodel
+
+import log
+import models
+import services.graph.distance
+import services.mql
+import services.mql.compile
+
+from .geo_index import Geofence, GeoIndex
+
+CHECK_INTERVAL: float = 1.0  # seconds between watch table change checks
+
+OP_EQ = "eq"
+OP_IN = "in"
+OP_REGEX = "regex"
+
+TOKENS_GEO = ["geo", "geofence"]
+
+
+@dataclasses.dataclass
+class Predicate:
+    field: str
+    op: str
+    values: tuple[str, ...]
+    regex: typing.Optional[re.Pattern]
+
+    def match(self, entity: models.Entity) -> bool:
+        object_value = entity.__dict__.get(self.field, None)
+
+        if not object_value:
+            return False
+
+        if self.op == OP_REGEX:
+            return self.regex.match(object_value) is not None  # type: ignore
+
+        if self.op == OP_IN:
+            return object_value in self.values
+
+        return object_value == self.values[0]
+
+
+@dataclasses.dataclass
+class CompiledWatch:
+    watch: models.EntityWatch
+    predicates: list[Predicate]
+    geo: bool  # watch has geo tokens, its predicates are not evaluated
+    geofences: list[Geofence]
+
+    def match(self, entity: models.Entity) -> bool:
+        return all(predicate.match(entity) for predicate in self.predicates)
+
+
+class _Index:
+    """compiled watches for a topic, indexed by equality and in predicate field values"""
+
+    def __init__(self, watches: list[CompiledWatch]):
+        self.values: dict[str, dict[typing.Any, list[CompiledWatch]]] = {}  # field => value => watches
+        self.scan: list[CompiledWatch] = []  # watches with no indexed predicate
+
+        # watches with each field value, used to index each watch by its most selective predicate
+        counts: dict[tuple[str, typing.Any], int] = {}
+
+        for compiled in watches:
+            for predicate in compiled.predicates:
+                if predicate.op in [OP_EQ, OP_IN]:
+                    for value in predicate.values:
+                        counts[(predicate.field, value)] = counts.get((predicate.field, value), 0) + 1
+
+        for compiled in watches:
+            predicates = [predicate for predicate in compiled.predicates if predicate.op in [OP_EQ, OP_IN]]
+
+            if not predicates:
+                self.scan.append(compiled)
+                continue
+
+            # an entity must match every predicate, so indexing by any one of them is sufficient
+            predicate = min(predicates, key=lambda predicate: sum(counts[(predicate.field, value)] for value in predicate.values))
+
+            for value in predicate.values:
+                self.values.setdefault(predicate.field, {}).setdefault(value, []).append(compiled)
+
+    def candidates(self, entity: models.Entity) -> typing.Iterator[CompiledWatch]:
+        for field, values in self.values.items():
+            try:
+                yield from values.get(entity.__dict__.get(field, None), [])
+            except TypeError:
+                # unhashable entity value, can not match an indexed value
+                continue
+
+        yield from self.scan
+
+
+class Matcher:
+    """
+    In memory entity watch matcher.
+
+    All watches are loaded and compiled once into predicates, with precompiled regexes and in sets, and indexed by
+    topic and by the field value of their most selective equality or in predicate, so an entity only checks the
+    watches indexed by its own field values plus the watches with no equality predicate.
+
+    Watches with geo tokens are kept in a geofence grid index per topic, see GeoIndex, so an entity location is only
+    tested against the geofences around it.
+
+    Watches are reloaded when the watch table changes, checked at most every check interval, or when invalidated after
+    a watch create or delete; unchanged watches are not recompiled and the geofence indexes are updated incrementally.
+    """
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self._check_interval = check_interval
+
+        self._compiled: dict[int, CompiledWatch] = {}  # watch id => compiled watch
+        self._indexes: dict[str, _Index] = {}  # topic => index
+        self._geo_indexes: dict[str, GeoIndex] = {}  # topic => geo watch index
+        self._version: typing.Optional[tuple] = None
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+        self._logger = log.init("service")
+
+    def invalidate(self) -> int:
+        """reload watches on next match"""
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+        return 0
+
+    def match(
+        self,
+        db: sqlmodel.Session,
+        entities: list[models.Entity],
+        topic: typing.Optional[str] = None,
+        geo_index: bool = False,
+        point: typing.Optional[tuple[float, float]] = None,
+    ) -> list[CompiledWatch]:
+        """
+        returns compiled watches, in watch id order, with predicates matching any entity, and watches with geo tokens
+
+        with geo index, geo watches are matched against the first entity location point (lat, lon) using the geofence
+        index, an entity with no location only matches geo watches with no geofences; otherwise all geo watches are
+        returned and the caller matches them
+        """
+        topics = self._topics_match(db=db, topic=topic)
+
+        matches: dict[int, CompiledWatch] = {}
+
+        for topic_ in topics:
+            if geo_index_ := self._geo_indexes.get(topic_):
+                if geo_index:
+                    compiled_watches = geo_index_.match(*(point or (None, None)))
+                else:
+                    compiled_watches = geo_index_.objects()
+
+                for compiled in compiled_watches:
+                    matches[compiled.watch.id] = compiled
+
+            if index := self._indexes.get(topic_):
+                for entity in entities:
+                    for compiled in index.candidates(entity):
+                        if compiled.watch.id not in matches and compiled.match(entity):
+                            matches[compiled.watch.id] = compiled  # type: ignore
+
+        return [matches[id] for id in sorted(matches.keys())]
+
+    def _topics_match(self, db: sqlmodel.Session, topic: typing.Optional[str]) -> list[str]:
+        """watch topics matching topic query value, all topics if there is no topic"""
+        with self._lock:
+            self._reload_check(db=db, time_now=time.monotonic())
+
+            topics = set(self._indexes.keys()) | set(self._geo_indexes.keys())
+
+        if not topic:
+            return list(topics)
+
+        # match topic with the same ops as a 'topic:value' watch list query
+        for term in services.mql.compile.parse(f"topic:{topic}"):
+            if term.op == services.mql.compile.OP_IN:
+                return [value for value in term.values if value in topics]
+            elif term.op == services.mql.compile.OP_LIKE:
+                return [key for key in topics if term.values[0] in key]
+            else:
+                return [topic] if topic in topics else []
+
+        return []
+
+    def _reload_check(self, db: sqlmodel.Session, time_now: float) -> None:
+        """reload watches if the watch table changed, checked at most every check interval, caller must hold lock"""
+        if self._version is not None and time_now < self._checked_at + self._check_interval:
+            return
+
+        self._checked_at = time_now
+
+        model = models.EntityWatch
+
+        version = tuple(db.exec(sqlmodel.select(sqlalchemy.func.count(model.id), sqlalchemy.func.max(model.id))).one())  # type: ignore
+
+        if version == self._version:
+            return
+
+        watches = db.exec(sqlmodel.select(model).order_by(model.id)).all()  # type: ignore
+
+        compiled_watches: dict[int, CompiledWatch] = {}
+
+        for watch in watches:
+            compiled = self._compiled.get(watch.id)
+
+            if compiled is None or compiled.watch.pack() != watch.pack():
+                try:
+                    compiled = watch_compile(watch=models.EntityWatch(**watch.pack()))
+                except Exception as e:
+                    self._logger.error(f"{__name__} watch {watch.id} query '{watch.query}' compile error {e!r}")
+                    continue
+
+            compiled_watches[watch.id] = compiled
+
+        # update geo indexes with removed, changed and added geo watches
+        for id, compiled in self._compiled.items():
+            if compiled.geo and compiled_watches.get(id) is not compiled:
+                self._geo_indexes[compiled.watch.topic].remove(id)
+
+        for id, compiled in compiled_watches.items():
+            if compiled.geo and self._compiled.get(id) is not compiled:
+                self._geo_indexes.setdefault(compiled.watch.topic, GeoIndex()).add(id, compiled.geofences, compiled)
+
+        self._geo_indexes = {topic: geo_index for topic, geo_index in self._geo_indexes.items() if len(geo_index)}
+
+        # rebuild equality indexes
+        topics: dict[str, list[CompiledWatch]] = {}
+
+        for compiled in compiled_watches.values():
+            if not compiled.geo:
+                topics.setdefault(compiled.watch.topic, []).append(compiled)
+
+        self._compiled = compiled_watches
+        self._indexes = {topic: _Index(compiled_topic) for topic, compiled_topic in topics.items()}
+        self._version = version
+
+        self._logger.info(f"{__name__} loaded watches {len(watches)} topics {len(topics)} geo topics {len(self._geo_indexes)}")
+
+
+def watch_compile(watch: models.EntityWatch) -> CompiledWatch:
+    """compile watch query into predicates and geofences"""
+    compiled = CompiledWatch(watch=watch, predicates=[], geo=False, geofences=[])
+
+    for token in services.mql.Parse(watch.query).call().tokens:
+        field = token["field"]
+        value = token["value"]
+
+        if field in TOKENS_GEO:
+            compiled.geo = True
+
+            if field == "geofence":
+                lat, lon, radius = value.split(",")
+
+                compiled.geofences.append(Geofence(lat=float(lat), lon=float(lon), meters=services.graph.distance.meters(radius)))
+        elif re.match(r"^~", value):
+            # regex match
+            compiled.predicates.append(Predicate(field=field, op=OP_REGEX, values=(), regex=re.compile(re.sub(r"~", "", value))))
+        elif re.match(r"\S+\|\S+", value):
+            compiled.predicates.append(Predicate(field=field, op=OP_IN, values=tuple(value.split("|")), regex=None))
+        elif re.match(r"\S+\,\S+", value):
+            compiled.predicates.append(Predicate(field=field, op=OP_IN, values=tuple(value.split(",")), regex=None))
+        else:
+            compiled.predicates.append(Predicate(field=field, op=OP_EQ, values=(value,), regex=None))
+
+    return compiled
+
+
+# process-wide matcher
+_matcher: typing.Optional[Matcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get() -> Matcher:
+    """get process-wide watch matcher, creating it on first use"""
+    global _matcher
+
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = Matcher()
+
+    return _matcher
+
+
+def invalidate() -> int:
+    if _matcher:
+        _matcher.invalidate()
+
+    return 0
@@ -1,3 +1,4 @@
+import concurrent.futures
 import dataclasses
 import typing
 
@@ -10,18 +11,19 @@ import services.mql
 class Struct:
     code: int
     count: int
+    futures: list[concurrent.futures.Future]  # resolved by message delivery reports
     errors: list[str]
 
 
 class Publish:
-    """publish entity messages for the specified watch and entity list"""
+    """publish entity messages for the specified watch and entity list, messages are enqueued without waiting for delivery"""
 
     def __init__(self, watches: list[models.EntityWatch], entity_ids: typing.Sequence[typing.Union[int, str]]):
         self._watches = watches
         self._entity_ids = entity_ids
 
     def call(self) -> Struct:
-        struct = Struct(0, 0, [])
+        struct = Struct(0, 0, [], [])
 
         for watch in self._watches:
             for entity_id in self._entity_ids:
@@ -31,5 +33,6 @@ class Publish:
 
                 if struct_publish.code == 0:
                     struct.count += 1
+                    struct.futures.append(struct_publish.future)  # type: ignore
 
         return struct
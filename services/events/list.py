@@ -1,5 +1,4 @@
 import dataclasses
-import re
 
 import sqlmodel
 from sqlmodel.sql.expression import Select, SelectOfScalar
@@ -22,6 +21,14 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.Event,
+    fields={
+        "name": services.mql.Field(models.Event.name, ops=services.mql.OPS_LIKE),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 20):
         self._db = db
@@ -29,8 +36,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.Event
-        self._dataset = sqlmodel.select(models.Event)  # default database query
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -38,27 +43,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
-
-        struct_tokens = services.mql.Parse(self._query).call()
+        # compile query, statements are cached by query shape
 
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
 
-        for token in struct_tokens.tokens:
-            value = token["value"]
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
 
-            if token["field"] == "name":
-                match = re.match(r"^~", value)
+        struct.errors += struct_compile.errors
 
-                if match:
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.name.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.name == value)
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
 
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
         struct.count = len(struct.objects)
 
         return struct
@@ -1,2 +1,3 @@
+from .read_many import read_many  # noqa: F401
 from .service_check import service_check  # noqa: F401
 from .status import status_up
@@ -0,0 +1,151 @@
+import collections
+import dataclasses
+import json
+import os
+import threading
+import time
+import typing
+
+import neo4j
+
+from .query.types import GraphQuery
+
+# query cache defaults, override with NEO4J_CACHE_SIZE, NEO4J_CACHE_TTL
+CACHE_SIZE: int = 1024  # max cached query results
+CACHE_TTL: float = 60.0  # seconds, bounds staleness for writes made by other processes
+
+
+@dataclasses.dataclass
+class CacheMetrics:
+    generation: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class QueryCache:
+    """
+    Graph query result cache keyed by query template and params.
+
+    Each result is stored with the graph generation it was read at; results from an older generation, or older than
+    ttl seconds, are misses. The least recently used results are evicted when the cache is full.
+    """
+
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self._size = size
+        self._ttl = ttl
+
+        self._results: collections.OrderedDict[tuple[str, str], tuple[int, float, list[neo4j.Record]]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, query: GraphQuery) -> typing.Optional[list[neo4j.Record]]:
+        """get cached query records, or None if query is not cached for the current generation"""
+        key = _key(query)
+        time_now = time.monotonic()
+
+        with self._lock:
+            cached = self._results.get(key)
+
+            if cached and cached[0] == _generation and cached[1] > time_now:
+                self._results.move_to_end(key)
+                self._hits += 1
+                return list(cached[2])
+
+            if cached:
+                del self._results[key]
+
+            self._misses += 1
+
+            return None
+
+    def set(self, query: GraphQuery, records: list[neo4j.Record], generation: int) -> int:
+        """cache query records read at the specified generation, records read at an older generation are not cached"""
+        if generation != _generation:
+            return 409
+
+        key = _key(query)
+
+        with self._lock:
+            self._results[key] = (generation, time.monotonic() + self._ttl, list(records))
+            self._results.move_to_end(key)
+
+            while len(self._results) > self._size:
+                self._results.popitem(last=False)
+                self._evictions += 1
+
+        return 0
+
+    def invalidate(self) -> int:
+        """clear cached results"""
+        with self._lock:
+            self._results.clear()
+
+        return 0
+
+    def metrics(self) -> CacheMetrics:
+        with self._lock:
+            total = self._hits + self._misses
+
+            return CacheMetrics(
+                generation=_generation,
+                size=len(self._results),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                hit_ratio=round(self._hits / total, 3) if total else 0.0,
+            )
+
+
+# graph generation, bumped by graph sync operators after each graph write
+_generation: int = 0
+_generation_lock = threading.Lock()
+
+# process-wide query cache
+_cache: typing.Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def generation() -> int:
+    return _generation
+
+
+def generation_bump() -> int:
+    """bump graph generation, invalidating all cached query results, returns new generation"""
+    global _generation
+
+    with _generation_lock:
+        _generation += 1
+
+    if _cache:
+        _cache.invalidate()
+
+    return _generation
+
+
+def get() -> QueryCache:
+    """get process-wide query cache, creating it on first use"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryCache(
+                    size=int(os.environ.get("NEO4J_CACHE_SIZE", CACHE_SIZE)),
+                    ttl=float(os.environ.get("NEO4J_CACHE_TTL", CACHE_TTL)),
+                )
+
+    return _cache
+
+
+def metrics() -> CacheMetrics:
+    return get().metrics()
+
+
+def _key(query: GraphQuery) -> tuple[str, str]:
+    return (query.query, json.dumps(query.params, sort_keys=True, default=str))
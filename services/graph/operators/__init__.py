@@ -1,2 +1,3 @@
 from .entity_location_sync import EntityLocationSync  # noqa: F401
 from .graph_sync import GraphSync  # noqa: F401
+from .graph_sync_bulk import GraphSyncBulk  # noqa: F401
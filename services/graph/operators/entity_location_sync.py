@@ -8,6 +8,7 @@ import models
 import services.entities
 import services.entity_locations
 import services.graph
+import services.graph.cache
 import services.graph.sync
 
 
@@ -77,4 +78,6 @@ class EntityLocationSync:
 
         self._neo.write_transaction(services.graph.tx.write, query_update, params)
 
+        services.graph.cache.generation_bump()
+
         return 1
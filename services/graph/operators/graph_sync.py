@@ -5,6 +5,8 @@ import sqlmodel
 
 import services.entities
 import services.graph
+import services.graph.cache
+import services.graph.operators.graph_sync_bulk
 import services.graph.sync
 
 
@@ -23,13 +25,16 @@ class Struct:
 class GraphSync:
     """
     sync entity database object to graph database
+
+    bulk mode applies all node and edge changes with batched statements in a single transaction, see GraphSyncBulk
     """
 
-    def __init__(self, db: sqlmodel.Session, neo: neo4j.Session, entity_id: str, entity_code: int):
+    def __init__(self, db: sqlmodel.Session, neo: neo4j.Session, entity_id: str, entity_code: int, bulk: bool = False):
         self._db = db
         self._neo = neo
         self._entity_id = entity_id
         self._entity_code = entity_code
+        self._bulk = bulk
 
     def call(self) -> Struct:
         struct = Struct(0, 0, 0, [], 0, 0, [], [])
@@ -38,6 +43,15 @@ class GraphSync:
             struct.code = 422
             return struct
 
+        if self._bulk:
+            struct_bulk = services.graph.operators.graph_sync_bulk.GraphSyncBulk(
+                db=self._db,
+                neo=self._neo,
+                entity_ids=[self._entity_id],
+            ).call()
+
+            return Struct(**dataclasses.asdict(struct_bulk))
+
         struct_list = services.entities.List(
             db=self._db,
             query=f"entity_id:{self._entity_id} state:active",
@@ -117,4 +131,6 @@ class GraphSync:
 
         struct.nodes_deleted += prune_nodes.nodes_deleted
 
+        services.graph.cache.generation_bump()
+
         return struct
@@ -0,0 +1,278 @@
+import dataclasses
+
+import more_itertools
+import neo4j
+import sqlmodel
+
+import log
+import models
+import services.graph.cache
+import services.graph.query.types
+
+BATCH_SIZE = 1000
+
+EDGE_HAS = "has"
+EDGE_LINKED = "linked"
+
+ENTITY_SLUG_ID = "id"
+
+
+@dataclasses.dataclass
+class Plan:
+    entity_ids: list[str]
+    nodes_entity: dict[str, list[dict]]  # entity name => rows
+    nodes_property: list[dict]
+    nodes_link: list[dict]
+    edges_has: dict[str, list[dict]]  # entity name => rows
+    edges_linked: dict[str, list[dict]]  # entity name => rows
+    props_active: dict[str, set[str]]  # entity id => property node ids
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    nodes_deleted: int
+    nodes_created: int
+    nodes: list[dict]
+    edges_created: int
+    edges_deleted: int
+    edges: list[dict]
+    errors: list[str]
+
+
+class GraphSyncBulk:
+    """
+    sync a batch of entity database objects to graph database
+
+    all node merges, edge merges and prunes for each batch are applied with parameterized 'unwind $rows' statements in a single write transaction
+    """
+
+    def __init__(self, db: sqlmodel.Session, neo: neo4j.Session, entity_ids: list[str], batch_size: int = BATCH_SIZE):
+        self._db = db
+        self._neo = neo
+        self._entity_ids = list(dict.fromkeys(entity_ids))  # unique, keep order
+        self._batch_size = batch_size
+
+        self._logger = log.init("service")
+
+    def call(self) -> Struct:
+        struct = Struct(0, 0, 0, [], 0, 0, [], [])
+
+        if not self._entity_ids:
+            struct.code = 422
+            return struct
+
+        data_links = self._data_links_by_src()
+        entities_count = 0
+
+        for entity_ids in more_itertools.chunked(self._entity_ids, self._batch_size):
+            entities = self._entities_active(entity_ids=entity_ids)
+            entities_count += len(entities)
+
+            if not entities:
+                continue
+
+            plan = self._plan(entities=entities, data_links=data_links)
+
+            struct_batch = self._neo.write_transaction(self._tx_sync, plan)
+
+            struct.nodes_created += struct_batch.nodes_created
+            struct.nodes_deleted += struct_batch.nodes_deleted
+            struct.edges_created += struct_batch.edges_created
+            struct.edges_deleted += struct_batch.edges_deleted
+            struct.edges += struct_batch.edges
+
+        if not entities_count:
+            struct.code = 404
+        else:
+            services.graph.cache.generation_bump()
+
+        self._logger.info(
+            f"{__name__} entities {len(self._entity_ids)} nodes created {struct.nodes_created} deleted {struct.nodes_deleted} "
+            f"edges created {struct.edges_created} deleted {struct.edges_deleted}"
+        )
+
+        return struct
+
+    def _data_links_by_src(self) -> dict[tuple[str, str], list[models.DataLink]]:
+        """load all data links once, indexed by [src_name, src_slug]"""
+        data_links: dict[tuple[str, str], list[models.DataLink]] = {}
+
+        for data_link in self._db.exec(sqlmodel.select(models.DataLink)).all():  # type: ignore
+            data_links.setdefault((data_link.src_name, data_link.src_slug), []).append(data_link)
+
+        return data_links
+
+    def _entities_active(self, entity_ids: list[str]) -> list[models.Entity]:
+        model = models.Entity
+
+        dataset = sqlmodel.select(model).where(model.entity_id.in_(entity_ids)).where(model.state == models.entity.STATE_ACTIVE)  # type: ignore
+
+        return self._db.exec(dataset).all()
+
+    def _plan(self, entities: list[models.Entity], data_links: dict[tuple[str, str], list[models.DataLink]]) -> Plan:
+        """collect node and edge rows for all entities in batch"""
+        plan = Plan(
+            entity_ids=list(dict.fromkeys(entity.entity_id for entity in entities)),
+            nodes_entity={},
+            nodes_property=[],
+            nodes_link=[],
+            edges_has={},
+            edges_linked={},
+            props_active={},
+        )
+
+        for entity in entities:
+            plan.props_active.setdefault(entity.entity_id, set()).add(f"{entity.slug}:{entity.type_value}")
+
+            if entity.node == 0:
+                continue
+
+            if entity.slug == ENTITY_SLUG_ID:
+                plan.nodes_entity.setdefault(entity.entity_name, []).append(
+                    {"id": entity.entity_id, "name": entity.name, "version": entity.version}
+                )
+            else:
+                plan.nodes_property.append({"id": f"{entity.slug}:{entity.type_value}"})
+
+            if entity.node == 1:
+                plan.edges_has.setdefault(entity.entity_name, []).append(
+                    {"src_id": entity.entity_id, "dst_id": f"{entity.slug}:{entity.type_value}"}
+                )
+
+            for data_link in data_links.get((entity.entity_name, entity.slug), []):
+                link_id = f"{data_link.name_slug_str}:{entity.type_value}"
+
+                plan.nodes_link.append({"id": link_id})
+
+                if entity.type_value is not None:
+                    plan.edges_linked.setdefault(entity.entity_name, []).append({"src_id": entity.entity_id, "dst_id": link_id})
+
+        return plan
+
+    def _prune_rows(self, plan: Plan, records: list[neo4j.Record]) -> dict[str, list[dict]]:
+        """
+        find entity property edges for properties that no longer exist, and link edges related to those properties
+
+        returns rows grouped by entity name and neighbor label
+        """
+        rows: dict[str, list[dict]] = {}
+
+        records_by_entity: dict[str, list[neo4j.Record]] = {}
+
+        for record in records:
+            records_by_entity.setdefault(record["entity_id"], []).append(record)
+
+        for entity_id, entity_records in records_by_entity.items():
+            props_active = plan.props_active.get(entity_id, set())
+
+            record_props = [record for record in entity_records if models.entity.LABEL_PROPERTY in record["node"].labels]
+            record_links = [record for record in entity_records if models.entity.LABEL_LINK in record["node"].labels]
+
+            props_deleted = [record for record in record_props if record["node"].get("id") not in props_active]
+
+            for record in props_deleted:
+                key = f"{record['entity_name']}:{models.entity.LABEL_PROPERTY}"
+                rows.setdefault(key, []).append({"src_id": entity_id, "dst_id": record["node"].get("id")})
+
+                for record_link in record_links:
+                    if _node_link_deleted(link_id=record_link["node"].get("id"), entity_name=record["entity_name"], property=record["node"].get("id")):
+                        key = f"{record['entity_name']}:{models.entity.LABEL_LINK}"
+                        rows.setdefault(key, []).append({"src_id": entity_id, "dst_id": record_link["node"].get("id")})
+
+        return rows
+
+    def _tx_sync(self, tx: neo4j.Transaction, plan: Plan) -> Struct:
+        """apply batch plan within a single transaction"""
+        struct = Struct(0, 0, 0, [], 0, 0, [], [])
+
+        # create entity, property and link nodes
+
+        for entity_name, rows in plan.nodes_entity.items():
+            summary = tx.run(
+                f"unwind $rows as row merge (n:{entity_name}:{models.entity.LABEL_ENTITY} {{id: row.id}}) set n.name = row.name, n.version = row.version",
+                {"rows": rows},
+            ).consume()
+            struct.nodes_created += summary.counters.nodes_created
+
+        if plan.nodes_property:
+            summary = tx.run(
+                f"unwind $rows as row merge (n:{models.entity.LABEL_PROPERTY} {{id: row.id}})",
+                {"rows": plan.nodes_property},
+            ).consume()
+            struct.nodes_created += summary.counters.nodes_created
+
+        if plan.nodes_link:
+            summary = tx.run(
+                f"unwind $rows as row merge (n:{models.entity.LABEL_LINK} {{id: row.id}})",
+                {"rows": plan.nodes_link},
+            ).consume()
+            struct.nodes_created += summary.counters.nodes_created
+
+        # create entity 'has' edges to properties, and 'linked' edges to links
+
+        for entity_name, rows in plan.edges_has.items():
+            struct.edges += self._tx_edges_create(tx, entity_name, models.entity.LABEL_PROPERTY, EDGE_HAS, rows)
+
+        for entity_name, rows in plan.edges_linked.items():
+            struct.edges += self._tx_edges_create(tx, entity_name, models.entity.LABEL_LINK, EDGE_LINKED, rows)
+
+        struct.edges_created = len(struct.edges)
+
+        # prune edges to deleted properties and their links
+
+        graph_query = self._query_node_edges(plan)
+
+        records = [record for record in tx.run(graph_query.query, graph_query.params)]
+
+        for key, rows in self._prune_rows(plan, records).items():
+            entity_name, dst_label = key.split(":")
+
+            summary = tx.run(
+                f"unwind $rows as row match (s:{entity_name}:{models.entity.LABEL_ENTITY} {{id: row.src_id}})-[edge]-(d:{dst_label} {{id: row.dst_id}}) delete edge",
+                {"rows": rows},
+            ).consume()
+            struct.edges_deleted += summary.counters.relationships_deleted
+
+        # prune unconnected nodes
+
+        summary = tx.run("match(node) where (node:link or node:property) and (not (node)--()) delete node").consume()
+        struct.nodes_deleted += summary.counters.nodes_deleted
+
+        return struct
+
+    def _tx_edges_create(self, tx: neo4j.Transaction, src_name: str, dst_label: str, edge_name: str, rows: list[dict]) -> list[dict]:
+        """create edges that do not exist in either direction, returns edges created"""
+        query = (
+            f"unwind $rows as row match (a:{src_name} {{id: row.src_id}}), (b:{dst_label} {{id: row.dst_id}})"
+            + f" where not (a)-[:{edge_name}]-(b) create (a)-[r:{edge_name}]->(b) return a.id as s, b.id as d"
+        )
+
+        return [{"s": record["s"], "d": record["d"], "e": edge_name} for record in tx.run(query, {"rows": rows})]
+
+    def _query_node_edges(self, plan: Plan) -> services.graph.query.types.GraphQuery:
+        struct = services.graph.query.types.GraphQuery("", {})
+
+        struct.query = (
+            f"unwind $ids as id match (n:{models.entity.LABEL_ENTITY} {{id: id}})-[edge]-(node)"
+            + f" return n.id as entity_id, [label in labels(n) where label <> '{models.entity.LABEL_ENTITY}'][0] as entity_name, node"
+        )
+        struct.params = {"ids": plan.entity_ids}
+
+        return struct
+
+
+def _node_link_deleted(link_id: str, entity_name: str, property: str) -> bool:
+    """
+    returns true if link node is related to the property that has been deleted
+
+    link_id: link node id, e.g. case_jacket_id:person_record_id:1001
+    property: entity property that has been deleted, e.g record_id:1000
+    """
+    src_name, dst_name, obj_value = link_id.split(":")
+    lnk_name, lnk_value = f"{entity_name}_{property}".split(":")
+
+    if lnk_value != obj_value:
+        return False
+
+    return (src_name == lnk_name) or (dst_name == lnk_name)
@@ -1,5 +1,5 @@
 from .execute import execute, execute_with_summary  # noqa: F401
-from .match_all import match_all, match_all_no_edges, match_all_with_edges  # noqa: F401
+from .match_all import match_all, match_all_no_edges, match_all_page, match_all_page_edges, match_all_with_edges  # noqa: F401
 from .match_count import (  # noqa: F401
     match_edges_count,
     match_node_count,
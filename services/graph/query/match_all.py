@@ -1,3 +1,5 @@
+import typing
+
 from .types import GraphQuery
 
 
@@ -26,3 +28,37 @@ def match_all_with_edges() -> GraphQuery:
     struct.query = "match(node)-[edge]-() return node, edge"
 
     return struct
+
+
+def match_all_page(after: typing.Optional[int], offset: int, limit: int) -> GraphQuery:
+    """
+    query for a page of nodes ordered by node id
+
+    pages are keyed by the last node id of the previous page, if specified, which is stable as nodes are added and
+    does not scan skipped nodes, otherwise by offset
+    """
+    struct = GraphQuery("", {"limit": limit})
+
+    if after is not None:
+        struct.query = "match (node) where id(node) > $after return node order by id(node) limit $limit"
+        struct.params["after"] = after
+    else:
+        struct.query = "match (node) return node order by id(node) skip $offset limit $limit"
+        struct.params["offset"] = offset
+
+    return struct
+
+
+def match_all_page_edges(ids: list[int]) -> GraphQuery:
+    """
+    query for edges of a page of nodes
+
+    each edge is returned with the page of its endpoint with the highest node id, so every edge endpoint is in the
+    same page or a previous page
+    """
+    struct = GraphQuery("", {})
+
+    struct.query = "match (node)-[edge]-(other) where id(node) in $ids and id(other) <= id(node) return node, edge"
+    struct.params = {"ids": ids}
+
+    return struct
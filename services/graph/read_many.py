@@ -0,0 +1,78 @@
+import concurrent.futures
+import os
+import threading
+import typing
+
+import neo4j
+
+import services.graph.tx
+
+from .cache import QueryCache, generation
+from .query.types import GraphQuery
+
+# max concurrent graph reads per process, override with NEO4J_READ_CONCURRENCY
+READ_CONCURRENCY: int = 8
+
+_executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def read_many(
+    queries: list[GraphQuery],
+    neo: typing.Optional[neo4j.Session] = None,
+    session_factory: typing.Optional[typing.Callable[[], neo4j.Session]] = None,
+    cache: typing.Optional[QueryCache] = None,
+) -> list[list[neo4j.Record]]:
+    """
+    run independent read queries, returns records for each query in query order
+
+    with a session factory, e.g. services.graph.session.get, queries run concurrently on a shared thread pool, each in
+    its own pooled session, so the latency is roughly the slowest query; otherwise queries run sequentially on neo
+
+    with a cache, cached query results are returned without a read, and the remaining results are cached
+    """
+    if cache is None:
+        return _read_many(queries, neo=neo, session_factory=session_factory)
+
+    generation_read = generation()
+
+    results = [cache.get(query) for query in queries]
+    misses = [index for index, records in enumerate(results) if records is None]
+
+    for index, records in zip(misses, _read_many([queries[index] for index in misses], neo=neo, session_factory=session_factory)):
+        cache.set(queries[index], records, generation=generation_read)
+        results[index] = records
+
+    return results  # type: ignore
+
+
+def _executor_get() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("NEO4J_READ_CONCURRENCY", READ_CONCURRENCY)),
+                    thread_name_prefix="neo-read",
+                )
+
+    return _executor
+
+
+def _read(session_factory: typing.Callable[[], neo4j.Session], query: GraphQuery) -> list[neo4j.Record]:
+    with session_factory() as neo:
+        return neo.read_transaction(services.graph.tx.read, query.query, query.params)
+
+
+def _read_many(
+    queries: list[GraphQuery],
+    neo: typing.Optional[neo4j.Session],
+    session_factory: typing.Optional[typing.Callable[[], neo4j.Session]],
+) -> list[list[neo4j.Record]]:
+    if session_factory is None or (neo is not None and len(queries) < 2):
+        return [neo.read_transaction(services.graph.tx.read, query.query, query.params) for query in queries]  # type: ignore
+
+    futures = [_executor_get().submit(_read, session_factory, query) for query in queries]
+
+    return [future.result() for future in futures]
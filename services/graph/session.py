@@ -1,12 +1,113 @@
+import dataclasses
 import os
 import re
+import threading
 import typing
 
 import neo4j
 
+# driver pool defaults, override with NEO4J_POOL_SIZE, NEO4J_POOL_ACQUIRE_TIMEOUT, NEO4J_POOL_LIVENESS_TIMEOUT
+POOL_ACQUIRE_TIMEOUT: float = 60.0  # seconds
+POOL_LIVENESS_TIMEOUT: float = 30.0  # seconds, idle connections older than this are checked before use
+POOL_SIZE: int = 100
+
+
+@dataclasses.dataclass
+class PoolMetrics:
+    uri: str
+    size: int
+    in_use: int
+    idle: int
+
+
+# process-wide driver registry keyed by uri; drivers are thread safe and own their connection pool
+_drivers: dict[str, neo4j.Driver] = {}
+_drivers_lock = threading.Lock()
+_drivers_pid: int = os.getpid()
+
 
 def get(uri: typing.Optional[str] = None) -> neo4j.Session:
-    return _get_driver(uri=uri).session(database=_get_db_name(uri=uri))
+    return driver(uri=uri).session(database=_get_db_name(uri=uri))
+
+
+def driver(uri: typing.Optional[str] = None) -> neo4j.Driver:
+    """get cached driver for the specified uri, creating it on first use"""
+    global _drivers_pid
+
+    key = uri or os.environ["NEO4J_HOST_URL"]
+
+    if _drivers_pid != os.getpid():
+        # forked process, connections are not shared across processes
+        with _drivers_lock:
+            _drivers.clear()
+            _drivers_pid = os.getpid()
+
+    if driver_ := _drivers.get(key):
+        return driver_
+
+    with _drivers_lock:
+        if key not in _drivers:
+            _drivers[key] = _get_driver(uri=key)
+
+        return _drivers[key]
+
+
+def close(uri: typing.Optional[str] = None) -> int:
+    """close cached driver for the specified uri"""
+    key = uri or os.environ["NEO4J_HOST_URL"]
+
+    with _drivers_lock:
+        driver_ = _drivers.pop(key, None)
+
+    if not driver_:
+        return 404
+
+    driver_.close()
+
+    return 0
+
+
+def close_all() -> int:
+    """close all cached drivers, called during process shutdown"""
+    with _drivers_lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+
+    for driver_ in drivers:
+        driver_.close()
+
+    return len(drivers)
+
+
+def metrics() -> list[PoolMetrics]:
+    """pool metrics for each cached driver, connection counts are 0 if the driver pool can not be inspected"""
+    objects = []
+
+    with _drivers_lock:
+        items = list(_drivers.items())
+
+    for key, driver_ in items:
+        in_use, total = _pool_counts(driver_)
+
+        objects.append(
+            PoolMetrics(
+                uri=_uri_redact(key),
+                size=_pool_size(),
+                in_use=in_use,
+                idle=total - in_use,
+            )
+        )
+
+    return objects
+
+
+def verify(uri: typing.Optional[str] = None) -> int:
+    """check driver connectivity, returns 0 if server is reachable"""
+    try:
+        driver(uri=uri).verify_connectivity()
+        return 0
+    except Exception:
+        return -1
 
 
 def _get_db_name(uri: typing.Optional[str] = None) -> str:
@@ -36,7 +137,41 @@ def _get_driver(uri: typing.Optional[str] = None) -> neo4j.Driver:
         uri_ = f"neo4j://{host}:{port}"
     else:
         # hope the uri is valid
+        usr = os.environ["NEO4J_USER"]
+        pwd = os.environ["NEO4J_PASSWORD"]
         uri_ = uri
-        # raise ValueError("invalid uri")
 
-    return neo4j.GraphDatabase.driver(uri_, auth=(usr, pwd))
+    driver_ = neo4j.GraphDatabase.driver(
+        uri_,
+        auth=(usr, pwd),
+        connection_acquisition_timeout=float(os.environ.get("NEO4J_POOL_ACQUIRE_TIMEOUT", POOL_ACQUIRE_TIMEOUT)),
+        liveness_check_timeout=float(os.environ.get("NEO4J_POOL_LIVENESS_TIMEOUT", POOL_LIVENESS_TIMEOUT)),
+        max_connection_pool_size=_pool_size(),
+    )
+
+    return driver_
+
+
+def _pool_counts(driver_: neo4j.Driver) -> tuple[int, int]:
+    """returns (in use, total) connection counts across all pool addresses, read only and (0, 0) if not available"""
+    pool = getattr(driver_, "_pool", None)
+    connections = getattr(pool, "connections", {})
+
+    in_use = 0
+    total = 0
+
+    for address in list(connections):
+        for connection in list(connections.get(address, ())):
+            total += 1
+            in_use += 1 if getattr(connection, "in_use", False) else 0
+
+    return in_use, total
+
+
+def _pool_size() -> int:
+    return int(os.environ.get("NEO4J_POOL_SIZE", POOL_SIZE))
+
+
+def _uri_redact(uri: str) -> str:
+    """remove credentials from uri"""
+    return re.sub(r"^neo4j://(\S+):(\S+)@", "neo4j://", uri)
@@ -6,6 +6,7 @@ import sqlmodel
 
 import log
 import models
+import services.graph.cache
 import services.graph.query
 import services.graph.query.types
 import services.graph.tx
@@ -80,6 +81,9 @@ class PruneNodeEntity:
             summary = self._neo.write_transaction(services.graph.tx.write, graph_query.query, graph_query.params)
             struct.edges_deleted += summary.counters.relationships_deleted
 
+        if struct.edges_deleted:
+            services.graph.cache.generation_bump()
+
         return struct
 
     def _node_link_deleted(self, node: neo4j.graph.Node, property: str) -> int:
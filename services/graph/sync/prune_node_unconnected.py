@@ -5,6 +5,7 @@ import neo4j.graph
 
 import log
 import models
+import services.graph.cache
 import services.graph.query
 import services.graph.query.types
 import services.graph.tx
@@ -37,6 +38,9 @@ class PruneNodeUnconnected:
         summary = self._neo.write_transaction(services.graph.tx.write, graph_query.query, graph_query.params)
         struct.nodes_deleted += summary.counters.nodes_deleted
 
+        if struct.nodes_deleted:
+            services.graph.cache.generation_bump()
+
         return struct
 
     def _query_node_delete(self) -> services.graph.query.types.GraphQuery:
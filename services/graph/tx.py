@@ -1,4 +1,5 @@
 import collections
+import typing
 
 import neo4j
 
@@ -11,6 +12,17 @@ def read(tx: neo4j.Transaction, query: str, params: dict) -> list[neo4j.Record]:
     return records
 
 
+def read_stream(session: neo4j.Session, query: str, params: dict) -> typing.Iterator[neo4j.Record]:
+    """
+    iterate over query records as they are fetched from the server, in batches of the session fetch size, instead of
+    materializing all records
+
+    the read transaction is open until the iterator is exhausted or closed
+    """
+    with session.begin_transaction() as tx:
+        yield from tx.run(query, params)
+
+
 def read_summary(tx: neo4j.Transaction, query: str, params: dict) -> GraphResult:
     result = tx.run(query, params)
     records = [record for record in result]
@@ -7,6 +7,7 @@ import typing
 import attrs
 
 import kafka
+import kafka.producer
 import log
 import models
 import services.database.session
@@ -25,10 +26,62 @@ class Struct:
 
 
 @attrs.define
-class GraphHandler(kafka.Handler):
+class GraphHandler(kafka.BatchHandler):
+    """
+    handle graph sync messages
+
+    message batches are processed together, 'entity.geo.changed' entity ids are deduplicated, watches are matched for
+    all entities with set based queries and matching watch messages are published with one producer flush
+
+    result codes are the same as for a single message, an invalid message is 422 and an exception is 500; valid
+    messages in the batch are still processed, but the batch is not acked
+    """
+
     _topic: str = services.kafka.topics.TOPIC_GRAPH_SYNC
     _logger: logging.Logger = log.init("actor")
 
+    async def call_batch(self, msgs: list[models.KafkaMessage]) -> kafka.KafkaResult:
+        struct = kafka.KafkaResult(0, [])
+
+        task_name = asyncio.current_task().get_name()  # type: ignore
+
+        self._logger.info(f"actor '{task_name}' batch {len(msgs)}")
+
+        entity_ids: dict[str, None] = {}  # geo changed entity ids, ordered by latest message
+
+        for msg in msgs:
+            try:
+                message_object = json.loads(msg.value())
+
+                if message_object["name"] == "entity.changed":
+                    # deprecated: process message
+                    pass
+                elif message_object["name"] == "entity.geo.changed":
+                    entity_ids.pop(str(message_object["id"]), None)
+                    entity_ids[str(message_object["id"])] = None
+                else:
+                    struct.code = struct.code or 422
+                    struct.errors.append("invalid message")
+                    self._logger.error(f"actor '{task_name}' invalid message {message_object}")
+            except Exception as e:
+                struct.code = 500
+                struct.errors.append(f"invalid message {e}")
+                self._logger.error(f"actor '{task_name}' exception {e}")
+
+        if not entity_ids:
+            return struct
+
+        try:
+            count = await asyncio.to_thread(self._geo_changed_batch, list(entity_ids.keys()))
+
+            self._logger.info(f"actor '{task_name}' processed entities {len(entity_ids)} messages {len(msgs)} published {count}")
+        except Exception as e:
+            struct.code = 500
+
+            self._logger.error(f"actor '{task_name}' exception {e}")
+
+        return struct
+
     async def call(self, msg: models.KafkaMessage) -> kafka.KafkaResult:
         struct = kafka.KafkaResult(0, [])
 
@@ -77,3 +130,21 @@ class GraphHandler(kafka.Handler):
             self._logger.error(f"actor '{task_name}' exception {e}")
 
         return struct
+
+    def _geo_changed_batch(self, entity_ids: list[str]) -> int:
+        """match and publish watches for geo changed entities, returns number of messages published"""
+        with services.database.session.get() as db:
+            struct_watches = services.entity_watches.MatchBatch(db=db, entity_ids=entity_ids, topic=self._topic).call()
+
+        count = 0
+
+        for entity_id, watches in struct_watches.watches.items():
+            struct_publish = services.entity_watches.Publish(watches=watches, entity_ids=[entity_id]).call()
+
+            count += struct_publish.count
+
+        # wait for all messages in batch to be delivered
+        if count and kafka.producer.flush() > 0:
+            raise RuntimeError("publish flush timeout")
+
+        return count
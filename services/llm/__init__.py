@@ -0,0 +1,7 @@
+from .manager import ModelMetrics  # noqa: F401
+from .manager import Struct  # noqa: F401
+from .manager import close_all  # noqa: F401
+from .manager import generate  # noqa: F401
+from .manager import generate_async  # noqa: F401
+from .manager import generate_stream  # noqa: F401
+from .manager import metrics  # noqa: F401
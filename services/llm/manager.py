@@ -0,0 +1,265 @@
+import asyncio
+import collections
+import concurrent.futures
+import dataclasses
+import os
+import threading
+import time
+import typing
+
+import llama_cpp
+
+import log
+
+# model manager defaults, override with LLM_MEMORY_BUDGET_MB, LLM_CONCURRENCY, LLM_QUEUE_MAX
+CONCURRENCY: int = 1  # concurrent generations per model
+MEMORY_BUDGET_MB: int = 8192  # loaded model files, least recently used idle models are unloaded over budget
+N_CTX: int = 2048
+QUEUE_MAX: int = 16  # pending generations per model, including running generations
+
+logger = log.init("app")
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    text: str
+    load_msec: float
+    queue_msec: float
+    generate_msec: float
+    errors: list[str]
+
+
+@dataclasses.dataclass
+class ModelMetrics:
+    path: str
+    loaded: bool
+    size_mb: float
+    pending: int
+    generations: int
+
+
+class _Model:
+    """model loaded on first use, generations run on the model executor, which queues generations over concurrency"""
+
+    def __init__(self, path: str, n_ctx: int):
+        self.path = path
+        self.n_ctx = n_ctx
+        self.size_bytes = os.path.getsize(path)
+
+        self.llm: typing.Optional[llama_cpp.Llama] = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=_concurrency(), thread_name_prefix="llm")
+        self.generations = 0
+        self.pending = 0
+
+        self.lock = threading.Lock()
+
+
+# process-wide models keyed by path, in least recently used order
+_models: collections.OrderedDict[str, _Model] = collections.OrderedDict()
+_models_lock = threading.Lock()
+
+
+def generate(path: str, prompt: str, n_ctx: int = N_CTX, **kwargs) -> Struct:
+    """generate completion for prompt, blocks until the generation completes"""
+    model, struct = _submit_check(path=path, n_ctx=n_ctx)
+
+    if struct.code != 0:
+        return struct
+
+    return model.executor.submit(_generate, model, prompt, time.monotonic(), kwargs).result()
+
+
+async def generate_stream(path: str, prompt: str, n_ctx: int = N_CTX, **kwargs) -> typing.AsyncIterator[str]:
+    """
+    generate completion for prompt, yielding tokens as they are generated
+
+    generation stops when the iterator is closed or cancelled, e.g. when a streaming client disconnects
+    """
+    model, struct = _submit_check(path=path, n_ctx=n_ctx)
+
+    if struct.code != 0:
+        raise RuntimeError(struct.errors[0])
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def _token_put(token: typing.Any) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, token)
+
+    future = model.executor.submit(_generate_stream, model, prompt, kwargs, _token_put, cancelled)
+
+    try:
+        while True:
+            token = await queue.get()
+
+            if token is None:
+                break
+
+            if isinstance(token, BaseException):
+                raise token
+
+            yield token
+    finally:
+        cancelled.set()
+
+        # wait for generation to stop, so the next queued generation can start
+        await asyncio.wrap_future(future)
+
+
+async def generate_async(path: str, prompt: str, n_ctx: int = N_CTX, **kwargs) -> Struct:
+    """generate completion for prompt, on the model executor and off the event loop"""
+    model, struct = _submit_check(path=path, n_ctx=n_ctx)
+
+    if struct.code != 0:
+        return struct
+
+    return await asyncio.wrap_future(model.executor.submit(_generate, model, prompt, time.monotonic(), kwargs))
+
+
+def close_all() -> int:
+    """unload all models, called during process shutdown"""
+    with _models_lock:
+        models = list(_models.values())
+        _models.clear()
+
+    for model in models:
+        model.executor.shutdown(wait=True, cancel_futures=True)
+        _unload(model)
+
+    return len(models)
+
+
+def metrics() -> list[ModelMetrics]:
+    with _models_lock:
+        models = list(_models.values())
+
+    return [
+        ModelMetrics(
+            path=model.path,
+            loaded=model.llm is not None,
+            size_mb=round(model.size_bytes / 1024 / 1024, 1),
+            pending=model.pending,
+            generations=model.generations,
+        )
+        for model in models
+    ]
+
+
+def _concurrency() -> int:
+    return int(os.environ.get("LLM_CONCURRENCY", CONCURRENCY))
+
+
+def _generate(model: _Model, prompt: str, t_submit: float, kwargs: dict) -> Struct:
+    """load model if needed and generate completion, runs on the model executor"""
+    struct = Struct(0, "", 0.0, 0.0, 0.0, [])
+
+    t_start = time.monotonic()
+    struct.queue_msec = round((t_start - t_submit) * 1000, 2)
+
+    try:
+        _load(model)
+
+        t_loaded = time.monotonic()
+        struct.load_msec = round((t_loaded - t_start) * 1000, 2)
+
+        response = model.llm(prompt, **kwargs)
+
+        struct.text = response.get("choices")[0].get("text").strip()
+        struct.generate_msec = round((time.monotonic() - t_loaded) * 1000, 2)
+
+        model.generations += 1
+    except Exception as e:
+        struct.code = 500
+        struct.errors.append(f"generate exception {e}")
+    finally:
+        with _models_lock:
+            model.pending -= 1
+
+    return struct
+
+
+def _generate_stream(model: _Model, prompt: str, kwargs: dict, token_put: typing.Callable, cancelled: threading.Event) -> None:
+    """load model if needed and stream completion tokens to token_put, followed by None, runs on the model executor"""
+    try:
+        if not cancelled.is_set():
+            _load(model)
+
+            chunks = model.llm(prompt, stream=True, **kwargs)  # type: ignore
+
+            try:
+                for chunk in chunks:
+                    if cancelled.is_set():
+                        break
+
+                    token_put(chunk["choices"][0]["text"])
+            finally:
+                chunks.close()
+
+            model.generations += 1
+
+        token_put(None)
+    except Exception as e:
+        token_put(e)
+    finally:
+        with _models_lock:
+            model.pending -= 1
+
+
+def _budget_check(model: _Model) -> None:
+    """unload least recently used idle models until model fits in memory budget"""
+    budget_bytes = int(os.environ.get("LLM_MEMORY_BUDGET_MB", MEMORY_BUDGET_MB)) * 1024 * 1024
+
+    with _models_lock:
+        loaded = [model_ for model_ in _models.values() if model_.llm is not None and model_ is not model]
+
+        size_bytes = sum(model_.size_bytes for model_ in loaded) + model.size_bytes
+
+        for model_ in loaded:
+            if size_bytes <= budget_bytes:
+                break
+
+            if model_.pending > 0:
+                continue
+
+            _unload(model_)
+            size_bytes -= model_.size_bytes
+
+            logger.info(f"{__name__} model '{os.path.basename(model_.path)}' unloaded")
+
+
+def _load(model: _Model) -> None:
+    with model.lock:
+        if model.llm is None:
+            _budget_check(model)
+
+            model.llm = llama_cpp.Llama(model_path=model.path, n_ctx=model.n_ctx, use_mmap=True, verbose=False)
+
+            logger.info(f"{__name__} model '{os.path.basename(model.path)}' loaded")
+
+
+def _submit_check(path: str, n_ctx: int) -> tuple[_Model, Struct]:
+    """get model, creating it on first use, and reserve a queue slot"""
+    struct = Struct(0, "", 0.0, 0.0, 0.0, [])
+
+    with _models_lock:
+        if (model := _models.get(path)) is None:
+            model = _models[path] = _Model(path=path, n_ctx=n_ctx)
+
+        _models.move_to_end(path)
+
+        if model.pending >= int(os.environ.get("LLM_QUEUE_MAX", QUEUE_MAX)):
+            struct.code = 429
+            struct.errors.append(f"model '{os.path.basename(path)}' queue full")
+        else:
+            model.pending += 1
+
+    return model, struct
+
+
+def _unload(model: _Model) -> None:
+    llm, model.llm = model.llm, None
+
+    if llm is not None and hasattr(llm, "close"):
+        llm.close()
@@ -1 +1,3 @@
+from .compile import Compile, Field, Schema, Term, parse  # noqa: F401
+from .compile import OPS_DEFAULT, OPS_LIKE, OPS_LIKE_IN, OPS_RANGE, OPS_TAGS, OPS_TEXT  # noqa: F401
 from .parse import Parse
@@ -0,0 +1,238 @@
+import dataclasses
+import functools
+import threading
+import typing
+
+import sqlalchemy
+import sqlmodel
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from .parse import Parse
+
+# this disables the warning: SAWarning: Class SelectOfScalar will not make use of SQL compilation caching
+SelectOfScalar.inherit_cache = True  # type: ignore
+Select.inherit_cache = True  # type: ignore
+
+OP_EQ = "eq"
+OP_FALSE = "false"  # invalid term, matches no rows
+OP_GT = "gt"
+OP_IN = "in"
+OP_LIKE = "like"
+OP_LT = "lt"
+OP_TAGS = "tags"
+OP_TEXT = "text"
+
+OPS_DEFAULT = frozenset([OP_EQ])
+OPS_LIKE = frozenset([OP_EQ, OP_LIKE])
+OPS_LIKE_IN = frozenset([OP_EQ, OP_IN, OP_LIKE])
+OPS_RANGE = frozenset([OP_GT, OP_LT])
+OPS_TAGS = frozenset([OP_TAGS])
+OPS_TEXT = frozenset([OP_TEXT])
+
+PARSE_CACHE_SIZE = 1024
+STATEMENT_CACHE_SIZE = 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class Term:
+    field: str
+    op: str
+    values: tuple[str, ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Field:
+    column: typing.Any  # model column, e.g. models.User.email
+    ops: frozenset[str] = OPS_DEFAULT
+    cast: typing.Optional[typing.Callable] = None  # map query value to column value, e.g. timestamp to datetime
+
+
+@dataclasses.dataclass
+class Schema:
+    """mql schema for a model, maps query field names to model columns"""
+
+    model: typing.Any
+    fields: dict[str, Field]
+    name: str = ""
+
+
+@dataclasses.dataclass
+class Struct:
+    code: int
+    dataset: typing.Any  # parameterized select statement, cached by query shape
+    params: dict[str, typing.Any]
+    terms: tuple[Term, ...]
+    errors: list[str]
+
+
+# compiled statements keyed by schema name and query shape
+_statements: dict[tuple, typing.Any] = {}
+_statements_lock = threading.Lock()
+
+
+class Compile:
+    """
+    compile mql query into a parameterized select statement
+
+    terms with an unknown field, an op the field does not support or a value that can not be cast are reported as
+    errors, with code 422, and compiled to a predicate matching no rows, so an invalid term never widens the query
+
+    queries with the same shape, e.g. 'name:~foo' and 'name:~bar', share the same cached statement and differ only
+    in their bound params, which allows sqlalchemy to re-use its compiled statement cache
+    """
+
+    def __init__(self, schema: Schema, query: str):
+        self._schema = schema
+        self._query = query
+
+    def call(self) -> Struct:
+        struct = Struct(0, None, {}, (), [])
+
+        terms = parse(self._query)
+
+        # validate fields, ops and values against schema, invalid terms match no rows
+        values = []
+
+        for term in terms:
+            if term.field not in self._schema.fields:
+                struct.errors.append(f"invalid field '{term.field}'")
+                values.append((_term_false(term), None))
+                continue
+
+            term = _term_resolve(self._schema, term)
+
+            if term.op not in self._schema.fields[term.field].ops:
+                struct.errors.append(f"invalid op '{term.op}' for field '{term.field}'")
+                values.append((_term_false(term), None))
+                continue
+
+            try:
+                values.append((term, self._value(term)))
+            except ValueError:
+                struct.errors.append(f"invalid value '{_term_value(term)}' for field '{term.field}'")
+                values.append((_term_false(term), None))
+
+        if struct.errors:
+            struct.code = 422
+
+        struct.terms = tuple(term for term, _ in values)
+        struct.params = {f"p_{index}": value for index, (term, value) in enumerate(values) if term.op != OP_FALSE}
+
+        shape = (self._schema.name or self._schema.model.__name__, tuple((term.field, term.op) for term in struct.terms))
+
+        if (dataset := _statements.get(shape)) is None:
+            dataset = self._statement(struct.terms)
+
+            with _statements_lock:
+                if len(_statements) < STATEMENT_CACHE_SIZE:
+                    dataset = _statements.setdefault(shape, dataset)
+
+        struct.dataset = dataset
+
+        return struct
+
+    def _statement(self, terms: tuple[Term, ...]) -> typing.Any:
+        dataset = sqlmodel.select(self._schema.model)
+
+        for index, term in enumerate(terms):
+            if term.op == OP_FALSE:
+                dataset = dataset.where(sqlalchemy.false())
+                continue
+
+            column = self._schema.fields[term.field].column
+            param = sqlalchemy.bindparam(f"p_{index}", expanding=(term.op == OP_IN))
+
+            if term.op == OP_GT:
+                dataset = dataset.where(column > param)
+            elif term.op == OP_IN:
+                dataset = dataset.where(column.in_(param))
+            elif term.op in [OP_LIKE, OP_TAGS]:
+                dataset = dataset.where(column.like(param))
+            elif term.op == OP_LT:
+                dataset = dataset.where(column < param)
+            elif term.op == OP_TEXT:
+                dataset = dataset.where(sqlalchemy.func.to_tsvector(column).match(param))
+            else:
+                dataset = dataset.where(column == param)
+
+        return dataset
+
+    def _value(self, term: Term) -> typing.Any:
+        """map term values to a bound param value"""
+        cast = self._schema.fields[term.field].cast or (lambda value: value)
+
+        if term.op == OP_IN:
+            return [cast(value) for value in term.values]
+        elif term.op == OP_LIKE:
+            return f"%{term.values[0]}%"
+        elif term.op == OP_TAGS:
+            # tags are stored as '|' delimited values
+            return f"%|{term.values[0]}|%"
+
+        return cast(term.values[0])
+
+
+def parse(query: str) -> tuple[Term, ...]:
+    """parse query into terms, field ops are resolved against the schema when the query is compiled"""
+    return _parse(query)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(query: str) -> tuple[Term, ...]:
+    terms = []
+
+    for token in Parse(query).call().tokens:
+        terms.append(_term(field=token["field"], value=token["value"]))
+
+    return tuple(terms)
+
+
+def _term(field: str, value: str) -> Term:
+    if value.startswith("~"):
+        return Term(field=field, op=OP_LIKE, values=(value.replace("~", ""),))
+
+    if value.startswith("<"):
+        return Term(field=field, op=OP_LT, values=(value.replace("<", ""),))
+
+    if value.startswith(">"):
+        return Term(field=field, op=OP_GT, values=(value.replace(">", ""),))
+
+    if "|" in value and all(value.split("|")):
+        return Term(field=field, op=OP_IN, values=tuple(value.split("|")))
+
+    return Term(field=field, op=OP_EQ, values=(value,))
+
+
+def _term_false(term: Term) -> Term:
+    """invalid term, compiled to a predicate matching no rows, like the literal comparison it replaces"""
+    return Term(field=term.field, op=OP_FALSE, values=term.values)
+
+
+def _term_resolve(schema: Schema, term: Term) -> Term:
+    ops = schema.fields[term.field].ops
+
+    if term.op in ops:
+        return term
+
+    if OP_TAGS in ops:
+        return Term(field=term.field, op=OP_TAGS, values=(_term_value(term),))
+
+    if OP_TEXT in ops:
+        return Term(field=term.field, op=OP_TEXT, values=(_term_value(term),))
+
+    if OP_EQ in ops:
+        # field does not support op, treat raw value as an equality match
+        return Term(field=term.field, op=OP_EQ, values=(_term_value(term),))
+
+    return term
+
+
+def _term_value(term: Term) -> str:
+    """raw query value for term"""
+    if term.op == OP_LIKE:
+        return f"~{term.values[0]}"
+    if term.op == OP_LT:
+        return f"<{term.values[0]}"
+    if term.op == OP_GT:
+        return f">{term.values[0]}"
+    return "|".join(term.values)
@@ -1,3 +1,5 @@
+import base64
+import binascii
 import dataclasses
 import re
 import typing
@@ -12,6 +14,8 @@ import gql.types
 import log
 import models
 import services.cities
+import services.graph
+import services.graph.cache
 import services.graph.distance
 import services.graph.query
 import services.graph.tx
@@ -22,6 +26,12 @@ SelectOfScalar.inherit_cache = True  # type: ignore
 Select.inherit_cache = True  # type: ignore
 
 
+@dataclasses.dataclass
+class PageInfo:
+    end_cursor: typing.Optional[str]  # pass as cursor to get the next page
+    has_next_page: bool
+
+
 @dataclasses.dataclass
 class Struct:
     code: int
@@ -31,21 +41,46 @@ class Struct:
     nodes_count: int
     edges: list[gql.types.GqlEdge]
     edges_count: int
+    page_info: PageInfo
     errors: list[str]
 
 
 class List:
-    def __init__(self, db: sqlmodel.Session, neo: neo4j.Session, query: str = "", offset: int = 0, limit: int = 100):
+    """
+    list graph nodes and edges matching query
+
+    an empty query pages through all nodes, ordered by node id, starting after cursor if specified, otherwise at
+    offset; each page includes the edges between its nodes and the nodes of previous pages
+
+    with a session factory, independent graph reads, e.g. the path node lookups and the query for each radius token,
+    run concurrently in their own sessions; with cache, neighborhood, geo radius and path query results are cached
+    until the next graph sync
+    """
+
+    def __init__(
+        self,
+        db: sqlmodel.Session,
+        neo: neo4j.Session,
+        query: str = "",
+        offset: int = 0,
+        limit: int = 100,
+        cursor: str = "",
+        session_factory: typing.Optional[typing.Callable[[], neo4j.Session]] = None,
+        cache: bool = False,
+    ):
         self._db = db
         self._neo = neo
+        self._session_factory = session_factory
+        self._cache = services.graph.cache.get() if cache else None
         self._query = query
         self._offset = offset
         self._limit = limit
+        self._cursor = cursor
 
         self._logger = log.init("service")
 
     def call(self) -> Struct:
-        struct = Struct(0, None, None, [], 0, [], 0, [])
+        struct = Struct(0, None, None, [], 0, [], 0, PageInfo(None, False), [])
 
         self._logger.info(f"{context.rid_get()} {__name__} db query '{self._query}'")
 
@@ -106,8 +141,14 @@ class List:
                 struct.node_end = self._gql_node(node=path.end_node)
 
         else:
-            records = self._nodes_match_all_with_edges()
-            records += self._nodes_match_all_no_edges()
+            try:
+                after = cursor_decode(self._cursor) if self._cursor else None
+            except ValueError:
+                struct.code = 422
+                struct.errors.append("invalid cursor")
+                return struct
+
+            records = self._nodes_match_page(after=after, page_info=struct.page_info)
 
         # records keys can be 'node', 'edge', or 'path'
         records_node = [record for record in records if "node" in record.keys()]
@@ -179,33 +220,39 @@ class List:
         else:
             return ""
 
-    def _nodes_match_all_no_edges(self) -> list[neo4j.Record]:
-        """find all nodes without edges"""
-        struct_graph = services.graph.query.match_all_no_edges()
+    def _graph_read_many(self, structs_graph: list[services.graph.query.types.GraphQuery]) -> list[list[neo4j.Record]]:
+        """run independent graph queries, concurrently if there is a session factory, using cached results if enabled"""
+        for struct_graph in structs_graph:
+            self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
 
-        self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
+        return services.graph.read_many(structs_graph, neo=self._neo, session_factory=self._session_factory, cache=self._cache)
 
-        records = self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
-
-        return records
+    def _nodes_match_id(self, id: str) -> list[neo4j.Record]:
+        """return records matching node id"""
+        return self._graph_read_many([services.graph.query.match_node(id=id)])[0]
 
-    def _nodes_match_all_with_edges(self) -> list[neo4j.Record]:
-        """find all nodes with edges"""
-        struct_graph = services.graph.query.match_all_with_edges()
+    def _nodes_match_page(self, after: typing.Optional[int], page_info: PageInfo) -> list[neo4j.Record]:
+        """find page of nodes and their edges"""
+        struct_graph = services.graph.query.match_all_page(after=after, offset=self._offset, limit=self._limit + 1)
 
         self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
 
-        records = self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
+        records = list(services.graph.tx.read_stream(self._neo, struct_graph.query, struct_graph.params))
 
-        return records
+        if len(records) > self._limit:
+            records = records[:self._limit]
+            page_info.has_next_page = True
 
-    def _nodes_match_id(self, id: str) -> list[neo4j.Record]:
-        """return records matching node id"""
-        struct_graph = services.graph.query.match_node(id=id)
+        if not records:
+            return []
+
+        page_info.end_cursor = cursor_encode(records[-1]["node"].id)
+
+        struct_graph = services.graph.query.match_all_page_edges(ids=[record["node"].id for record in records])
 
         self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
 
-        return self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
+        return records + list(services.graph.tx.read_stream(self._neo, struct_graph.query, struct_graph.params))
 
     def _nodes_match_paths(self, tokens: list[dict]) -> list[neo4j.Record]:
         """return all shortest paths"""
@@ -219,8 +266,9 @@ class List:
                 # e.g. path:person+1,person+2
                 id_1, id_2 = map(lambda id: id.strip(), value.split(","))
 
-                records_1 = self._nodes_match_id(id=id_1)
-                records_2 = self._nodes_match_id(id=id_2)
+                records_1, records_2 = self._graph_read_many(
+                    [services.graph.query.match_node(id=id_1), services.graph.query.match_node(id=id_2)]
+                )
 
                 if not len(records_1) or not len(records_2):
                     raise ValueError("invalid path node")
@@ -238,11 +286,7 @@ class List:
                     dst_id=node_2.get("id"),
                 )
 
-                self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
-
-                records = self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
-
-                return records
+                return self._graph_read_many([struct_graph])[0]
 
         return []
 
@@ -306,7 +350,7 @@ class List:
     def _search_around_city(self, city: models.City, tokens: list[dict]) -> list[neo4j.Record]:
         assert len(tokens)
 
-        records = []
+        structs_graph: list[services.graph.query.types.GraphQuery] = []
 
         for token in tokens:
             field = token["field"]
@@ -332,16 +376,14 @@ class List:
                 else:
                     raise ValueError("invalid radius")
 
-                self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
-
-                records += self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
+                structs_graph.append(struct_graph)
 
-        return records
+        return [record for records in self._graph_read_many(structs_graph) for record in records]
 
     def _search_around_node(self, node: neo4j.graph.Node, tokens: list[dict]) -> list[neo4j.Record]:
         assert len(tokens)
 
-        records = []
+        structs_graph: list[services.graph.query.types.GraphQuery] = []
 
         for token in tokens:
             field = token["field"]
@@ -378,11 +420,9 @@ class List:
                 else:
                     raise ValueError("invalid radius")
 
-                self._logger.info(f"{context.rid_get()} {__name__} neo query '{struct_graph.query}' params {struct_graph.params}")
-
-                records += self._neo.read_transaction(services.graph.tx.read, struct_graph.query, struct_graph.params)
+                structs_graph.append(struct_graph)
 
-        return records
+        return [record for records in self._graph_read_many(structs_graph) for record in records]
 
     def _tokens_match_city(self, tokens: list[dict]) -> typing.Optional[models.City]:
         """find city token and map to a city object"""
@@ -414,3 +454,21 @@ class List:
                 return self._nodes_match_id(id=token["value"])
 
         return []
+
+
+def cursor_decode(cursor: str) -> int:
+    """map page cursor to node id, raises ValueError if cursor is invalid"""
+    try:
+        prefix, id = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8").split(":")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+
+    if prefix != "node" or not id.isdigit():
+        raise ValueError("invalid cursor")
+
+    return int(id)
+
+
+def cursor_encode(id: int) -> str:
+    """map node id to page cursor"""
+    return base64.urlsafe_b64encode(f"node:{id}".encode("utf-8")).decode("utf-8")
@@ -1,18 +1,27 @@
 import dataclasses
 import os
 import sys
+import typing
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
-import bytewax  # noqa: E402
+import bytewax.dataflow  # noqa: E402
 import bytewax.inputs  # noqa: E402
+import bytewax.outputs  # noqa: E402
+import bytewax.recovery  # noqa: E402
+import more_itertools  # noqa: E402
+import sqlalchemy  # noqa: E402
 import sqlmodel  # noqa: E402
 
 import log  # noqa: E402
+import models  # noqa: E402
 import services.entities  # noqa: E402
 import services.entities.operators  # noqa: E402
-import services.graph.operators  # noqa: E402
-import services.graph.session  # noqa: E402
+import services.entity_locations  # noqa: E402
+import services.timely.inputs.partition  # noqa: E402
+import services.timely.library.cluster  # noqa: E402
+
+BATCH_SIZE = 1000
 
 
 @dataclasses.dataclass
@@ -25,31 +34,63 @@ class Struct:
 class EntityDbSync:
     """
     timely dataflow to sync entity objects to database
+
+    objects are collected into batches by entity primary key bucket, so the same entity is always resolved and
+    persisted by the same worker; each batch is resolved with IdResolveBatch and new entities are persisted with a
+    single commit; with more than 1 worker, each worker uses its own database session
+
+    with a recovery config the flow resumes from its last snapshot; objects replayed after the snapshot resolve to their
+    already persisted entity by primary key, and are not persisted again
     """
 
-    def __init__(self, input: list[tuple[int, dict]], db: sqlmodel.Session):
+    def __init__(
+        self,
+        input: list[tuple[int, dict]],
+        db: typing.Optional[sqlmodel.Session] = None,
+        workers: int = 1,
+        recovery_config: typing.Optional[bytewax.recovery.RecoveryConfig] = None,
+        batch_size: int = BATCH_SIZE,
+    ):
+        if db is not None and workers > 1:
+            raise ValueError("db session can't be shared by workers")
+
         self._input = input
         self._db = db
+        self._workers = workers
+        self._recovery_config = recovery_config
+        self._batch_size = batch_size
 
         self._logger = log.init("service")
 
     def call(self) -> Struct:
         struct = Struct(0, [], [])
 
-        flow_1 = bytewax.Dataflow()
-        # {'person.email': {'value': 'user1@gmail.com', 'type': 'string', 'pk': 1}}}
-        flow_1.map(self._map_entity_id_resolve)
-        # {'person.email': {'value': 'user1@gmail.com', 'type': 'string', 'pk': 1}}, 'person.id': {'value': '123'}, 'code': 200|201|409}
-        flow_1.map(self._map_entity_build)
-        # {'entities': []}
-        flow_1.map(self._map_entity_persist)
-        # {'entity_id': '01GAFJ1MBB1V4TF7AGVQKN4GEK', 'entity_code': 201}
-        flow_1.capture()
+        output: list[dict] = []
+
+        flow_1 = bytewax.dataflow.Dataflow()
+        flow_1.input("input", bytewax.inputs.ManualInputConfig(self._input_builder))
+        self.steps(flow_1)
+        flow_1.capture(bytewax.outputs.TestingOutputConfig(output))
 
-        struct.output = bytewax.run(flow_1, self._input)
+        services.timely.library.cluster.run(flow_1, workers=self._workers, recovery_config=self._recovery_config)
+
+        struct.output = [(1, object) for object in output]
 
         return struct
 
+    def steps(self, flow: bytewax.dataflow.Dataflow) -> bytewax.dataflow.Dataflow:
+        """add entity sync steps to flow"""
+        # {'person.email': {'value': 'user1@gmail.com', 'type': 'string', 'pk': 1}}}
+        services.timely.library.cluster.batch(flow, "entity_pk", services.timely.library.cluster.key_entity_pk)
+        # [{'person.email': {'value': 'user1@gmail.com', 'type': 'string', 'pk': 1}}}, ...]
+        flow.flat_map(self._flat_map_entity_sync)
+        # {'entity_id': '01GAFJ1MBB1V4TF7AGVQKN4GEK', 'code': 200|201|409}
+
+        return flow
+
+    def _db_get(self) -> sqlmodel.Session:
+        return self._db if self._db is not None else services.timely.library.cluster.db_session()
+
     def _entity_id_key(self, object: dict) -> str:
         """returns entity id.key, e.g. person.id, vehicle.id"""
         entity_name = self._entity_name(object)
@@ -61,52 +102,86 @@ class EntityDbSync:
         entity_name, _ = object_keys[0].split(".")
         return entity_name
 
-    def _map_entity_id_resolve(self, object: dict) -> dict:
-        """check pk and get/create id field"""
-        struct_resolve = services.entities.operators.IdResolve(db=self._db, object=object).call()
+    def _entity_sync_batch(self, objects: list[dict]) -> list[dict]:
+        """resolve a batch of objects, build new entities and persist them with a single commit"""
+        db = self._db_get()
 
-        entity_id_key = self._entity_id_key(object)
+        struct_resolve = services.entities.operators.IdResolveBatch(db=db, objects=objects).call()
 
-        object[entity_id_key] = [
-            {
-                "value": struct_resolve.id,
-                "type": "string",
-                "code": struct_resolve.code,
-            }
-        ]
+        results: list[dict] = []
+        builds: list[tuple[dict, list[models.Entity]]] = []  # result, new entities
+
+        for object, struct_id in zip(objects, struct_resolve.objects):
+            if struct_id.code == 422:
+                self._logger.error(f"{__name__} object invalid id {object}")
+                continue
+
+            result = {"code": struct_id.code, "entity_id": struct_id.id}
+
+            if struct_id.code == 201:
+                object[self._entity_id_key(object)] = [{"value": struct_id.id, "type": "string", "code": struct_id.code}]
+
+                struct_build = services.entities.operators.EntityBuild(db=db, object=object).call()
 
-        return object
+                if struct_build.code != 0:
+                    self._logger.error(f"{__name__} object build error {struct_build.code} {object}")
+                    continue
 
-    def _map_entity_build(self, object: dict) -> dict:
-        entity_id_key = self._entity_id_key(object)
+                builds.append((result, struct_build.entities))
 
-        object_id = object[entity_id_key][0]
+            # existing entities, and objects resolved to an entity created earlier in this batch, are not persisted
+            results.append(result)
 
-        if object_id["code"] in [200, 409]:
-            entity_id = object_id["value"]
+        if not builds:
+            return results
 
-            struct_list = services.entities.List(
-                db=self._db,
-                query=f"entity_id:{entity_id}",
-                offset=0,
-                limit=1024,
-            ).call()
+        if self._entities_persist(db=db, entities=[entity for _, entities in builds for entity in entities]) != 0:
+            # batch failed, persist entities individually
+            for result, entities in builds:
+                struct_persist = services.entities.operators.EntityPersist(db=db, entities=entities).call()
 
-            if object_id["code"] == 200:
-                pass  # todo
+                result["code"] = struct_persist.code
 
-            return {"code": object_id["code"], "entities": struct_list.objects}
-        elif object_id["code"] == 201:
-            struct_build = services.entities.operators.EntityBuild(db=self._db, object=object).call()
+        return results
 
-            return {"code": object_id["code"], "entities": struct_build.entities}
+    def _entities_persist(self, db: sqlmodel.Session, entities: list[models.Entity]) -> int:
+        """
+        persist new entities with a single commit, and create a location for each entity set that has one; unlike
+        entities.Create, entity sets without a location don't stop locations being created for the rest of the batch
+        """
+        try:
+            for entity in entities:
+                db.add(entity)
 
-        return object
+            db.commit()
+        except sqlalchemy.exc.IntegrityError as e:
+            db.rollback()
+            self._logger.error(f"{__name__} error {e}")
+            return 409
+        except Exception as e:
+            db.rollback()
+            self._logger.error(f"{__name__} exception {e}")
+            return 500
+
+        struct_locations = services.entity_locations.CreateBulk(db=db, entity_ids=[entity.id for entity in entities if entity.id]).call()
+
+        if struct_locations.code != 0:
+            self._logger.error(f"{__name__} entity locations error {struct_locations.code}")
+
+        return 0
+
+    def _flat_map_entity_sync(self, objects: list[dict]) -> list[dict]:
+        return [
+            result
+            for objects_batch in more_itertools.chunked(objects, self._batch_size)
+            for result in self._entity_sync_batch(objects=objects_batch)
+        ]
 
-    def _map_entity_persist(self, object: dict) -> dict:
-        struct_persist = services.entities.operators.EntityPersist(
-            db=self._db,
-            entities=object["entities"],
-        ).call()
+    def _input_builder(
+        self, worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+    ) -> typing.Generator[tuple[int, dict], None, None]:
+        """yields (next index, object) for each worker input object, a resumed worker continues after next index"""
+        indexes = services.timely.inputs.partition.index_range(len(self._input), worker_index, workers_count)
 
-        return {"code": struct_persist.code, "entity_id": list(struct_persist.entity_ids)[0]}
+        for index in services.timely.inputs.partition.index_resume(indexes, resume_state):
+            yield index + 1, self._input[index][1]
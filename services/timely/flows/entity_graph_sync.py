@@ -1,19 +1,21 @@
 import dataclasses
 import os
 import sys
+import typing
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
-import bytewax  # noqa: E402
+import bytewax.dataflow  # noqa: E402
 import bytewax.inputs  # noqa: E402
+import bytewax.outputs  # noqa: E402
+import bytewax.recovery  # noqa: E402
 import neo4j  # noqa: E402
 import sqlmodel  # noqa: E402
 
 import log  # noqa: E402
-import services.entities  # noqa: E402
-import services.entities.operators  # noqa: E402
 import services.graph.operators  # noqa: E402
-import services.graph.session  # noqa: E402
+import services.timely.inputs.partition  # noqa: E402
+import services.timely.library.cluster  # noqa: E402
 
 
 @dataclasses.dataclass
@@ -26,34 +28,67 @@ class Struct:
 class EntityGraphSync:
     """
     timely dataflow to sync entity objects to graph database
+
+    objects are exchanged by entity id, so the same entity is always synced by the same worker; with more than 1
+    worker, each worker uses its own database and graph sessions
     """
 
-    def __init__(self, input: list[tuple[int, dict]], db: sqlmodel.Session, neo: neo4j.Session):
+    def __init__(
+        self,
+        input: list[tuple[int, dict]],
+        db: typing.Optional[sqlmodel.Session] = None,
+        neo: typing.Optional[neo4j.Session] = None,
+        bulk: bool = False,
+        workers: int = 1,
+        recovery_config: typing.Optional[bytewax.recovery.RecoveryConfig] = None,
+    ):
+        if (db is not None or neo is not None) and workers > 1:
+            raise ValueError("db and neo sessions can't be shared by workers")
+
         self._input = input
         self._db = db
         self._neo = neo
+        self._bulk = bulk
+        self._workers = workers
+        self._recovery_config = recovery_config
 
         self._logger = log.init("service")
 
     def call(self) -> Struct:
         struct = Struct(0, [], [])
 
-        flow_1 = bytewax.Dataflow()
+        output: list[dict] = []
+
+        flow_1 = bytewax.dataflow.Dataflow()
+        flow_1.input("input", bytewax.inputs.ManualInputConfig(self._input_builder))
+        self.steps(flow_1)
+        flow_1.capture(bytewax.outputs.TestingOutputConfig(output))
+
+        services.timely.library.cluster.run(flow_1, workers=self._workers, recovery_config=self._recovery_config)
+
+        struct.output = [(1, object) for object in output]
+
+        return struct
+
+    def steps(self, flow: bytewax.dataflow.Dataflow) -> bytewax.dataflow.Dataflow:
+        """add graph sync steps to flow"""
+        # {'code': 201, 'entity_id': '01GAKG7TGFCTSAVZ6PKV83V85C'}
+        services.timely.library.cluster.exchange(flow, "entity_id", services.timely.library.cluster.key_entity_id)
         # {'code': 201, 'entity_id': '01GAKG7TGFCTSAVZ6PKV83V85C'}
-        flow_1.map(self._graph_object_sync)
+        flow.map(self._graph_object_sync)
         # {'code': 201, 'entity_id': "1XYZABC", "nodes_created": 1, "edges_created": 1}
-        flow_1.map(self._graph_geo_sync)
+        flow.map(self._graph_geo_sync)
         # {'code': 201, entity_id: "1XYZABC", "nodes_created": 1, "edges_created": 1, "geo": 0|1}
-        flow_1.capture()
 
-        struct.output = bytewax.run(flow_1, self._input)
+        return flow
 
-        return struct
+    def _db_get(self) -> sqlmodel.Session:
+        return self._db if self._db is not None else services.timely.library.cluster.db_session()
 
     def _graph_geo_sync(self, object: dict) -> dict:
         struct = services.graph.operators.EntityLocationSync(
-            db=self._db,
-            neo=self._neo,
+            db=self._db_get(),
+            neo=self._neo_get(),
             entity_id=object["entity_id"],
         ).call()
         object["geo"] = struct.geo
@@ -67,10 +102,11 @@ class EntityGraphSync:
 
         if object["code"] in [200, 201]:
             struct = services.graph.operators.GraphSync(
-                db=self._db,
-                neo=self._neo,
+                db=self._db_get(),
+                neo=self._neo_get(),
                 entity_id=object["entity_id"],
                 entity_code=object["code"],
+                bulk=self._bulk,
             ).call()
 
             object["nodes_created"] = struct.nodes_created
@@ -79,3 +115,15 @@ class EntityGraphSync:
             object["edges_deleted"] = struct.edges_deleted
 
         return object
+
+    def _input_builder(
+        self, worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+    ) -> typing.Generator[tuple[int, dict], None, None]:
+        """yields (next index, object) for each worker input object, a resumed worker continues after next index"""
+        indexes = services.timely.inputs.partition.index_range(len(self._input), worker_index, workers_count)
+
+        for index in services.timely.inputs.partition.index_resume(indexes, resume_state):
+            yield index + 1, self._input[index][1]
+
+    def _neo_get(self) -> neo4j.Session:
+        return self._neo if self._neo is not None else services.timely.library.cluster.neo_session()
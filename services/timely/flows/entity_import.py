@@ -7,6 +7,7 @@ sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 import bytewax  # # noqa: E402
 import bytewax.inputs  # # noqa: E402
+import more_itertools  # noqa: E402
 
 import log  # noqa: E402
 import services.database.session  # noqa: E402
@@ -14,6 +15,8 @@ import services.entities.operators  # noqa: E402
 import services.graph.operators  # noqa: E402
 import services.graph.session  # noqa: E402
 
+BATCH_SIZE = 100
+
 
 @dataclasses.dataclass
 class Struct:
@@ -26,8 +29,9 @@ class EntityImport:
     deprecated - timely dataflow to import entities
     """
 
-    def __init__(self, input: typing.Callable):
+    def __init__(self, input: typing.Iterable, batch_size: int = BATCH_SIZE):
         self._input = input
+        self._batch_size = batch_size
 
         self._logger = log.init("service")
 
@@ -36,7 +40,7 @@ class EntityImport:
 
         flow_1 = bytewax.Dataflow()
         # flow_1.filter(self._entity_filter)
-        flow_1.map(self._entity_sync)
+        flow_1.flat_map(self._entity_sync_batch)
         # {entity_id: "1XYZABC"}
         flow_1.map(self._graph_object_sync)
         # {entity_id: "1XYZABC", "nodes_created": 1, "edges_created": 1}
@@ -50,7 +54,7 @@ class EntityImport:
         flow_2 = bytewax.Dataflow()
         flow_2.capture()
 
-        output_1 = bytewax.run(flow_1, self._input)
+        output_1 = bytewax.run(flow_1, self._input_batches())
 
         for epoch, item in bytewax.run(flow_2, output_1):
             self._logger.info(f"flow_2 epoch {epoch} item {item}")
@@ -61,10 +65,21 @@ class EntityImport:
     def _entity_filter(self, object: dict) -> bool:
         return object["id"] in ["01G5386HVMP79PKM21YJGMFG5K"]
 
-    def _entity_sync(self, object: dict) -> dict:
+    def _entity_sync_batch(self, objects: list[dict]) -> list[dict]:
+        """sync a batch of objects with a single resolve query and commit, objects with no entity are dropped"""
         with services.database.session.get() as db:
-            struct = services.entities.operators.ObjectSync(db=db, object=object).call()
-            return {"entity_id": list(struct.entity_ids)[0], "code": struct.code}
+            struct = services.entities.operators.ObjectSyncBatch(db=db, objects=objects).call()
+
+            return [
+                {"entity_id": list(struct_object.entity_ids)[0], "code": struct_object.code}
+                for struct_object in struct.objects
+                if struct_object.entity_ids
+            ]
+
+    def _input_batches(self) -> typing.Iterator[tuple[int, list[dict]]]:
+        """input objects in batches, each batch is in the epoch of its first object"""
+        for batch in more_itertools.chunked(self._input, self._batch_size):
+            yield batch[0][0], [object for _, object in batch]
 
     def _graph_geo_sync(self, object: dict) -> dict:
         with services.database.session.get() as db, services.graph.session.get() as neo:
@@ -8,12 +8,13 @@ sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 import bytewax  # # noqa: E402
 import bytewax.dataflow  # # noqa: E402
-import bytewax.execution  # noqa: E402
 import bytewax.inputs  # noqa: E402
 import bytewax.outputs  # noqa: E402
+import bytewax.recovery  # noqa: E402
 
 import log  # noqa: E402
 import models  # noqa: E402
+import services.timely.library.cluster  # noqa: E402
 
 DATA_MODELS_STATIC = {"name": {"type": "string"}}
 
@@ -35,11 +36,15 @@ class StreamCsv:
         output: bytewax.outputs.OutputConfig,
         data_mapping: models.DataMapping,
         data_models: list[models.DataModel],
+        workers: int = 1,
+        recovery_config: typing.Optional[bytewax.recovery.RecoveryConfig] = None,
     ):
         self._input = input
         self._output = output
         self._data_mapping = data_mapping
         self._data_models = data_models
+        self._workers = workers
+        self._recovery_config = recovery_config
 
         self._obj_mapping = self._data_mapping.obj_mapping
         self._obj_pks_list = self._data_mapping.obj_pks_list
@@ -54,15 +59,21 @@ class StreamCsv:
 
         data_flow = bytewax.dataflow.Dataflow()
         data_flow.input("input", self._input)
-        data_flow.map(self._map_clean)
-        data_flow.map(self._map_transform)
-        data_flow.map(self._map_derived)
+        self.steps(data_flow)
         data_flow.capture(self._output)
 
-        bytewax.execution.run_main(data_flow)
+        services.timely.library.cluster.run(data_flow, workers=self._workers, recovery_config=self._recovery_config)
 
         return struct
 
+    def steps(self, flow: bytewax.dataflow.Dataflow) -> bytewax.dataflow.Dataflow:
+        """add csv object normalize steps to flow"""
+        flow.map(self._map_clean)
+        flow.map(self._map_transform)
+        flow.map(self._map_derived)
+
+        return flow
+
     def _build_data_models_by_name_slug(self) -> dict:
         name_slug_dict = {}
 
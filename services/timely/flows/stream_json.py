@@ -1,13 +1,18 @@
 import dataclasses
 import os
 import sys
+import typing
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 import bytewax  # # noqa: E402
+import bytewax.dataflow  # # noqa: E402
 import bytewax.inputs  # # noqa: E402
+import bytewax.outputs  # # noqa: E402
+import bytewax.recovery  # # noqa: E402
 
 import models  # noqa: E402
+import services.timely.library.cluster  # noqa: E402
 
 
 @dataclasses.dataclass
@@ -21,20 +26,29 @@ def stream_json(
     output: bytewax.outputs.OutputConfig,
     data_mappings: list[models.DataMapping],
     data_models: list[models.DataModel],
+    workers: int = 1,
+    recovery_config: typing.Optional[bytewax.recovery.RecoveryConfig] = None,
 ) -> Struct:
     struct = Struct(0, [])
 
     data_flow = bytewax.dataflow.Dataflow()
     data_flow.input("input", input)
-    data_flow.map(_map_clean)
-    data_flow.map(_map_normalize)
+    stream_json_steps(data_flow)
     data_flow.capture(output)
 
-    bytewax.execution.run_main(data_flow)
+    services.timely.library.cluster.run(data_flow, workers=workers, recovery_config=recovery_config)
 
     return struct
 
 
+def stream_json_steps(flow: bytewax.dataflow.Dataflow) -> bytewax.dataflow.Dataflow:
+    """add json object normalize steps to flow"""
+    flow.map(_map_clean)
+    flow.map(_map_normalize)
+
+    return flow
+
+
 def _map_clean(object: dict) -> dict:
     """
     clean object
@@ -1,7 +1,8 @@
 from .input_csv import (  # noqa: F401
+    input_csv,
     input_csv_generator,
     input_csv_params,
     input_csv_random_generator,
     input_csv_random_params,
 )
-from .input_json import input_json_generator, input_json_params  # noqa: F401
+from .input_json import input_json, input_json_generator, input_json_params  # noqa: F401
@@ -1,31 +1,22 @@
 import contextvars
 import csv
+import functools
 import typing
 
-_input_csv: contextvars.ContextVar = contextvars.ContextVar("input_csv", default="")
-
-
-def input_csv_generator(worker_index: int, workers_count: int, resume_state: str) -> typing.Generator[tuple[int, dict], None, None]:
-    file = _input_csv.get()
+import services.timely.inputs.partition
 
-    if not file:
-        raise ValueError("input file missing")
+_input_csv: contextvars.ContextVar = contextvars.ContextVar("input_csv", default="")
 
-    with open(file) as csvfile:
-        reader_raw = csv.reader(csvfile)
 
-        for fields in reader_raw:
-            # check if row looks like a header line
-            if _csv_header(fields):
-                fieldnames = [field.lower() for field in fields]
-                break
+def input_csv(file: str) -> typing.Callable:
+    """returns csv input builder with file bound, unlike params it is visible to every worker thread and process"""
+    return functools.partial(_input_csv_read, file)
 
-        # continue reading file with dict reader and field names set
-        reader_dict = csv.DictReader(csvfile, fieldnames=fieldnames)
 
-        for row_dict in reader_dict:
-            # print(f"row {row_dict}")
-            yield 1, row_dict
+def input_csv_generator(
+    worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+) -> typing.Generator[tuple[int, dict], None, None]:
+    yield from _input_csv_read(_input_csv.get(), worker_index, workers_count, resume_state)
 
 
 def input_csv_params(file: str) -> int:
@@ -33,34 +24,61 @@ def input_csv_params(file: str) -> int:
     return 0
 
 
+def _input_csv_read(
+    file: str, worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+) -> typing.Generator[tuple[int, dict], None, None]:
+    """
+    yields (next offset, row) with csv rows as dicts, rows after the header line are split across workers by byte range
+
+    the next offset is the input state saved with each recovery snapshot, a resumed worker continues after it; note
+    that rows with quoted newlines must not span a worker range boundary
+    """
+    if not file:
+        raise ValueError("input file missing")
+
+    with open(file, "rb") as csvfile:
+        fieldnames, offset = _csv_header_read(csvfile)
+
+        yield from _csv_rows(csvfile, fieldnames, offset, worker_index, workers_count, resume_state)
+
+
 _input_csv_random: contextvars.ContextVar = contextvars.ContextVar("input_csv_random", default="")
 
 
-def input_csv_random_generator(worker_index: int, workers_count: int, resume_state: str) -> typing.Generator[tuple[int, dict], None, None]:
+def input_csv_random_generator(
+    worker_index: int, workers_count: int, resume_state: typing.Optional[tuple[typing.Optional[int], int]]
+) -> typing.Generator[tuple[tuple[typing.Optional[int], int], dict], None, None]:
+    """
+    yields ((template offset, next row index), row) with count random rows for each csv template row
+
+    the state is the offset of the template row and the index of the next random row, a resumed worker re-reads the
+    template row and continues with the next random row
+    """
     file, count = _input_csv_random.get().split(":")
     count = int(count)
 
     if not file:
         raise ValueError("input file missing")
 
-    with open(file) as csvfile:
-        reader_raw = csv.reader(csvfile)
+    offset_resume, index_resume = resume_state or (None, 0)
 
-        for fields in reader_raw:
-            # check if row looks like a header line
-            if _csv_header(fields):
-                fieldnames = [field.lower() for field in fields]
-                break
+    with open(file, "rb") as csvfile:
+        fieldnames, offset = _csv_header_read(csvfile)
 
-        # continue reading file with dict reader and field names set
-        reader_dict = csv.DictReader(csvfile, fieldnames=fieldnames)
+        offset_template = offset_resume
 
-        for row_template in reader_dict:
+        for offset_next, row_template in _csv_rows(csvfile, fieldnames, offset, worker_index, workers_count, offset_resume):
             # randomize data in each row
             rows = _csv_row_randomize(row_template, count)
 
-            for row in rows:
-                yield 1, row
+            for index, row in enumerate(rows):
+                if offset_template == offset_resume and index < index_resume:
+                    # row emitted before resume
+                    continue
+
+                yield (offset_template, index + 1), row
+
+            offset_template = offset_next
 
 
 def input_csv_random_params(file: str, count: int) -> int:
@@ -76,6 +94,39 @@ def _csv_header(fields: list[str]) -> bool:
     return True
 
 
+def _csv_header_read(csvfile: typing.BinaryIO) -> tuple[list[str], int]:
+    """returns header field names and the offset of the first line after the header"""
+    for line in iter(csvfile.readline, b""):
+        fields = next(csv.reader([line.decode()]), [])
+
+        # check if row looks like a header line
+        if fields and _csv_header(fields):
+            return [field.lower() for field in fields], csvfile.tell()
+
+    raise ValueError("input header missing")
+
+
+def _csv_rows(
+    csvfile: typing.BinaryIO,
+    fieldnames: list[str],
+    offset: int,
+    worker_index: int,
+    workers_count: int,
+    resume_offset: typing.Optional[int],
+) -> typing.Generator[tuple[int, dict], None, None]:
+    """yields (next offset, row) for each row in the worker range"""
+    offsets = [resume_offset or offset]
+
+    def lines() -> typing.Generator[str, None, None]:
+        for offset_next, line in services.timely.inputs.partition.file_lines(csvfile, offset, worker_index, workers_count, resume_offset):
+            offsets[0] = offset_next
+            yield line.decode()
+
+    # continue reading worker lines with dict reader and field names set, the reader only reads the lines of each row
+    for row_dict in csv.DictReader(lines(), fieldnames=fieldnames):
+        yield offsets[0], row_dict
+
+
 def _csv_row_randomize(row_template: dict, count: int) -> list[dict]:
     random_data: list[dict] = []
 
@@ -1,19 +1,54 @@
 import contextvars
+import functools
 import json
+import re
 import typing
 
+import services.timely.inputs.partition
+
 _input_json: contextvars.ContextVar = contextvars.ContextVar("input_json", default="")
 
 
-def input_json_generator(worker_index: int, workers_count: int, resume_state: str) -> typing.Generator[tuple[int, dict], None, None]:
-    file = _input_json.get()
+def input_json(file: str) -> typing.Callable:
+    """returns json input builder with file bound, unlike params it is visible to every worker thread and process"""
+    return functools.partial(_input_json_read, file)
 
-    objects = json.load(open(file))
 
-    for object in objects:
-        yield 1, object
+def input_json_generator(
+    worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+) -> typing.Generator[tuple[int, dict], None, None]:
+    yield from _input_json_read(_input_json.get(), worker_index, workers_count, resume_state)
 
 
 def input_json_params(file: str) -> int:
     _input_json.set(file)
     return 0
+
+
+def _input_json_read(
+    file: str, worker_index: int, workers_count: int, resume_state: typing.Optional[int]
+) -> typing.Generator[tuple[int, dict], None, None]:
+    """
+    yields (next position, object) with json objects split across workers
+
+    jsonl files, with one object per line, are split by line range and each worker only reads its own lines, the
+    position is a byte offset; json array files are loaded by each worker and split by index range, the position is an
+    index; the next position is the input state saved with each recovery snapshot, a resumed worker continues after it
+    """
+    if not file:
+        raise ValueError("input file missing")
+
+    if not re.search(r"\.(jsonl|ndjson)$", file):
+        objects = json.load(open(file))
+
+        indexes = services.timely.inputs.partition.index_range(len(objects), worker_index, workers_count)
+
+        for index in services.timely.inputs.partition.index_resume(indexes, resume_state):
+            yield index + 1, objects[index]
+
+        return
+
+    with open(file, "rb") as jsonfile:
+        for offset_next, line in services.timely.inputs.partition.file_lines(jsonfile, 0, worker_index, workers_count, resume_state):
+            if line.strip():
+                yield offset_next, json.loads(line)
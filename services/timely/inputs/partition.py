@@ -0,0 +1,58 @@
+import os
+import typing
+
+
+def file_lines(
+    file: typing.BinaryIO,
+    offset: int,
+    worker_index: int,
+    workers_count: int,
+    resume_offset: typing.Optional[int] = None,
+) -> typing.Generator[tuple[int, bytes], None, None]:
+    """
+    yields (next offset, line) for each line in the worker byte range of a file opened in binary mode
+
+    the file from offset to the end is split into workers count byte ranges of about the same size, a line belongs to
+    the worker range containing its first byte, so every line is read by exactly one worker and each worker reads a
+    contiguous range of lines; with a resume offset, a next offset yielded earlier by the same worker, reading
+    continues after that line
+    """
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+
+    range_start = offset + (size - offset) * worker_index // workers_count
+    range_end = offset + (size - offset) * (worker_index + 1) // workers_count
+
+    if resume_offset is not None:
+        file.seek(resume_offset)
+    elif range_start > offset:
+        # skip the line started in the previous worker range
+        file.seek(range_start - 1)
+        file.readline()
+    else:
+        file.seek(range_start)
+
+    offset_line = file.tell()
+
+    while offset_line < range_end:
+        line = file.readline()
+
+        if not line:
+            break
+
+        offset_line += len(line)
+
+        yield offset_line, line
+
+
+def index_range(count: int, worker_index: int, workers_count: int) -> range:
+    """worker range of list indexes, list is split into workers count contiguous ranges of about the same size"""
+    return range(count * worker_index // workers_count, count * (worker_index + 1) // workers_count)
+
+
+def index_resume(indexes: range, resume_index: typing.Optional[int]) -> range:
+    """worker range of list indexes after resume index, a next index yielded earlier by the same worker"""
+    if resume_index is None:
+        return indexes
+
+    return range(max(resume_index, indexes.start), indexes.stop)
@@ -0,0 +1,201 @@
+import datetime
+import functools
+import json
+import os
+import threading
+import typing
+import zlib
+
+import bytewax.dataflow
+import bytewax.execution
+import bytewax.recovery
+import bytewax.window
+import neo4j
+import sqlmodel
+
+import services.database.session
+import services.graph.session
+
+BATCH_BUCKETS: int = 256  # key buckets, each bucket is batched on a single worker
+BATCH_WINDOW: float = 1.0  # seconds to collect each batch
+
+EPOCH_INTERVAL: float = 10.0  # seconds between recovery snapshots
+
+# worker sessions, timely workers are threads so each worker thread gets its own sessions
+_sessions = threading.local()
+_sessions_all: list[typing.Any] = []
+_sessions_lock = threading.Lock()
+
+
+def batch(
+    flow: bytewax.dataflow.Dataflow,
+    step_id: str,
+    key: typing.Callable[[dict], str],
+    window: float = BATCH_WINDOW,
+    buckets: int = BATCH_BUCKETS,
+) -> bytewax.dataflow.Dataflow:
+    """
+    add steps to collect objects into batches, objects are routed to workers by a bucket of their key, so objects with
+    the same key are always batched on the same worker; the steps after the batch get a list of objects for each bucket
+    and window
+    """
+    flow.map(functools.partial(_key_bucket_add, key, buckets))
+    flow.reduce_window(
+        step_id,
+        bytewax.window.SystemClockConfig(),
+        bytewax.window.TumblingWindowConfig(length=datetime.timedelta(seconds=window)),
+        _batch_extend,
+    )
+    flow.map(_key_remove)
+
+    return flow
+
+
+def db_session() -> sqlmodel.Session:
+    """get worker database session, creating it on first use"""
+    if (db := getattr(_sessions, "db", None)) is None:
+        db = _sessions.db = _session_add(services.database.session.get())
+
+    return db
+
+
+def neo_session() -> neo4j.Session:
+    """get worker graph session, creating it on first use"""
+    if (neo := getattr(_sessions, "neo", None)) is None:
+        neo = _sessions.neo = _session_add(services.graph.session.get())
+
+    return neo
+
+
+def sessions_close() -> int:
+    """close worker sessions created by this process"""
+    with _sessions_lock:
+        sessions = list(_sessions_all)
+        _sessions_all.clear()
+
+    for session in sessions:
+        session.close()
+
+    # worker threads are done, sessions are re-created on next use
+    _sessions.__dict__.clear()
+
+    return len(sessions)
+
+
+def exchange(
+    flow: bytewax.dataflow.Dataflow,
+    step_id: str,
+    key: typing.Callable[[dict], str],
+) -> bytewax.dataflow.Dataflow:
+    """
+    add steps to route each object to the worker owning its key, so objects with the same key are always processed
+    by the same worker; the steps after the exchange run on that worker
+
+    the exchange keeps no state, objects replayed after resuming from a recovery snapshot are passed through, so steps
+    after the exchange must be idempotent
+    """
+    flow.map(functools.partial(_key_add, key))
+    flow.stateful_map(step_id, _exchange_state, _exchange_map)
+    flow.map(_key_remove)
+
+    return flow
+
+
+def key_entity_id(object: dict) -> str:
+    """exchange key for entity sync objects, e.g. {'code': 201, 'entity_id': '01GAKG7TGFCTSAVZ6PKV83V85C'}"""
+    return object["entity_id"]
+
+
+def key_entity_pk(object: dict) -> str:
+    """
+    exchange key for normalized objects, the entity primary key e.g. 'person.email:user1@gmail.com'; entity ids are
+    resolved by primary key, so objects for the same entity are resolved and persisted by the same worker
+    """
+    keys = [f"{key}:{object_dict['value']}" for key, object_list in object.items() for object_dict in object_list if object_dict.get("pk", 0) == 1]
+
+    if len(keys) != 1:
+        # no valid primary key, object is rejected by id resolve on any worker
+        return json.dumps(object, default=str, sort_keys=True)
+
+    return keys[0]
+
+
+def recovery(dir: str) -> bytewax.recovery.RecoveryConfig:
+    """
+    local sqlite recovery store in dir; a flow run again with the same store, flow steps and workers resumes from its
+    last snapshot
+    """
+    os.makedirs(dir, exist_ok=True)
+
+    return bytewax.recovery.SqliteRecoveryConfig(dir)
+
+
+def run(
+    flow: bytewax.dataflow.Dataflow,
+    workers: int = 1,
+    procs: int = 1,
+    addresses: typing.Optional[list[str]] = None,
+    proc_id: int = 0,
+    recovery_config: typing.Optional[bytewax.recovery.RecoveryConfig] = None,
+    epoch_interval: float = EPOCH_INTERVAL,
+) -> int:
+    """
+    run dataflow with workers threads per process
+
+    with addresses this process is process proc id of a cluster running on several hosts, otherwise procs processes are
+    spawned on this host when procs > 1; worker sessions created in this process are closed when the flow is done
+
+    with a recovery config, input states and step states are saved every epoch interval seconds, and a flow restarted
+    after a crash resumes from the last saved epoch instead of the start of its input
+    """
+    options = {
+        "epoch_interval": datetime.timedelta(seconds=epoch_interval),
+        "recovery_config": recovery_config,
+    }
+
+    try:
+        if addresses:
+            bytewax.execution.cluster_main(flow, addresses, proc_id, worker_count_per_proc=workers, **options)
+        elif procs > 1:
+            bytewax.execution.spawn_cluster(flow, proc_count=procs, worker_count_per_proc=workers, **options)
+        elif workers > 1:
+            bytewax.execution.cluster_main(flow, [], 0, worker_count_per_proc=workers, **options)
+        else:
+            bytewax.execution.run_main(flow, **options)
+    finally:
+        sessions_close()
+
+    return 0
+
+
+def _batch_extend(batch: list[dict], objects: list[dict]) -> list[dict]:
+    batch.extend(objects)
+    return batch
+
+
+def _exchange_map(state: None, object: dict) -> tuple[None, dict]:
+    # no state is kept, the stateful step is only used to route objects by key
+    return None, object
+
+
+def _exchange_state(key: str) -> None:
+    return None
+
+
+def _key_add(key: typing.Callable[[dict], str], object: dict) -> tuple[str, dict]:
+    return key(object), object
+
+
+def _key_bucket_add(key: typing.Callable[[dict], str], buckets: int, object: dict) -> tuple[str, list[dict]]:
+    return str(zlib.crc32(key(object).encode()) % buckets), [object]
+
+
+def _key_remove(key_object: tuple[str, typing.Any]) -> typing.Any:
+    return key_object[1]
+
+
+def _session_add(session: typing.Any) -> typing.Any:
+    with _sessions_lock:
+        _sessions_all.append(session)
+
+    return session
@@ -1,5 +1,4 @@
 import dataclasses
-import re
 
 import sqlmodel
 
@@ -17,6 +16,15 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.User,
+    fields={
+        "email": services.mql.Field(models.User.email),
+        "user_id": services.mql.Field(models.User.user_id, ops=services.mql.OPS_LIKE),
+    },
+)
+
+
 class List:
     def __init__(self, db: sqlmodel.Session, query: str = "", offset: int = 0, limit: int = 20):
         self._db = db
@@ -24,8 +32,6 @@ class List:
         self._offset = offset
         self._limit = limit
 
-        self._model = models.User
-        self._dataset = sqlmodel.select(models.User)  # default database query
         self._logger = log.init("service")
 
     def call(self) -> Struct:
@@ -33,28 +39,17 @@ class List:
 
         self._logger.info(f"{context.rid_get()} {__name__} query {self._query}")
 
-        # tokenize query
+        # compile query, statements are cached by query shape
 
-        struct_tokens = services.mql.Parse(self._query).call()
+        struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=self._query).call()
 
-        self._logger.info(f"{context.rid_get()} {__name__} tokens {struct_tokens.tokens}")
+        self._logger.info(f"{context.rid_get()} {__name__} terms {struct_compile.terms}")
 
-        for token in struct_tokens.tokens:
-            value = token["value"]
+        struct.errors += struct_compile.errors
 
-            if token["field"] == "email":
-                # match query
-                self._dataset = self._dataset.where(self._model.email == value)
-            elif token["field"] == "user_id":
-                if re.match(r"^~", value):
-                    # like query
-                    value_normal = re.sub(r"~", "", value)
-                    self._dataset = self._dataset.where(self._model.user_id.like("%" + value_normal + "%"))  # type: ignore
-                else:
-                    # match query
-                    self._dataset = self._dataset.where(self._model.user_id == value)
+        dataset = struct_compile.dataset.offset(self._offset).limit(self._limit)
 
-        struct.objects = self._db.exec(self._dataset.offset(self._offset).limit(self._limit)).all()
+        struct.objects = self._db.exec(dataset, params=struct_compile.params).all()
         struct.count = len(struct.objects)
 
         return struct
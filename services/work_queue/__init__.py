@@ -1,10 +1,15 @@
 from .add import add
+from .claim import claim
 from .gc import gc
 from .get import get_queued
+from .lease import lease_extend
 from .list import list
+from .notify import Listener, notify
 from .partition import partition
 from. protocol import WorkObjectHandler
 from .remove import remove
+from .report import Report
 from .route import route
 from .utils import cleanup
-from .update import state_completed, state_error, state_processing
\ No newline at end of file
+from .update import state_completed, state_error, state_bulk, state_processing, state_retry
+from .worker import Worker
\ No newline at end of file
@@ -2,6 +2,8 @@ import sqlmodel
 
 import models
 
+from .notify import notify
+
 
 def add(db_session: sqlmodel.Session, queue: str, partition: int, msg: str, data: dict) -> int:
     work_object = models.WorkQueue(
@@ -14,6 +16,10 @@ def add(db_session: sqlmodel.Session, queue: str, partition: int, msg: str, data
 
     try:
         db_session.add(work_object)
+
+        # listeners are notified when the transaction commits
+        notify(db_session=db_session, queue=queue, partition=partition)
+
         db_session.commit()
     except Exception:
         db_session.rollback()
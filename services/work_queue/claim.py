@@ -0,0 +1,94 @@
+import datetime
+
+import sqlalchemy
+import sqlmodel
+
+import models
+
+
+def claim(
+    db_session: sqlmodel.Session,
+    queue: str,
+    partition: int,
+    limit: int = 1,
+    lease: int = models.work_queue.LEASE_SECONDS,
+    retry_max: int = models.work_queue.RETRY_MAX,
+) -> list[models.WorkQueue]:
+    """
+    Atomically claim the next queued work objects for the specified queue and partition, and mark them as processing.
+
+    Queued rows are selected with 'for update skip locked' and updated in the same statement, so multiple workers
+    can share a partition without claiming the same work object.
+
+    Claimed work objects are leased for lease seconds; processing work objects with an expired lease, e.g. from a crashed
+    worker, are reclaimed, unless they have reached retry_max attempts, then they are marked as error the same as a
+    failed work object. Queued work objects waiting on a retry backoff are skipped until they are available.
+    """
+    model = models.WorkQueue
+
+    time_now = datetime.datetime.now(datetime.timezone.utc)
+
+    ids_claimable = (
+        sqlmodel
+            .select(model.id)
+            .where(model.name == queue).where(model.partition == partition)
+            .where(
+                sqlalchemy.or_(
+                    sqlalchemy.and_(
+                        model.state == models.work_queue.STATE_QUEUED,
+                        sqlalchemy.or_(model.available_at.is_(None), model.available_at <= time_now),  # type: ignore
+                    ),
+                    sqlalchemy.and_(
+                        model.state == models.work_queue.STATE_PROCESSING,
+                        model.lease_expires_at < time_now,
+                        model.attempts < retry_max,
+                    ),
+                )
+            )
+            .order_by(model.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+    )
+
+    # expired work objects with no attempts left, e.g. crashing their worker on every attempt
+    dataset_expired = (
+        sqlalchemy
+            .update(model)
+            .where(model.name == queue).where(model.partition == partition)
+            .where(model.state == models.work_queue.STATE_PROCESSING)
+            .where(model.lease_expires_at < time_now)
+            .where(model.attempts >= retry_max)
+            .values(
+                completed_at=time_now,
+                lease_expires_at=None,
+                state=models.work_queue.STATE_ERROR,
+                updated_at=time_now,
+            )
+            .execution_options(synchronize_session=False)
+    )
+
+    dataset = (
+        sqlalchemy
+            .update(model)
+            .where(model.id.in_(ids_claimable))
+            .values(
+                attempts=model.attempts + 1,
+                lease_expires_at=time_now + datetime.timedelta(seconds=lease),
+                processing_at=time_now,
+                state=models.work_queue.STATE_PROCESSING,
+                updated_at=time_now,
+            )
+            .returning(model)
+            .execution_options(synchronize_session=False)
+    )
+
+    try:
+        db_session.execute(dataset_expired)
+        work_objects = db_session.scalars(dataset).all()
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+    return sorted(work_objects, key=lambda work_object: work_object.id)
@@ -1,27 +1,54 @@
+import datetime
+import time
+
+import sqlalchemy
 import sqlmodel
 
 import models
-import services.mql
-import services.work_queue
 
+from .report import Report
+
+CHUNK_SIZE = 1000
 
-def gc(db_session: sqlmodel.Session, queue: str, completed_before: int) -> int:
+
+def gc(db_session: sqlmodel.Session, queue: str, completed_before: int, chunk: int = CHUNK_SIZE) -> Report:
     """
     Garbage collect work queue objects completed before completed_before
+
+    Work objects are deleted with one 'delete ... where id in (select ... limit chunk)' statement and commit per chunk,
+    so locks are held for a bounded time on busy tables.
     """
-    work_objects = services.work_queue.list(
-        db_session=db_session,
-        query=f"name:{queue} state:{models.work_queue.STATE_COMPLETED} completed_at:<{completed_before}",
-        limit=1024,
-        offset=0,
-    )
+    report = Report(code=0, count=0, chunks=0, msec=0.0)
+
+    t_start = time.monotonic()
+
+    model = models.WorkQueue
+
+    while True:
+        ids_completed = (
+            sqlmodel
+                .select(model.id)
+                .where(model.name == queue).where(model.state == models.work_queue.STATE_COMPLETED)
+                .where(model.completed_at < datetime.datetime.fromtimestamp(completed_before))
+                .order_by(model.id.asc())
+                .limit(chunk)
+                .scalar_subquery()
+        )
+
+        try:
+            result = db_session.exec(sqlalchemy.delete(model).where(model.id.in_(ids_completed)))  # type: ignore
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            report.code = 500
+            break
 
-    deleted = 0
+        report.count += result.rowcount
+        report.chunks += 1
 
-    for work_object in work_objects:
-        db_session.delete(work_object)
-        db_session.commit()
+        if result.rowcount < chunk:
+            break
 
-        deleted += 1
+    report.msec = round((time.monotonic() - t_start) * 1000, 3)
 
-    return deleted
\ No newline at end of file
+    return report
@@ -0,0 +1,37 @@
+import datetime
+
+import sqlalchemy
+import sqlmodel
+
+import models
+
+
+def lease_extend(db_session: sqlmodel.Session, ids: list[int], lease: int = models.work_queue.LEASE_SECONDS) -> int:
+    """
+    Extend the lease of processing work objects, returns the number of work objects extended.
+
+    Workers call this periodically while processing so their work objects are not reclaimed by other workers.
+    """
+    if not ids:
+        return 0
+
+    model = models.WorkQueue
+
+    time_now = datetime.datetime.now(datetime.timezone.utc)
+
+    dataset = (
+        sqlalchemy
+            .update(model)
+            .where(model.id.in_(ids)).where(model.state == models.work_queue.STATE_PROCESSING)  # type: ignore
+            .values(lease_expires_at=time_now + datetime.timedelta(seconds=lease), updated_at=time_now)
+            .execution_options(synchronize_session=False)
+    )
+
+    try:
+        result = db_session.exec(dataset)  # type: ignore
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+    return result.rowcount
@@ -1,6 +1,5 @@
 import dataclasses
 import datetime
-import re
 
 import sqlalchemy
 import sqlmodel
@@ -8,6 +7,7 @@ import sqlmodel
 import models
 import services.mql
 
+
 @dataclasses.dataclass
 class Struct:
     code: int
@@ -17,6 +17,17 @@ class Struct:
     errors: list[str]
 
 
+MQL_SCHEMA = services.mql.Schema(
+    model=models.WorkQueue,
+    fields={
+        "completed_at": services.mql.Field(models.WorkQueue.completed_at, ops=services.mql.OPS_RANGE, cast=lambda value: datetime.datetime.fromtimestamp(int(value))),
+        "name": services.mql.Field(models.WorkQueue.name, ops=services.mql.OPS_LIKE),
+        "partition": services.mql.Field(models.WorkQueue.partition),
+        "state": services.mql.Field(models.WorkQueue.state),
+    },
+)
+
+
 def list(db_session: sqlmodel.Session, query: str, offset: int, limit: int) -> Struct:
     struct = Struct(
         code=0,
@@ -27,38 +38,17 @@ def list(db_session: sqlmodel.Session, query: str, offset: int, limit: int) -> S
     )
 
     model = models.WorkQueue
-    dataset = sqlmodel.select(model)
 
     query_normalized = _query_normalize(query=query)
 
-    struct_tokens = services.mql.Parse(query_normalized).call()
-
-    for token in struct_tokens.tokens:
-        value = token["value"]
-
-        if token["field"] == "completed_at":
-            if re.match(r"^<", value):
-                value_normal = re.sub(r"<", "", value)
-                dataset = dataset.where(model.completed_at < datetime.datetime.fromtimestamp(int(value_normal)))
-            elif re.match(r"^>", value):
-                value_normal = re.sub(r">", "", value)
-                dataset = dataset.where(model.completed_at > datetime.datetime.fromtimestamp(int(value_normal)))
-        elif token["field"] == "name":
-            if re.match(r"^~", value):
-                # like query
-                value_normal = re.sub(r"~", "", value)
-                dataset = dataset.where(model.name.like("%" + value_normal + "%"))  # type: ignore
-            else:
-                # match query
-                dataset = dataset.where(model.name == value)
-        elif token["field"] == "partition":
-            dataset = dataset.where(model.partition == value)
-        elif token["field"] == "state":
-            dataset = dataset.where(model.state == value)
-
-    struct.objects = db_session.exec(dataset.offset(offset).limit(limit).order_by(model.id.desc())).all()
+    struct_compile = services.mql.Compile(schema=MQL_SCHEMA, query=query_normalized).call()
+
+    dataset = struct_compile.dataset
+
+    struct.objects = db_session.exec(dataset.offset(offset).limit(limit).order_by(model.id.desc()), params=struct_compile.params).all()
     struct.count = len(struct.objects)
-    struct.total = db_session.scalar(sqlmodel.select(sqlalchemy.func.count("*")).select_from(dataset.subquery()))
+    struct.total = db_session.scalar(sqlmodel.select(sqlalchemy.func.count("*")).select_from(dataset.subquery()), params=struct_compile.params)
+    struct.errors += struct_compile.errors
 
     return struct
 
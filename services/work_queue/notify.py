@@ -0,0 +1,112 @@
+import select
+import time
+
+import sqlalchemy
+import sqlmodel
+
+import log
+
+CHANNEL = "work_queue"
+
+logger = log.init("app")
+
+
+def notify(db_session: sqlmodel.Session, queue: str, partition: int) -> int:
+    """
+    Notify listeners that a work object was added to queue partition.
+
+    Notifications are sent by postgres when the current transaction commits, other databases are a no-op.
+    """
+    if db_session.get_bind().dialect.name != "postgresql":
+        return 0
+
+    db_session.exec(sqlalchemy.select(sqlalchemy.func.pg_notify(CHANNEL, _payload(queue=queue, partition=partition))))  # type: ignore
+
+    return 0
+
+
+class Listener:
+    """
+    Wait for work queue notifications for a queue partition.
+
+    Uses a dedicated postgres connection with 'listen', other databases fall back to sleeping for the wait timeout.
+    """
+
+    def __init__(self, engine: sqlalchemy.Engine, queue: str, partition: int):
+        self._engine = engine
+        self._payload = _payload(queue=queue, partition=partition)
+        self._connection = None
+        self._connection_pool = None
+
+    def __enter__(self) -> "Listener":
+        self.listen()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> int:
+        if not self._connection:
+            return 0
+
+        try:
+            # listening connection is not returned to the pool
+            self._connection_pool.invalidate()  # type: ignore
+        finally:
+            self._connection = None
+            self._connection_pool = None
+
+        return 0
+
+    def listen(self) -> int:
+        if self._engine.dialect.name != "postgresql" or self._engine.dialect.driver != "psycopg2":
+            return 1
+
+        self._connection_pool = self._engine.raw_connection()
+        self._connection = self._connection_pool.dbapi_connection
+
+        self._connection.set_session(autocommit=True)  # type: ignore
+
+        with self._connection.cursor() as cursor:  # type: ignore
+            cursor.execute(f"listen {CHANNEL}")
+
+        return 0
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for a notification, returns true if a notification was received
+        """
+        if not self._connection:
+            time.sleep(timeout)
+            return False
+
+        try:
+            if self._notified():
+                return True
+
+            if select.select([self._connection], [], [], timeout) == ([], [], []):
+                return False
+
+            return self._notified()
+        except Exception as e:
+            # connection lost, reconnect on next wait and treat as a wakeup so callers poll the queue
+            logger.error(f"{__name__} listener exception {e}")
+            self.close()
+            self.listen()
+            return True
+
+    def _notified(self) -> bool:
+        """drain pending notifications, returns true if any match queue partition"""
+        self._connection.poll()  # type: ignore
+
+        notified = False
+
+        while self._connection.notifies:  # type: ignore
+            notification = self._connection.notifies.pop(0)  # type: ignore
+            notified = notified or notification.payload == self._payload
+
+        return notified
+
+
+def _payload(queue: str, partition: int) -> str:
+    return f"{queue}:{partition}"
@@ -0,0 +1,9 @@
+import dataclasses
+
+
+@dataclasses.dataclass
+class Report:
+    code: int
+    count: int # rows affected
+    chunks: int # statements executed
+    msec: float # elapsed time
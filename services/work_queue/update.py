@@ -1,9 +1,16 @@
 import datetime
+import time
 
+import more_itertools
+import sqlalchemy
 import sqlmodel
 
 import models
 
+from .report import Report
+
+CHUNK_SIZE = 1000
+
 
 def state_completed(db_session: sqlmodel.Session, work_object: models.WorkQueue) -> int:
     """
@@ -50,4 +57,77 @@ def state_processing(db_session: sqlmodel.Session, work_object: models.WorkQueue
     db_session.add(work_object)
     db_session.commit()
 
-    return 0
\ No newline at end of file
+    return 0
+
+
+def state_retry(
+    db_session: sqlmodel.Session,
+    work_object: models.WorkQueue,
+    retry_max: int = models.work_queue.RETRY_MAX,
+    backoff: int = models.work_queue.RETRY_BACKOFF_SECONDS,
+) -> int:
+    """
+    Mark work object as queued for retry with exponential backoff, or as error if max attempts have been reached
+    """
+    if work_object.attempts >= retry_max:
+        return state_error(db_session=db_session, work_object=work_object)
+
+    time_now = datetime.datetime.now(datetime.timezone.utc)
+
+    work_object.state = models.work_queue.STATE_QUEUED
+    work_object.available_at = time_now + datetime.timedelta(seconds=backoff * 2 ** max(work_object.attempts - 1, 0))
+    work_object.lease_expires_at = None
+    work_object.processing_at = None
+
+    db_session.add(work_object)
+    db_session.commit()
+
+    return 0
+
+
+def state_bulk(db_session: sqlmodel.Session, ids: list[int], state: str, chunk: int = CHUNK_SIZE) -> Report:
+    """
+    Mark work objects as completed, error, processing or queued, with one 'update ... where id in (...)' statement and
+    commit per chunk of ids. Work objects already in the specified state are not updated.
+    """
+    report = Report(code=0, count=0, chunks=0, msec=0.0)
+
+    t_start = time.monotonic()
+
+    model = models.WorkQueue
+
+    time_now = datetime.datetime.now(datetime.timezone.utc)
+
+    values: dict = {"state": state, "updated_at": time_now}
+
+    if state in [models.work_queue.STATE_COMPLETED, models.work_queue.STATE_ERROR]:
+        values["completed_at"] = time_now
+    elif state == models.work_queue.STATE_PROCESSING:
+        values["processing_at"] = time_now
+    elif state == models.work_queue.STATE_QUEUED:
+        values["processing_at"] = None
+        values["lease_expires_at"] = None
+
+    for ids_chunk in more_itertools.chunked(ids, chunk):
+        dataset = (
+            sqlalchemy
+                .update(model)
+                .where(model.id.in_(ids_chunk)).where(model.state != state)  # type: ignore
+                .values(**values)
+                .execution_options(synchronize_session=False)
+        )
+
+        try:
+            result = db_session.exec(dataset)  # type: ignore
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            report.code = 500
+            break
+
+        report.count += result.rowcount
+        report.chunks += 1
+
+    report.msec = round((time.monotonic() - t_start) * 1000, 3)
+
+    return report
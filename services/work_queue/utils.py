@@ -1,30 +1,61 @@
+import time
+
+import sqlalchemy
 import sqlmodel
 
 import models
-import services.work_queue
 
-def cleanup(db_session: sqlmodel.Session, queue: str, partition: int) -> int:
-    """
-    Reset all processing work objects as queued.
-
-    Work objects can be left in a processing state during shutdown.
-    """
-    updated_count = 0
+from .report import Report
 
-    list_result = services.work_queue.list(
-        db_session=db_session,
-        query=f"name:{queue} partition:{partition} state:{models.work_queue.STATE_PROCESSING}",
-        offset=0,
-        limit=10,
-    )
+CHUNK_SIZE = 1000
 
-    for work_object in list_result.objects:
-        work_object.state = models.work_queue.STATE_QUEUED
-        work_object.processing_at = None
 
-        db_session.add(work_object)
-        db_session.commit()
-
-        updated_count += 1
+def cleanup(db_session: sqlmodel.Session, queue: str, partition: int, chunk: int = CHUNK_SIZE) -> Report:
+    """
+    Reset all processing work objects as queued.
 
-    return updated_count
\ No newline at end of file
+    Work objects can be left in a processing state during shutdown. Leased work objects are skipped, they may be owned by
+    another worker and are reclaimed by claim when their lease expires.
+    """
+    report = Report(code=0, count=0, chunks=0, msec=0.0)
+
+    t_start = time.monotonic()
+
+    model = models.WorkQueue
+
+    while True:
+        ids_processing = (
+            sqlmodel
+                .select(model.id)
+                .where(model.name == queue).where(model.partition == partition)
+                .where(model.state == models.work_queue.STATE_PROCESSING).where(model.lease_expires_at.is_(None))  # type: ignore
+                .order_by(model.id.asc())
+                .limit(chunk)
+                .scalar_subquery()
+        )
+
+        dataset = (
+            sqlalchemy
+                .update(model)
+                .where(model.id.in_(ids_processing))  # type: ignore
+                .values(state=models.work_queue.STATE_QUEUED, processing_at=None)
+                .execution_options(synchronize_session=False)
+        )
+
+        try:
+            result = db_session.exec(dataset)  # type: ignore
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            report.code = 500
+            break
+
+        report.count += result.rowcount
+        report.chunks += 1
+
+        if result.rowcount < chunk:
+            break
+
+    report.msec = round((time.monotonic() - t_start) * 1000, 3)
+
+    return report
@@ -0,0 +1,171 @@
+import concurrent.futures
+import threading
+
+import log
+import models
+import services.database.session
+
+from .claim import claim
+from .lease import lease_extend
+from .notify import Listener
+from .route import route
+from .update import state_completed, state_retry
+
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+
+logger = log.init("app")
+
+
+class Worker:
+    """
+    Work queue worker pool.
+
+    Claims up to concurrency + prefetch work objects at a time and runs them on a thread or process pool. Leases of
+    claimed work objects are extended by a heartbeat thread until they complete, failed work objects are retried with
+    exponential backoff up to retry_max attempts.
+    """
+
+    def __init__(
+        self,
+        queue: str,
+        partition: int,
+        concurrency: int = 1,
+        executor: str = EXECUTOR_THREAD,
+        prefetch: int = 0,
+        interval: int = 5,
+        lease: int = models.work_queue.LEASE_SECONDS,
+        retry_max: int = models.work_queue.RETRY_MAX,
+        backoff: int = models.work_queue.RETRY_BACKOFF_SECONDS,
+    ):
+        self._queue = queue
+        self._partition = partition
+        self._concurrency = max(concurrency, 1)
+        self._executor = executor
+        self._prefetch = max(prefetch, 0)
+        self._interval = interval
+        self._lease = lease
+        self._retry_max = retry_max
+        self._backoff = backoff
+
+        self._futures: dict[concurrent.futures.Future, int] = {}  # future => work object id
+        self._futures_lock = threading.Lock()  # futures are updated by the main loop and read by the heartbeat thread
+        self._shutdown = threading.Event()
+        self._heartbeat_stop = threading.Event()
+
+    def call(self) -> int:
+        """run worker until stop is called, returns number of work objects processed"""
+        processed = 0
+
+        heartbeat = threading.Thread(target=self._heartbeat, name=f"workq-heartbeat-{self._queue}", daemon=True)
+        heartbeat.start()
+
+        with self._executor_pool() as pool, Listener(engine=services.database.session.engine, queue=self._queue, partition=self._partition) as listener:
+            while not self._shutdown.is_set():
+                processed += self._futures_reap()
+
+                slots = self._concurrency + self._prefetch - len(self._futures)
+
+                if slots <= 0:
+                    # pool and prefetch buffer are full, wait for a work object to complete
+                    concurrent.futures.wait(list(self._futures.keys()), timeout=self._interval, return_when=concurrent.futures.FIRST_COMPLETED)
+                    continue
+
+                with services.database.session.get() as db_session:
+                    work_objects = claim(
+                        db_session=db_session,
+                        queue=self._queue,
+                        partition=self._partition,
+                        limit=slots,
+                        lease=self._lease,
+                        retry_max=self._retry_max,
+                    )
+
+                for work_object in work_objects:
+                    logger.info(f"{__name__} queue '{self._queue}' partition {self._partition} id {work_object.id} claimed")
+
+                    future = pool.submit(_work_object_process, self._queue, work_object.id, self._retry_max, self._backoff)
+
+                    with self._futures_lock:
+                        self._futures[future] = work_object.id
+
+                if not work_objects:
+                    # idle, wake up on queue notifications, or sooner if work objects are in flight
+                    listener.wait(timeout=min(self._interval, 1) if self._futures else self._interval)
+
+            # stop claiming, wait for in flight work objects
+            concurrent.futures.wait(list(self._futures.keys()))
+            processed += self._futures_reap()
+
+        self._heartbeat_stop.set()
+        heartbeat.join()
+
+        return processed
+
+    def stop(self) -> int:
+        self._shutdown.set()
+        return 0
+
+    def _executor_pool(self) -> concurrent.futures.Executor:
+        if self._executor == EXECUTOR_PROCESS:
+            return concurrent.futures.ProcessPoolExecutor(max_workers=self._concurrency, initializer=_process_init)
+
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix=f"workq-{self._queue}")
+
+    def _futures_reap(self) -> int:
+        """remove completed futures, returns number removed"""
+        futures_done = [future for future in list(self._futures.keys()) if future.done()]
+
+        for future in futures_done:
+            with self._futures_lock:
+                id = self._futures.pop(future)
+
+            if future.exception():
+                logger.error(f"{__name__} queue '{self._queue}' partition {self._partition} id {id} exception {future.exception()}")
+
+        return len(futures_done)
+
+    def _heartbeat(self) -> None:
+        """extend leases of claimed work objects until all work objects have completed"""
+        while not self._heartbeat_stop.wait(timeout=max(self._lease / 3, 1)):
+            try:
+                with self._futures_lock:
+                    ids = list(self._futures.values())
+
+                with services.database.session.get() as db_session:
+                    lease_extend(db_session=db_session, ids=ids, lease=self._lease)
+            except Exception as e:
+                logger.error(f"{__name__} queue '{self._queue}' heartbeat exception {e}")
+
+
+def _process_init() -> None:
+    """process pool initializer, connections inherited from the parent process must not be shared"""
+    services.database.session.engine.dispose(close=False)
+
+
+def _work_object_process(queue: str, id: int, retry_max: int, backoff: int) -> int:
+    """process claimed work object, returns 0 if completed"""
+    with services.database.session.get() as db_session:
+        work_object = db_session.get(models.WorkQueue, id)
+
+        if not work_object or work_object.state != models.work_queue.STATE_PROCESSING:
+            return 404
+
+        logger.info(f"{__name__} queue '{queue}' partition {work_object.partition} id {id} attempt {work_object.attempts} processing")
+
+        try:
+            handler = route(queue=queue)
+            handler.call(db_session=db_session, work_object=work_object)  # type: ignore
+
+            state_completed(db_session=db_session, work_object=work_object)
+
+            logger.info(f"{__name__} queue '{queue}' partition {work_object.partition} id {id} completed")
+
+            return 0
+        except Exception as e:
+            logger.error(f"{__name__} queue '{queue}' partition {work_object.partition} id {id} exception {e}")
+
+            db_session.rollback()
+            state_retry(db_session=db_session, work_object=work_object, retry_max=retry_max, backoff=backoff)
+
+            return 500
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import pytest
+
+import kafka
+import kafka.dispatch
+import models
+
+
+class BatchHandler:
+    """sync batch handler, runs on the dispatch thread pool"""
+
+    def __init__(self):
+        self.threads: set[int] = set()
+
+    def call(self, msg: dict) -> kafka.KafkaResult:
+        return kafka.KafkaResult(0, [])
+
+    def call_batch(self, msgs: list[dict]) -> kafka.KafkaResult:
+        self.threads.add(threading.get_ident())
+
+        if any(msg.get("fail") for msg in msgs):
+            return kafka.KafkaResult(500, ["fail"])
+
+        return kafka.KafkaResult(0, [])
+
+
+class Handler:
+    async def call(self, msg: dict) -> kafka.KafkaResult:
+        return kafka.KafkaResult(0, [])
+
+
+class MessageHandler:
+    """sync handler without an actor param, runs on the dispatch process pool"""
+
+    def call(self, msg: models.KafkaMessage) -> kafka.KafkaResult:
+        return kafka.KafkaResult(0, [msg.value_str()])
+
+
+class Message:
+    """confluent_kafka.Message stub, not picklable"""
+
+    def __init__(self, value: bytes):
+        self._lock = threading.Lock()
+        self._value = value
+
+    def key(self) -> bytes:
+        return b"key"
+
+    def offset(self) -> int:
+        return 0
+
+    def partition(self) -> int:
+        return 0
+
+    def topic(self) -> str:
+        return "topic"
+
+    def value(self) -> bytes:
+        return self._value
+
+
+@pytest.mark.asyncio
+async def test_dispatch_call_batch():
+    handler = BatchHandler()
+    metrics = models.ActorMetrics()
+
+    dispatch = kafka.dispatch.Dispatch(handler=handler, metrics=metrics)
+
+    assert dispatch.batch
+    assert dispatch.executor == kafka.dispatch.EXECUTOR_THREAD
+
+    struct = await dispatch.call_batch(None, [{"id": 1}, {"id": 2}, {"id": 3}])
+
+    assert struct.code == 0
+
+    struct = await dispatch.call_batch(None, [{"id": 4}, {"fail": True}])
+
+    assert struct.code == 500
+
+    # batch latency and errors are recorded for each message
+    assert metrics.processed == 5
+    assert metrics.errors == 2
+
+    # sync batch handlers run off the event loop
+    assert threading.get_ident() not in handler.threads
+
+    dispatch.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_call_batch_unsupported():
+    dispatch = kafka.dispatch.Dispatch(handler=Handler())
+
+    assert not dispatch.batch
+    assert dispatch.executor == kafka.dispatch.EXECUTOR_LOOP
+
+    with pytest.raises(ValueError):
+        await dispatch.call_batch(None, [{"id": 1}])
+
+    assert (await asyncio.wait_for(dispatch.call(None, {"id": 1}), timeout=1)).code == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_call_process():
+    dispatch = kafka.dispatch.Dispatch(handler=MessageHandler(), executor=kafka.dispatch.EXECUTOR_PROCESS)
+
+    # message is detached before it is passed to the process pool
+    struct = await dispatch.call(None, models.KafkaMessage(Message(value=b"value")))
+
+    assert struct.code == 0
+    assert struct.errors == ["value"]
+
+    dispatch.close()
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+import kafka
+import kafka.reader
+import models
+
+
+class Message:
+    """fake consumed kafka message"""
+
+    def __init__(self, offset: int, value: bytes = b"{}", partition: int = 0):
+        self._offset = offset
+        self._partition = partition
+        self._value = value
+
+    def key(self):
+        return None
+
+    def offset(self):
+        return self._offset
+
+    def partition(self):
+        return self._partition
+
+    def topic(self):
+        return "topic"
+
+    def value(self):
+        return self._value
+
+
+class BatchHandler:
+    """records each batch, a batch with a 'fail' message returns 500"""
+
+    def __init__(self):
+        self.batches: list[list[int]] = []
+
+    async def call(self, msg: models.KafkaMessage) -> kafka.KafkaResult:
+        return kafka.KafkaResult(0, [])
+
+    async def call_batch(self, msgs: list[models.KafkaMessage]) -> kafka.KafkaResult:
+        self.batches.append([msg.offset() for msg in msgs])
+
+        if any(msg.value() == b"fail" for msg in msgs):
+            return kafka.KafkaResult(500, ["fail"])
+
+        return kafka.KafkaResult(0, [])
+
+
+@pytest.fixture
+def reader_get(monkeypatch):
+    monkeypatch.setenv("KAFKA_BROKERS", "localhost:9092")
+
+    readers: list[kafka.reader.Reader] = []
+
+    def _reader_get(handler: BatchHandler, **kwargs) -> kafka.reader.Reader:
+        reader = kafka.reader.Reader(topic="topic", group="group", handler=handler, **kwargs)  # type: ignore
+
+        # set by call
+        reader._actor = models.Actor(name="reader", handler=handler)
+        reader._log_subject = "actor 'reader'"
+
+        readers.append(reader)
+
+        return reader
+
+    yield _reader_get
+
+    for reader in readers:
+        reader._consumer.close()
+
+
+async def _worker_run(reader: kafka.reader.Reader, queue: asyncio.Queue, msgs: list[Message], delay: float = 0.0) -> None:
+    """run batch worker until msgs are processed, msgs are put on the worker queue with delay seconds between them"""
+    for msg in msgs:
+        reader._inflight.setdefault((msg.topic(), msg.partition()), set()).add(msg.offset())
+
+    worker = asyncio.create_task(reader._worker_process_batch(queue))
+
+    for index, msg in enumerate(msgs):
+        if index and delay:
+            await asyncio.sleep(delay)
+
+        await queue.put(msg)
+
+    await queue.join()
+
+    worker.cancel()
+
+    await asyncio.gather(worker, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_reader_batch_size(reader_get):
+    handler = BatchHandler()
+    reader = reader_get(handler, batch_size=2)
+
+    msgs = [Message(offset) for offset in range(5)]
+
+    await _worker_run(reader, asyncio.Queue(), msgs)
+
+    # batches are filled up to batch size
+    assert handler.batches == [[0, 1], [2, 3], [4]]
+    assert reader._offsets == {("topic", 0): 5}
+
+
+@pytest.mark.asyncio
+async def test_reader_batch_linger(reader_get):
+    handler = BatchHandler()
+    reader = reader_get(handler, batch_size=10, batch_linger=0.5)
+
+    msgs = [Message(offset) for offset in range(2)]
+
+    await _worker_run(reader, asyncio.Queue(), msgs, delay=0.05)
+
+    # worker waits for the batch to fill
+    assert handler.batches == [[0, 1]]
+
+
+@pytest.mark.asyncio
+async def test_reader_batch_no_linger(reader_get):
+    handler = BatchHandler()
+    reader = reader_get(handler, batch_size=10)
+
+    msgs = [Message(offset) for offset in range(2)]
+
+    await _worker_run(reader, asyncio.Queue(), msgs, delay=0.05)
+
+    # without linger, available messages are batched without waiting
+    assert handler.batches == [[0], [1]]
+
+
+@pytest.mark.asyncio
+async def test_reader_batch_ack(reader_get):
+    handler = BatchHandler()
+    reader = reader_get(handler, batch_size=2)
+
+    msgs = [Message(0), Message(1), Message(2, value=b"fail"), Message(3)]
+
+    await _worker_run(reader, asyncio.Queue(), msgs)
+
+    # failed batch is not acked, commit offset stops at its first message
+    assert handler.batches == [[0, 1], [2, 3]]
+    assert reader._acked == {("topic", 0): 2}
+    assert reader._offsets == {("topic", 0): 2}
+    assert reader._inflight == {("topic", 0): set()}
@@ -2,6 +2,7 @@ import asyncio
 
 import pytest
 
+from actors.example.workers.echo import WorkerEcho
 from models import Actor
 
 
@@ -33,3 +34,95 @@ async def test_actor():
     assert queue.qsize() == 0
 
     actor.cancel()
+
+    await asyncio.gather(actor.task, return_exceptions=True)
+
+
+class ActorForward:
+    # process actor message, runs in thread pool
+    def call(self, actor: Actor, message: dict):
+        actor.deliver(message)
+
+
+@pytest.mark.asyncio
+async def test_actor_fan_out():
+    src = Actor(name="actor-src", handler=ActorForward(), workers=2, queue_size=2)
+    dst_1 = Actor(name="actor-dst-1", handler=ActorHandler(app_name="actor-dst-1"), queue_size=1)
+    dst_2 = Actor(name="actor-dst-2", handler=ActorHandler(app_name="actor-dst-2"), queue_size=1)
+
+    src.output_add(dst_1.queue)
+    src.output_add(dst_2.queue)
+
+    for actor in [src, dst_1, dst_2]:
+        actor.schedule()
+
+    # bounded queues block until downstream stages catch up
+    for i in range(10):
+        await src.queue.put({"name": f"hello-{i}"})
+
+    await src.queue.join()
+    await dst_1.queue.join()
+    await dst_2.queue.join()
+
+    metrics_src = src.metrics()
+
+    assert metrics_src.received == 10
+    assert metrics_src.processed == 10
+    assert metrics_src.errors == 0
+    assert metrics_src.queue_size == 2
+    assert sum(metrics_src.latency_histogram.values()) == 10
+
+    assert dst_1.metrics().processed == 10
+    assert dst_2.metrics().processed == 10
+
+    for actor in [src, dst_1, dst_2]:
+        actor.cancel()
+
+    await asyncio.gather(*[actor.task for actor in [src, dst_1, dst_2]], return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_actor_process_echo():
+    actor = Actor(name="actor-echo", handler=WorkerEcho(app_name="actor-echo"), workers=2, executor="process")
+
+    actor.schedule()
+
+    for i in range(4):
+        await actor.queue.put({"name": f"hello-{i}"})
+
+    await actor.queue.join()
+
+    metrics = actor.metrics()
+
+    assert metrics.processed == 4
+    assert metrics.errors == 0
+
+    actor.cancel()
+
+    await asyncio.gather(actor.task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_actor_process_deliver():
+    src = Actor(name="actor-src", handler=ActorForward(), workers=2, executor="process")
+    dst = Actor(name="actor-dst", handler=ActorHandler(app_name="actor-dst"))
+
+    src.output_add(dst.queue)
+
+    for actor in [src, dst]:
+        actor.schedule()
+
+    for i in range(4):
+        await src.queue.put({"name": f"hello-{i}"})
+
+    await src.queue.join()
+    await dst.queue.join()
+
+    # messages delivered in the process pool are delivered to the outputs by the parent
+    assert src.metrics().errors == 0
+    assert dst.metrics().processed == 4
+
+    for actor in [src, dst]:
+        actor.cancel()
+
+    await asyncio.gather(*[actor.task for actor in [src, dst]], return_exceptions=True)
@@ -0,0 +1,24 @@
+import os
+
+import models.actor_log
+
+
+def test_actor_log_buffered(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("logs")
+
+    actor_log = models.actor_log.ActorLog(app_name="test", buffered=True, flush_bytes=1024, rotate_bytes=4096, compress=True)
+
+    for i in range(500):
+        actor_log.append({"actor": "test", "offset": i})
+
+    actor_log.flush()
+
+    segments = actor_log.segments()
+
+    assert len(segments) > 1
+    assert all(segment.endswith(".json.gz") for segment in segments)
+
+    assert [message["offset"] for message in actor_log.read()] == list(range(500))
+
+    assert models.actor_log.close_all() == 1
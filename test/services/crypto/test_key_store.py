@@ -0,0 +1,42 @@
+import os
+import time
+
+import pytest
+
+import services.crypto.symmetric
+
+
+def test_key_store(tmp_path):
+    keys_file = tmp_path / "keys.toml"
+    keys_file.write_text('["user-1"]\ncipher = "aes-gcm"\nkey = "50LvVlP9UOZY3Nn1Ekmluw=="\n')
+
+    key_store = services.crypto.symmetric.KeyStore(toml_file=str(keys_file), check_interval=0)
+
+    cipher = key_store.cipher("user-1")
+
+    # cipher is cached
+    assert key_store.cipher("user-1") is cipher
+
+    struct_encrypt = key_store.encrypt_batch(user_id="user-1", objects=[{"id": 1}, {"id": 2}])
+
+    assert struct_encrypt.code == 0
+    assert len(struct_encrypt.objects) == 2
+
+    struct_decrypt = key_store.decrypt_batch(
+        user_id="user-1",
+        objects=[(object.encoded, object.nonce) for object in struct_encrypt.objects] + [("invalid", struct_encrypt.objects[0].nonce)],
+    )
+
+    assert struct_decrypt.code == 422
+    assert [object.code for object in struct_decrypt.objects] == [0, 0, 422]
+    assert [object.decoded for object in struct_decrypt.objects[:2]] == ['{"id": 1}', '{"id": 2}']
+
+    with pytest.raises(KeyError):
+        key_store.cipher("user-2")
+
+    # keys file change is reloaded
+    keys_file.write_text(keys_file.read_text() + '\n["user-2"]\ncipher = "aes-gcm"\nkey = "50LvVlP9UOZY3Nn1Ekmluw=="\n')
+    os.utime(keys_file, (time.time() + 1, time.time() + 1))
+
+    assert key_store.cipher("user-2")
+    assert key_store.cipher("user-1") is not cipher
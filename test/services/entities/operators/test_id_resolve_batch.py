@@ -0,0 +1,50 @@
+import sqlmodel
+import ulid
+
+import models
+import services.entities
+import services.entities.operators
+
+
+def test_id_resolve_batch(session: sqlmodel.Session):
+    entity_id = ulid.new().str
+
+    entity = models.Entity(
+        entity_id=entity_id,
+        entity_key=f"notme-{entity_id}",
+        entity_name="person",
+        fingerprint="",
+        name="person 1",
+        node=1,
+        slug="email",
+        state=models.entity.STATE_ACTIVE,
+        type_name="string",
+        type_value="user-1@gmail.com",
+        version=0,
+    )
+
+    session.add(entity)
+    session.commit()
+
+    objects = [
+        # existing entity
+        {"person.email": [{"value": "user-1@gmail.com", "type": "string", "pk": 1}], "person.name": [{"value": "user 1", "type": "string"}]},
+        # new entity
+        {"person.email": [{"value": "user-2@gmail.com", "type": "string", "pk": 1}]},
+        # same new entity as the previous object
+        {"person.email": [{"value": "user-2@gmail.com", "type": "string", "pk": 1}], "person.name": [{"value": "user 2", "type": "string"}]},
+        # no primary key
+        {"person.name": [{"value": "user 3", "type": "string"}]},
+        # multiple primary key values
+        {"person.email": [{"value": "user-4@gmail.com", "type": "string", "pk": 1}, {"value": "user-5@gmail.com", "type": "string", "pk": 1}]},
+    ]
+
+    struct_resolve = services.entities.operators.IdResolveBatch(db=session, objects=objects).call()
+
+    assert [struct.code for struct in struct_resolve.objects] == [200, 201, 409, 422, 422]
+
+    assert struct_resolve.objects[0].id == entity_id
+    assert struct_resolve.objects[1].id not in ["", entity_id]
+    assert struct_resolve.objects[2].id == struct_resolve.objects[1].id
+
+    services.entities.delete_by_id(db=session, ids=[entity.id])  # type: ignore
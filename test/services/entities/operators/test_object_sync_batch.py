@@ -0,0 +1,59 @@
+import json
+
+import pytest
+import sqlmodel
+
+import services.data_models
+import services.entities
+import services.entities.operators
+import services.entity_locations
+
+
+@pytest.fixture()
+def data_models(session: sqlmodel.Session):
+    """create base data models used to validate data links"""
+    data_file = "./test/data/data_models/data_model_person.json"
+    objects = json.load(open(data_file))
+
+    struct_create = services.data_models.Create(
+        db=session,
+        objects=objects,
+    ).call()
+
+    yield struct_create.ids
+
+    services.data_models.delete_by_id(db=session, ids=struct_create.ids)
+
+
+def test_sync_batch_update(session: sqlmodel.Session, data_models: list[int]):
+    objects = json.load(open("./test/data/entities/entities__basic.json"))
+
+    struct_sync = services.entities.operators.ObjectSyncBatch(db=session, objects=objects).call()
+
+    assert [struct.code for struct in struct_sync.objects] == [201] * len(objects)
+    assert all(len(struct.ids) == 3 for struct in struct_sync.objects)
+
+    entity_ids = [id for struct in struct_sync.objects for id in struct.ids]
+
+    # sync existing entity with changes
+
+    objects = json.load(open("./test/data/entities/entities__basic_update.json"))
+
+    struct_sync = services.entities.operators.ObjectSyncBatch(db=session, objects=objects).call()
+
+    assert [struct.code for struct in struct_sync.objects] == [200] * len(objects)
+    assert all(len(struct.ids) == 5 for struct in struct_sync.objects)
+    assert all(len(struct.location_ids) == 1 for struct in struct_sync.objects)
+
+    entity_ids += [id for struct in struct_sync.objects for id in struct.ids]
+    entity_location_ids = [id for struct in struct_sync.objects for id in struct.location_ids]
+
+    # try sync again, should return 409 this time
+
+    struct_sync = services.entities.operators.ObjectSyncBatch(db=session, objects=objects).call()
+
+    assert [struct.code for struct in struct_sync.objects] == [409] * len(objects)
+    assert all(len(struct.location_ids) == 0 for struct in struct_sync.objects)
+
+    services.entities.delete_by_id(db=session, ids=entity_ids)  # type: ignore
+    services.entity_locations.delete_by_id(db=session, ids=entity_location_ids)  # type: ignore
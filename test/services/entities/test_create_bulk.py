@@ -0,0 +1,36 @@
+import test
+
+import sqlmodel
+import ulid
+
+import services.entities
+
+
+def test_entity_create_bulk(session: sqlmodel.Session):
+    entity_ids = [ulid.new().str for _ in range(3)]
+
+    entities = [
+        test.EntityFactory.build(entity_id=entity_id, name=f"test person {i}", slug="id", type_value=entity_id)
+        for i, entity_id in enumerate(entity_ids)
+    ]
+
+    struct_create = services.entities.CreateBulk(db=session, entities=entities, batch_size=2, locations=False).call()
+
+    assert struct_create.code == 0
+    assert struct_create.count == 3
+    assert struct_create.conflicts == 0
+    assert struct_create.entity_ids == set(entity_ids)
+
+    # create again, all rows conflict with existing entity versions
+    entities = [
+        test.EntityFactory.build(entity_id=entity_id, name=f"test person {i}", slug="id", type_value=entity_id)
+        for i, entity_id in enumerate(entity_ids)
+    ]
+
+    struct_create = services.entities.CreateBulk(db=session, entities=entities, batch_size=2, locations=False).call()
+
+    assert struct_create.code == 0
+    assert struct_create.count == 0
+    assert struct_create.conflicts == 3
+
+    services.entities.delete_by_id(db=session, ids=entity_ids)
@@ -0,0 +1,34 @@
+import services.entity_watches.geo_index
+
+
+def test_geo_index():
+    geo_index = services.entity_watches.geo_index.GeoIndex()
+
+    Geofence = services.entity_watches.geo_index.Geofence
+
+    # chicago loop 2mi, chicago loop 2mi and river north 1mi, new york 2mi, antimeridian 50km, no geofences
+    geo_index.add(1, [Geofence(lat=41.8911752, lon=-87.6321491, meters=3218.68)], "loop")
+    geo_index.add(2, [Geofence(lat=41.8911752, lon=-87.6321491, meters=3218.68), Geofence(lat=41.8925, lon=-87.6341, meters=1609.34)], "river")
+    geo_index.add(3, [Geofence(lat=40.7128, lon=-74.0060, meters=3218.68)], "nyc")
+    geo_index.add(4, [Geofence(lat=0.0, lon=179.9, meters=50000)], "antimeridian")
+    geo_index.add(5, [], "any")
+
+    assert len(geo_index) == 5
+
+    assert sorted(geo_index.match(41.8850, -87.6300)) == ["any", "loop", "river"]
+    assert sorted(geo_index.match(41.8650, -87.6300)) == ["any", "loop"]
+    assert sorted(geo_index.match(40.7130, -74.0050)) == ["any", "nyc"]
+    assert sorted(geo_index.match(0.0, -179.9)) == ["antimeridian", "any"]
+    assert sorted(geo_index.match(None, None)) == ["any"]
+
+    geo_index.remove(1)
+
+    assert sorted(geo_index.match(41.8850, -87.6300)) == ["any", "river"]
+    assert sorted(geo_index.objects()) == ["antimeridian", "any", "nyc", "river"]
+
+
+def test_geofence_distance():
+    # chicago to new york, about 1145km
+    meters = services.entity_watches.geo_index.distance(41.8781, -87.6298, 40.7128, -74.0060)
+
+    assert 1140000 < meters < 1150000
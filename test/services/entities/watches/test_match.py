@@ -220,7 +220,7 @@ class TestWatchQueryGeoFence:
         services.entity_watches.delete_by_id(db=session, ids=struct_watches.ids)
 
     def test_entity_match(self, session: sqlmodel.Session, neo_session: neo4j.Session, watch_ids: list[int], entity_place_ids: list[int], mocker):
-        service = services.entity_watches.Match(db=session, neo=neo_session, entity_ids=entity_place_ids)
+        service = services.entity_watches.Match(db=session, neo=neo_session, entity_ids=entity_place_ids, geo_index=False)
 
         m = mocker.patch.object(service, "_watch_entity_geo_query", return_value=["record"])
 
@@ -234,3 +234,16 @@ class TestWatchQueryGeoFence:
         watch = struct_matches.watches[0]
 
         assert [watch.id] == watch_ids
+
+    def test_entity_nomatch_geo_index(self, session: sqlmodel.Session, neo_session: neo4j.Session, watch_ids: list[int], entity_place_ids: list[int], mocker):
+        service = services.entity_watches.Match(db=session, neo=neo_session, entity_ids=entity_place_ids)
+
+        m = mocker.patch.object(service, "_watch_entity_geo_query", return_value=["record"])
+
+        struct_matches = service.call()
+
+        # entity has no location, geofence is matched without a graph query
+        m.assert_not_called()
+
+        assert struct_matches.code == 0
+        assert struct_matches.count == 0
@@ -0,0 +1,73 @@
+import test
+
+import pytest
+import sqlmodel
+import ulid
+
+import services.entities
+import services.entity_watches
+
+
+class TestWatchMatchBatch:
+    @pytest.fixture()
+    def entity_ids(self, session: sqlmodel.Session):
+        entities = [
+            test.EntityFactory.build(entity_id=ulid.new().str, entity_name="person"),
+            test.EntityFactory.build(entity_id=ulid.new().str, entity_name="case", name="case 1", slug="jacket_id", type_value="1"),
+        ]
+
+        struct_create = services.entities.Create(db=session, entities=entities).call()
+
+        assert struct_create.code == 0
+
+        yield struct_create.ids
+
+        services.entities.delete_by_id(db=session, ids=struct_create.ids)  # type: ignore
+
+    @pytest.fixture()
+    def watch_ids(self, session: sqlmodel.Session):
+        objects = [
+            {
+                "message": "any",
+                "output": "any",
+                "query": "entity_name:person",
+                "topic": "topic",
+            }
+        ]
+
+        struct_watches = services.entity_watches.Create(db=session, objects=objects).call()
+
+        assert struct_watches.code == 0
+
+        yield struct_watches.ids
+
+        services.entity_watches.delete_by_id(db=session, ids=struct_watches.ids)
+
+    def test_match_batch(self, session: sqlmodel.Session, watch_ids: list[int], entity_ids: list[int]):
+        person_id, case_id = entity_ids
+
+        # duplicate and missing entity ids are ignored
+        struct_matches = services.entity_watches.MatchBatch(db=session, entity_ids=[person_id, case_id, person_id, 0], topic="topic").call()
+
+        assert struct_matches.code == 0
+        assert struct_matches.count == 1
+        assert list(struct_matches.watches.keys()) == [str(person_id), str(case_id)]
+        assert [watch.id for watch in struct_matches.watches[str(person_id)]] == watch_ids
+        assert struct_matches.watches[str(case_id)] == []
+
+        # with topic nomatch
+        struct_matches = services.entity_watches.MatchBatch(db=session, entity_ids=[person_id, case_id], topic="bogus").call()
+
+        assert struct_matches.code == 0
+        assert struct_matches.count == 0
+
+    def test_match_batch_entity_id(self, session: sqlmodel.Session, watch_ids: list[int], entity_ids: list[int]):
+        entities = services.entities.get_all_by_ids(db=session, ids=entity_ids)  # type: ignore
+
+        person = [entity for entity in entities if entity.entity_name == "person"][0]
+
+        # entity ids are matched the same as entity object ids
+        struct_matches = services.entity_watches.MatchBatch(db=session, entity_ids=[person.entity_id], topic="topic").call()
+
+        assert struct_matches.count == 1
+        assert [watch.id for watch in struct_matches.watches[person.entity_id]] == watch_ids
@@ -0,0 +1,65 @@
+import test
+
+import sqlmodel
+
+import models
+import services.entity_watches
+import services.entity_watches.matcher
+
+
+def test_watch_compile():
+    compiled = services.entity_watches.matcher.watch_compile(
+        watch=models.EntityWatch(
+            message="any",
+            output="",
+            query="entity_name:person|place name:~^case slug:id,name geofence:41.8911752,-87.6321491,2mi",
+            topic="test",
+        )
+    )
+
+    assert [(predicate.field, predicate.op) for predicate in compiled.predicates] == [
+        ("entity_name", "in"),
+        ("name", "regex"),
+        ("slug", "in"),
+    ]
+    assert compiled.geo
+    assert len(compiled.geofences) == 1
+    assert round(compiled.geofences[0].meters) == 3219
+
+
+def test_matcher(session: sqlmodel.Session):
+    objects = [{"message": f"person {index}", "output": "", "query": f"entity_name:person name:name-{index}", "topic": "test"} for index in range(100)]
+    objects += [
+        {"message": "all", "output": "", "query": "", "topic": "test"},
+        {"message": "regex", "output": "", "query": "name:~^name-1", "topic": "test"},
+        {"message": "other", "output": "", "query": "entity_name:person", "topic": "other"},
+        {"message": "geo", "output": "", "query": "geofence:41.8911752,-87.6321491,2mi", "topic": "test"},
+    ]
+
+    struct_watches = services.entity_watches.Create(db=session, objects=objects).call()
+
+    assert struct_watches.code == 0
+
+    try:
+        matcher = services.entity_watches.matcher.Matcher()
+
+        entity = test.EntityFactory.build(entity_name="person", name="name-10")
+
+        compiled_watches = matcher.match(db=session, entities=[entity], topic="test")
+
+        assert [compiled.watch.message for compiled in compiled_watches] == ["person 10", "all", "regex", "geo"]
+
+        compiled_watches = matcher.match(db=session, entities=[entity])
+
+        assert [compiled.watch.message for compiled in compiled_watches] == ["person 10", "all", "regex", "other", "geo"]
+
+        # geo watches matched with geo index
+        compiled_watches = matcher.match(db=session, entities=[entity], topic="test", geo_index=True, point=(41.8850, -87.6300))
+
+        assert [compiled.watch.message for compiled in compiled_watches] == ["person 10", "all", "regex", "geo"]
+
+        compiled_watches = matcher.match(db=session, entities=[entity], topic="test", geo_index=True, point=None)
+
+        assert [compiled.watch.message for compiled in compiled_watches] == ["person 10", "all", "regex"]
+    finally:
+        services.entity_watches.delete_by_id(db=session, ids=struct_watches.ids)
@@ -0,0 +1,124 @@
+import test
+
+import neo4j
+import sqlmodel
+import ulid
+
+import models
+import services.entities
+import services.graph.operators
+import services.graph.operators.graph_sync_bulk
+
+
+def test_graph_sync_bulk_plan(session: sqlmodel.Session):
+    entity_id = ulid.new().str
+
+    entities = [
+        test.EntityFactory.build(entity_id=entity_id, entity_name="person", name="person 1", node=1, slug="id", type_value=entity_id, version=0),
+        test.EntityFactory.build(entity_id=entity_id, entity_name="person", name="person 1", node=1, slug="email", type_value="p1@gmail.com", version=0),
+        test.EntityFactory.build(entity_id=entity_id, entity_name="person", name="person 1", node=0, slug="city", type_value="chicago", version=0),
+    ]
+
+    data_link = models.DataLink(src_name="person", src_slug="email", dst_name="case", dst_slug="email")
+
+    service = services.graph.operators.GraphSyncBulk(db=session, neo=None, entity_ids=[entity_id, entity_id])  # type: ignore
+
+    plan = service._plan(entities=entities, data_links={("person", "email"): [data_link]})
+
+    assert plan.entity_ids == [entity_id]
+    assert plan.nodes_entity == {"person": [{"id": entity_id, "name": "person 1", "version": 0}]}
+    assert plan.nodes_property == [{"id": "email:p1@gmail.com"}]
+    assert plan.nodes_link == [{"id": "case_email:person_email:p1@gmail.com"}]
+    assert len(plan.edges_has["person"]) == 2
+    assert plan.edges_linked == {"person": [{"src_id": entity_id, "dst_id": "case_email:person_email:p1@gmail.com"}]}
+    assert plan.props_active[entity_id] == {f"id:{entity_id}", "email:p1@gmail.com", "city:chicago"}
+
+
+def test_graph_sync_bulk_plan_batch():
+    entity_id_1, entity_id_2, entity_id_3 = ulid.new().str, ulid.new().str, ulid.new().str
+
+    entities = [
+        test.EntityFactory.build(entity_id=entity_id_1, entity_name="person", name="person 1", node=1, slug="id", type_value=entity_id_1, version=0),
+        test.EntityFactory.build(entity_id=entity_id_1, entity_name="person", name="person 1", node=1, slug="email", type_value="p1@gmail.com", version=0),
+        test.EntityFactory.build(entity_id=entity_id_2, entity_name="person", name="person 2", node=1, slug="id", type_value=entity_id_2, version=1),
+        test.EntityFactory.build(entity_id=entity_id_2, entity_name="person", name="person 2", node=1, slug="email", type_value="p2@gmail.com", version=1),
+        test.EntityFactory.build(entity_id=entity_id_3, entity_name="vehicle", name="vehicle 3", node=1, slug="id", type_value=entity_id_3, version=0),
+        test.EntityFactory.build(entity_id=entity_id_3, entity_name="vehicle", name="vehicle 3", node=1, slug="vin", type_value="vin-3", version=0),
+    ]
+
+    service = services.graph.operators.GraphSyncBulk(db=None, neo=None, entity_ids=[entity_id_1, entity_id_2, entity_id_3])  # type: ignore
+
+    plan = service._plan(entities=entities, data_links={})
+
+    # rows for all entities in batch are grouped by entity name
+    assert plan.entity_ids == [entity_id_1, entity_id_2, entity_id_3]
+    assert plan.nodes_entity == {
+        "person": [{"id": entity_id_1, "name": "person 1", "version": 0}, {"id": entity_id_2, "name": "person 2", "version": 1}],
+        "vehicle": [{"id": entity_id_3, "name": "vehicle 3", "version": 0}],
+    }
+    assert plan.nodes_property == [{"id": "email:p1@gmail.com"}, {"id": "email:p2@gmail.com"}, {"id": "vin:vin-3"}]
+    assert [row["src_id"] for row in plan.edges_has["person"]] == [entity_id_1, entity_id_1, entity_id_2, entity_id_2]
+    assert [row["src_id"] for row in plan.edges_has["vehicle"]] == [entity_id_3, entity_id_3]
+    assert plan.edges_linked == {}
+
+
+def test_graph_sync_bulk_tx(session: sqlmodel.Session, neo_session: neo4j.Session):
+    entity_id_1, entity_id_2 = ulid.new().str, ulid.new().str
+
+    entities = [
+        test.EntityFactory.build(entity_id=entity_id_1, entity_name="person", name="person 1", node=1, slug="id", state=models.entity.STATE_ACTIVE, type_value=entity_id_1),
+        test.EntityFactory.build(entity_id=entity_id_1, entity_name="person", name="person 1", node=1, slug="email", state=models.entity.STATE_ACTIVE, type_value="p1@gmail.com"),
+        test.EntityFactory.build(entity_id=entity_id_2, entity_name="person", name="person 2", node=1, slug="id", state=models.entity.STATE_ACTIVE, type_value=entity_id_2),
+        test.EntityFactory.build(entity_id=entity_id_2, entity_name="person", name="person 2", node=1, slug="email", state=models.entity.STATE_ACTIVE, type_value="p2@gmail.com"),
+    ]
+
+    struct_create = services.entities.Create(db=session, entities=entities).call()
+
+    assert struct_create.code == 0
+
+    struct = services.graph.operators.GraphSyncBulk(db=session, neo=neo_session, entity_ids=[entity_id_1, entity_id_2]).call()
+
+    # entity and property nodes, and entity 'has' property edges, for the whole batch
+    assert struct.code == 0
+    assert struct.nodes_created == 4
+    assert struct.edges_created == 2
+
+    records = list(neo_session.run("match (n:person:entity)-[:has]->(p:property) return n.id as id, p.id as property order by n.id"))
+
+    assert [(record["id"], record["property"]) for record in records] == sorted(
+        [(entity_id_1, "email:p1@gmail.com"), (entity_id_2, "email:p2@gmail.com")]
+    )
+
+    # sync is idempotent
+    struct = services.graph.operators.GraphSyncBulk(db=session, neo=neo_session, entity_ids=[entity_id_1, entity_id_2]).call()
+
+    assert struct.nodes_created == 0
+    assert struct.edges_created == 0
+    assert struct.edges_deleted == 0
+
+    # changed property edge is replaced, and the unconnected property node is pruned
+    entity_email = entities[1]
+    entity_email.type_value = "p1@yahoo.com"
+    session.add(entity_email)
+    session.commit()
+
+    struct = services.graph.operators.GraphSyncBulk(db=session, neo=neo_session, entity_ids=[entity_id_1]).call()
+
+    assert struct.nodes_created == 1
+    assert struct.edges_created == 1
+    assert struct.edges_deleted == 1
+    assert struct.nodes_deleted == 1
+
+    records = list(neo_session.run("match (n:person:entity {id: $id})-[:has]->(p:property) return p.id as property", {"id": entity_id_1}))
+
+    assert [record["property"] for record in records] == ["email:p1@yahoo.com"]
+
+    services.entities.delete_by_id(db=session, ids=struct_create.ids)  # type: ignore
+
+
+def test_graph_sync_bulk_link_deleted():
+    node_link_deleted = services.graph.operators.graph_sync_bulk._node_link_deleted
+
+    assert node_link_deleted(link_id="case_jacket_id:person_record_id:1000", entity_name="person", property="record_id:1000")
+    assert not node_link_deleted(link_id="case_jacket_id:person_record_id:1001", entity_name="person", property="record_id:1000")
+    assert not node_link_deleted(link_id="case_jacket_id:vehicle_vin:1000", entity_name="person", property="record_id:1000")
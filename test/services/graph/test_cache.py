@@ -0,0 +1,67 @@
+import services.graph
+import services.graph.cache
+import services.graph.query
+
+
+def test_query_cache():
+    cache = services.graph.cache.QueryCache(size=2)
+
+    query_1 = services.graph.query.match_neighbors(src_label="person", src_id="person-1", max_hops=1)
+    query_2 = services.graph.query.match_neighbors(src_label="person", src_id="person-2", max_hops=1)
+    query_3 = services.graph.query.match_neighbors(src_label="person", src_id="person-3", max_hops=1)
+
+    generation = services.graph.cache.generation()
+
+    assert cache.get(query_1) is None
+    assert cache.set(query_1, ["record-1"], generation=generation) == 0
+    assert cache.get(query_1) == ["record-1"]
+
+    # least recently used query is evicted
+    cache.set(query_2, ["record-2"], generation=generation)
+    cache.get(query_1)
+    cache.set(query_3, ["record-3"], generation=generation)
+
+    assert cache.get(query_2) is None
+    assert cache.get(query_1) == ["record-1"]
+
+    metrics = cache.metrics()
+
+    assert metrics.size == 2
+    assert metrics.hits == 3
+    assert metrics.misses == 2
+    assert metrics.evictions == 1
+
+    # graph writes invalidate cached results, results read before the write are not cached
+    assert services.graph.cache.generation_bump() == generation + 1
+
+    assert cache.get(query_1) is None
+    assert cache.set(query_1, ["record-1"], generation=generation) == 409
+    assert cache.get(query_1) is None
+
+
+def test_read_many_cache():
+    cache = services.graph.cache.QueryCache()
+
+    class Session:
+        def __init__(self):
+            self.reads = 0
+
+        def read_transaction(self, fn, query, params):
+            self.reads += 1
+            return [params["src_id"]]
+
+    neo = Session()
+
+    queries = [
+        services.graph.query.match_neighbors(src_label="person", src_id="person-1", max_hops=1),
+        services.graph.query.match_neighbors(src_label="person", src_id="person-2", max_hops=2),
+    ]
+
+    assert services.graph.read_many(queries, neo=neo, cache=cache) == [["person-1"], ["person-2"]]
+    assert services.graph.read_many(queries, neo=neo, cache=cache) == [["person-1"], ["person-2"]]
+    assert neo.reads == 2
+
+    services.graph.cache.generation_bump()
+
+    assert services.graph.read_many(queries[:1], neo=neo, cache=cache) == [["person-1"]]
+    assert neo.reads == 3
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import neo4j
+import pytest
+
+import services.graph
+import services.graph.query
+
+
+class Tx:
+    def run(self, query: str, params: dict):
+        if params.get("error"):
+            raise RuntimeError(f"query {params['index']} error")
+
+        # later queries complete first
+        time.sleep(params["delay"])
+
+        return [f"record-{params['index']}"]
+
+
+class Session:
+    """fake graph session for the session factory fan out tests, records the threads using it"""
+
+    def __init__(self):
+        self.closed = False
+        self.threads: set[int] = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.closed = True
+        return False
+
+    def read_transaction(self, func, *args):
+        self.threads.add(threading.get_ident())
+        return func(Tx(), *args)
+
+
+class SessionFactory:
+    def __init__(self):
+        self.sessions: list[Session] = []
+        self.lock = threading.Lock()
+
+    def __call__(self) -> Session:
+        session = Session()
+
+        with self.lock:
+            self.sessions.append(session)
+
+        return session
+
+
+def test_read_many_session_factory():
+    session_factory = SessionFactory()
+
+    queries = [services.graph.query.types.GraphQuery("match (node) return node", {"index": index, "delay": 0.05 * (3 - index)}) for index in range(3)]
+
+    results = services.graph.read_many(queries, session_factory=session_factory)
+
+    # results are in query order, not completion order
+    assert results == [["record-0"], ["record-1"], ["record-2"]]
+
+    # each query runs in its own session, on a pool thread, and the session is closed
+    assert len(session_factory.sessions) == 3
+    assert all(session.closed for session in session_factory.sessions)
+    assert all(len(session.threads) == 1 for session in session_factory.sessions)
+    assert threading.get_ident() not in set.union(*[session.threads for session in session_factory.sessions])
+
+
+def test_read_many_session_factory_exception():
+    session_factory = SessionFactory()
+
+    queries = [
+        services.graph.query.types.GraphQuery("match (node) return node", {"index": 0, "delay": 0.0}),
+        services.graph.query.types.GraphQuery("match (node) return node", {"index": 1, "delay": 0.0, "error": True}),
+    ]
+
+    with pytest.raises(RuntimeError, match="query 1 error"):
+        services.graph.read_many(queries, session_factory=session_factory)
+
+    assert all(session.closed for session in session_factory.sessions)
+
+
+def test_read_many_session(neo_session: neo4j.Session):
+    neo_session.run("create (n:person {name: 'person 1'}), (m:person {name: 'person 2'})").consume()
+
+    # nodes are matched by name
+    queries = [services.graph.query.match_node(id="person 1"), services.graph.query.match_node(id="person 2")]
+
+    # without a session factory, queries run sequentially on the session, results are in query order
+    results = services.graph.read_many(queries, neo=neo_session)
+
+    assert [[record["node"].get("name") for record in records] for records in results] == [["person 1"], ["person 2"]]
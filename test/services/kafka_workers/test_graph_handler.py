@@ -0,0 +1,138 @@
+import contextlib
+import dataclasses
+import json
+
+import pytest
+
+import kafka.producer
+import models
+import services.database.session
+import services.entity_watches
+import services.kafka.workers.graph_handler
+
+
+class Message:
+    def __init__(self, value: bytes):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+
+def _message(name: str, id: int) -> Message:
+    return Message(json.dumps({"name": name, "id": id}).encode("utf-8"))
+
+
+@pytest.fixture
+def geo_changed(monkeypatch):
+    """replace geo changed batch, records entity ids of each batch"""
+    batches: list[list[str]] = []
+
+    def _geo_changed_batch(self, entity_ids: list[str]) -> int:
+        batches.append(entity_ids)
+        return len(entity_ids)
+
+    monkeypatch.setattr(services.kafka.workers.graph_handler.GraphHandler, "_geo_changed_batch", _geo_changed_batch)
+
+    return batches
+
+
+@pytest.mark.asyncio
+async def test_graph_handler_call_batch(geo_changed):
+    handler = services.kafka.workers.graph_handler.GraphHandler()
+
+    msgs = [
+        _message("entity.geo.changed", 1),
+        _message("entity.geo.changed", 2),
+        _message("entity.changed", 3),
+        _message("entity.geo.changed", 1),
+    ]
+
+    struct = await handler.call_batch(msgs)  # type: ignore
+
+    assert struct.code == 0
+
+    # entity ids are deduplicated, ordered by latest message, and processed together
+    assert geo_changed == [["2", "1"]]
+
+
+@pytest.mark.asyncio
+async def test_graph_handler_call_batch_invalid(geo_changed):
+    handler = services.kafka.workers.graph_handler.GraphHandler()
+
+    # invalid message is 422, same as a single message, valid messages are still processed
+    struct = await handler.call_batch([_message("entity.geo.changed", 1), _message("bogus", 2)])  # type: ignore
+
+    assert struct.code == 422
+    assert struct.errors == ["invalid message"]
+    assert geo_changed == [["1"]]
+
+    # message decode exception is 500
+    struct = await handler.call_batch([Message(b"invalid"), _message("bogus", 2)])  # type: ignore
+
+    assert struct.code == 500
+    assert len(struct.errors) == 2
+
+
+@pytest.mark.asyncio
+async def test_graph_handler_call_batch_exception(monkeypatch):
+    def _geo_changed_batch(self, entity_ids: list[str]) -> int:
+        raise RuntimeError("publish flush timeout")
+
+    monkeypatch.setattr(services.kafka.workers.graph_handler.GraphHandler, "_geo_changed_batch", _geo_changed_batch)
+
+    handler = services.kafka.workers.graph_handler.GraphHandler()
+
+    struct = await handler.call_batch([_message("entity.geo.changed", 1)])  # type: ignore
+
+    assert struct.code == 500
+
+
+def test_graph_handler_geo_changed_batch(monkeypatch):
+    @dataclasses.dataclass
+    class Struct:
+        code: int
+        watches: dict
+        count: int
+
+    watch = models.EntityWatch(message="any", output="topic-out", query="", topic="topic")
+
+    publishes: list[tuple[list, list]] = []
+    flushes: list[int] = [0]
+
+    class MatchBatch:
+        def __init__(self, db, entity_ids: list[str], topic: str):
+            self._entity_ids = entity_ids
+
+        def call(self):
+            return Struct(0, {"1": [watch], "2": []}, 1)
+
+    class Publish:
+        def __init__(self, watches: list, entity_ids: list):
+            publishes.append((watches, entity_ids))
+            self._count = len(watches) * len(entity_ids)
+
+        def call(self):
+            return Struct(0, {}, self._count)
+
+    def _flush() -> int:
+        flushes[0] += 1
+        return 0
+
+    monkeypatch.setattr(services.database.session, "get", lambda: contextlib.nullcontext(None))
+    monkeypatch.setattr(services.entity_watches, "MatchBatch", MatchBatch)
+    monkeypatch.setattr(services.entity_watches, "Publish", Publish)
+    monkeypatch.setattr(kafka.producer, "flush", _flush)
+
+    handler = services.kafka.workers.graph_handler.GraphHandler()
+
+    assert handler._geo_changed_batch(["1", "2"]) == 1
+
+    # messages for the whole batch are flushed once
+    assert publishes == [([watch], ["1"]), ([], ["2"])]
+    assert flushes == [1]
+
+    monkeypatch.setattr(kafka.producer, "flush", lambda: 1)
+
+    with pytest.raises(RuntimeError):
+        handler._geo_changed_batch(["1"])
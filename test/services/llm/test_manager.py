@@ -0,0 +1,173 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class LlamaStub:
+    """llama_cpp.Llama stub, generations block while the release event is clear"""
+
+    loaded: list[str] = []
+    release = threading.Event()
+    streamed: list[str] = []
+    stream_closed = False
+
+    def __init__(self, model_path: str, **kwargs):
+        self.model_path = model_path
+        self.closed = False
+
+        LlamaStub.loaded.append(model_path)
+
+    def __call__(self, prompt: str, stream: bool = False, **kwargs):
+        LlamaStub.release.wait(timeout=5)
+
+        if stream:
+            return self._stream(prompt)
+
+        return {"choices": [{"text": f" {prompt} answer "}]}
+
+    def _stream(self, prompt: str):
+        try:
+            for i in range(100):
+                LlamaStub.streamed.append(f" {prompt} {i}")
+
+                yield {"choices": [{"text": f" {prompt} {i}"}]}
+
+                time.sleep(0.01)
+        finally:
+            LlamaStub.stream_closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    llama_cpp = types.ModuleType("llama_cpp")
+    llama_cpp.Llama = LlamaStub  # type: ignore
+
+    # llama_cpp is an optional dependency, the manager is tested with a stub
+    monkeypatch.setitem(sys.modules, "llama_cpp", llama_cpp)
+
+    import services.llm.manager
+
+    monkeypatch.setattr(services.llm.manager, "llama_cpp", llama_cpp)
+    monkeypatch.setattr(services.llm.manager, "_models", collections.OrderedDict())
+
+    LlamaStub.loaded.clear()
+    LlamaStub.release.set()
+    LlamaStub.streamed.clear()
+    LlamaStub.stream_closed = False
+
+    yield services.llm.manager
+
+    LlamaStub.release.set()
+
+    services.llm.manager.close_all()
+
+
+@pytest.fixture
+def model_paths(tmp_path):
+    paths = []
+
+    for name in ["model-1.gguf", "model-2.gguf"]:
+        path = tmp_path / name
+        path.write_bytes(b"0" * 600 * 1024)
+        paths.append(str(path))
+
+    return paths
+
+
+def test_manager_load_once(manager, model_paths):
+    struct_1 = manager.generate(path=model_paths[0], prompt="q1")
+    struct_2 = manager.generate(path=model_paths[0], prompt="q2")
+
+    assert struct_1.code == 0
+    assert struct_1.text == "q1 answer"
+    assert struct_2.code == 0
+    assert struct_2.text == "q2 answer"
+
+    # model is loaded on first use and reused
+    assert LlamaStub.loaded == [model_paths[0]]
+
+    [metrics] = manager.metrics()
+
+    assert metrics.loaded
+    assert metrics.generations == 2
+    assert metrics.pending == 0
+
+
+def test_manager_budget_unload(manager, model_paths, monkeypatch):
+    # budget fits one model
+    monkeypatch.setenv("LLM_MEMORY_BUDGET_MB", "1")
+
+    assert manager.generate(path=model_paths[0], prompt="q1").code == 0
+
+    llm_1 = manager._models[model_paths[0]].llm
+
+    assert manager.generate(path=model_paths[1], prompt="q2").code == 0
+
+    # least recently used idle model is unloaded
+    assert llm_1.closed
+    assert [metrics.loaded for metrics in manager.metrics()] == [False, True]
+
+    assert manager.generate(path=model_paths[0], prompt="q3").code == 0
+
+    assert LlamaStub.loaded == [model_paths[0], model_paths[1], model_paths[0]]
+    assert [metrics.loaded for metrics in manager.metrics()] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_manager_queue_full(manager, model_paths, monkeypatch):
+    monkeypatch.setenv("LLM_QUEUE_MAX", "2")
+
+    LlamaStub.release.clear()
+
+    # first generation runs and blocks, second is queued on the model executor
+    tasks = [asyncio.create_task(manager.generate_async(path=model_paths[0], prompt=f"q{i}")) for i in range(2)]
+
+    await asyncio.sleep(0)
+
+    struct = await manager.generate_async(path=model_paths[0], prompt="q3")
+
+    assert struct.code == 429
+    assert struct.errors == ["model 'model-1.gguf' queue full"]
+
+    LlamaStub.release.set()
+
+    structs = await asyncio.gather(*tasks)
+
+    assert [struct.code for struct in structs] == [0, 0]
+    assert manager.metrics()[0].pending == 0
+
+    # queue slots are released
+    assert (await manager.generate_async(path=model_paths[0], prompt="q4")).code == 0
+
+
+@pytest.mark.asyncio
+async def test_manager_stream_cancel(manager, model_paths):
+    stream = manager.generate_stream(path=model_paths[0], prompt="q1")
+
+    tokens = [await anext(stream) for _ in range(2)]
+
+    assert tokens == [" q1 0", " q1 1"]
+
+    # closing the iterator, e.g. client disconnect, stops generation and waits for it to stop
+    await stream.aclose()
+
+    assert LlamaStub.stream_closed
+    assert len(LlamaStub.streamed) < 100
+    assert manager.metrics()[0].pending == 0
+
+    streamed = len(LlamaStub.streamed)
+
+    await asyncio.sleep(0.05)
+
+    assert len(LlamaStub.streamed) == streamed
+
+    # model executor is free for the next generation
+    assert (await manager.generate_async(path=model_paths[0], prompt="q2")).code == 0
@@ -0,0 +1,65 @@
+import sqlmodel
+
+import models
+import services.mql
+
+schema = services.mql.Schema(
+    model=models.Entity,
+    fields={
+        "id": services.mql.Field(models.Entity.id, ops=services.mql.OPS_RANGE, cast=int),
+        "entity_id": services.mql.Field(models.Entity.entity_id, ops=services.mql.OPS_LIKE_IN),
+        "name": services.mql.Field(models.Entity.name, ops=services.mql.OPS_LIKE),
+        "entity_key": services.mql.Field(models.Entity.entity_key, ops=services.mql.OPS_LIKE),
+        "node": services.mql.Field(models.Entity.node, cast=int),
+        "tags": services.mql.Field(models.Entity.tags, ops=services.mql.OPS_TAGS),
+    },
+    name="test_entity",
+)
+
+
+def test_mql_compile_terms():
+    struct_compile = services.mql.Compile(schema=schema, query="entity_id:a|b name:~foo node:1 tags:red").call()
+
+    assert struct_compile.code == 0
+    assert [(term.field, term.op) for term in struct_compile.terms] == [("entity_id", "in"), ("name", "like"), ("node", "eq"), ("tags", "tags")]
+    assert struct_compile.params == {"p_0": ["a", "b"], "p_1": "%foo%", "p_2": 1, "p_3": "%|red|%"}
+    assert struct_compile.errors == []
+
+
+def test_mql_compile_invalid():
+    # unknown fields, unsupported ops and invalid values match no rows, ops fall back to an equality match if supported
+    struct_compile = services.mql.Compile(schema=schema, query="bogus:1 node:<5 id:5 name:a|b").call()
+
+    assert struct_compile.code == 422
+    assert [(term.field, term.op) for term in struct_compile.terms] == [("bogus", "false"), ("node", "false"), ("id", "false"), ("name", "eq")]
+    assert struct_compile.params == {"p_3": "a|b"}
+    assert struct_compile.errors == ["invalid field 'bogus'", "invalid value '<5' for field 'node'", "invalid op 'eq' for field 'id'"]
+
+
+def test_mql_compile_invalid_rows():
+    engine = sqlmodel.create_engine("sqlite://")
+    models.Entity.__table__.create(engine)
+
+    with sqlmodel.Session(engine) as db:
+        db.add(
+            models.Entity(
+                entity_id="1", entity_key="a|b", entity_name="person", fingerprint="", name="person 1", node=1, slug="id", state="active", type_name="string", version=0
+            )
+        )
+        db.commit()
+
+        for query, count in [("node:1", 1), ("entity_key:a|b", 1), ("node:abc", 0), ("bogus:1", 0), ("node:1 id:1", 0)]:
+            struct_compile = services.mql.Compile(schema=schema, query=query).call()
+
+            # invalid terms never widen the query
+            assert len(db.exec(struct_compile.dataset, params=struct_compile.params).all()) == count, query
+
+
+def test_mql_compile_cache():
+    struct_1 = services.mql.Compile(schema=schema, query="name:~foo").call()
+    struct_2 = services.mql.Compile(schema=schema, query="name:~bar").call()
+    struct_3 = services.mql.Compile(schema=schema, query="name:bar").call()
+
+    assert struct_1.dataset is struct_2.dataset
+    assert struct_1.dataset is not struct_3.dataset
+    assert struct_2.params == {"p_0": "%bar%"}
@@ -0,0 +1,78 @@
+import neo4j
+import pytest
+
+import services.nodes.list
+
+
+def test_nodes_list_cursor():
+    cursor = services.nodes.list.cursor_encode(1001)
+
+    assert services.nodes.list.cursor_decode(cursor) == 1001
+
+    for cursor in ["", "invalid", services.nodes.list.cursor_encode(1001).replace("bm9k", "ZWRn")]:
+        with pytest.raises(ValueError):
+            services.nodes.list.cursor_decode(cursor)
+
+
+@pytest.fixture()
+def graph_nodes(neo_session: neo4j.Session):
+    """person nodes 'person 1' to 'person 6', created in name order, and edges between them"""
+    names = [f"person {index}" for index in range(1, 7)]
+
+    for name in names:
+        neo_session.run("create (n:person {id: $id, name: $name})", {"id": name.replace(" ", "-"), "name": name}).consume()
+
+    for src, dst in [(1, 2), (2, 3), (1, 5), (4, 5), (5, 6), (3, 6)]:
+        neo_session.run(
+            "match (a:person {name: $src}), (b:person {name: $dst}) create (a)-[:linked]->(b)",
+            {"src": f"person {src}", "dst": f"person {dst}"},
+        ).consume()
+
+    yield names
+
+
+def test_nodes_list_page(neo_session: neo4j.Session, graph_nodes: list[str]):
+    pages = []
+    cursor = ""
+
+    while True:
+        struct = services.nodes.list.List(db=None, neo=neo_session, query="", limit=2, cursor=cursor).call()  # type: ignore
+
+        assert struct.code == 0
+
+        pages.append(struct)
+
+        if not struct.page_info.has_next_page:
+            break
+
+        cursor = struct.page_info.end_cursor
+
+    names = {node.nid: node.name for struct in pages for node in struct.nodes}
+
+    # last page has exactly limit nodes, so there is no next page
+    assert [[node.name for node in struct.nodes] for struct in pages] == [["person 1", "person 2"], ["person 3", "person 4"], ["person 5", "person 6"]]
+    assert [struct.page_info.has_next_page for struct in pages] == [True, True, False]
+
+    # end cursor is the last node id of each page
+    assert [services.nodes.list.cursor_decode(struct.page_info.end_cursor) for struct in pages] == [
+        max(int(node.nid) for node in struct.nodes) for struct in pages
+    ]
+
+    # each edge is returned once, with the page of its highest endpoint
+    edges_page = [sorted(sorted([names[edge.src_nid][-1], names[edge.tgt_nid][-1]]) for edge in struct.edges) for struct in pages]
+
+    assert edges_page == [[["1", "2"]], [["2", "3"]], [["1", "5"], ["3", "6"], ["4", "5"], ["5", "6"]]]
+
+    # page after the last node is empty
+    struct = services.nodes.list.List(db=None, neo=neo_session, query="", limit=2, cursor=pages[-1].page_info.end_cursor).call()  # type: ignore
+
+    assert struct.nodes == []
+    assert struct.page_info == services.nodes.list.PageInfo(None, False)
+
+
+def test_nodes_list_page_offset(neo_session: neo4j.Session, graph_nodes: list[str]):
+    struct = services.nodes.list.List(db=None, neo=neo_session, query="", offset=1, limit=1).call()  # type: ignore
+
+    assert [node.name for node in struct.nodes] == ["person 2"]
+    assert struct.page_info.has_next_page
+    assert services.nodes.list.cursor_decode(struct.page_info.end_cursor) == int(struct.nodes[0].nid)
@@ -0,0 +1,47 @@
+import sqlmodel
+
+import services.entities
+import services.entity_locations
+import services.timely.flows
+
+
+def test_entity_db_sync_batch_locations(session: sqlmodel.Session):
+    objects = [
+        # entity set without a location, before entity sets with locations
+        {"person.email": [{"value": "user-1@gmail.com", "type": "string", "pk": 1}]},
+        {
+            "person.email": [{"value": "user-2@gmail.com", "type": "string", "pk": 1}],
+            "person.lat": [{"value": "41.8911752", "type": "string"}],
+            "person.lon": [{"value": "-87.6321491", "type": "string"}],
+        },
+        {"person.email": [{"value": "user-3@gmail.com", "type": "string", "pk": 1}]},
+        {
+            "person.email": [{"value": "user-4@gmail.com", "type": "string", "pk": 1}],
+            "person.lat": [{"value": "40.7128", "type": "string"}],
+            "person.lon": [{"value": "-74.0060", "type": "string"}],
+        },
+    ]
+
+    flow = services.timely.flows.EntityDbSync(input=[], db=session)
+
+    results = flow._entity_sync_batch(objects=objects)
+
+    assert [result["code"] for result in results] == [201, 201, 201, 201]
+
+    entity_ids = [result["entity_id"] for result in results]
+
+    # each entity set with a location gets one, entity sets without a location are skipped
+    entity_locations = services.entity_locations.get_all_by_entity_ids(db=session, ids=entity_ids)
+
+    assert sorted(entity_location.entity_id for entity_location in entity_locations) == sorted([entity_ids[1], entity_ids[3]])
+
+    entities = services.entities.get_all_by_ids(db=session, ids=entity_ids)  # type: ignore
+
+    assert set(entity.entity_id for entity in entities) == set(entity_ids)
+
+    for entity_location in entity_locations:
+        session.delete(entity_location)
+
+    session.commit()
+
+    services.entities.delete_by_id(db=session, ids=[entity.id for entity in entities])  # type: ignore
@@ -0,0 +1,103 @@
+import json
+
+import services.timely.inputs
+
+
+def test_input_csv_partition():
+    csv_file = "./test/data/data_streams/user_1.csv"
+
+    rows = [row for _, row in services.timely.inputs.input_csv(file=csv_file)(0, 1, None)]
+
+    assert [row["email"] for row in rows] == ["user1@gmail.com", "user2@gmail.com", "user3@gmail.com"]
+
+    # each row is read by exactly one worker, in file order
+    for workers_count in [2, 3, 4, 8]:
+        rows_workers = []
+
+        for worker_index in range(workers_count):
+            rows_workers += [row for _, row in services.timely.inputs.input_csv(file=csv_file)(worker_index, workers_count, None)]
+
+        assert rows_workers == rows
+
+
+def test_input_jsonl_partition(tmp_path):
+    jsonl_file = tmp_path / "entities.jsonl"
+    objects = [{"model": "person", "name": f"User {i}", "properties": []} for i in range(100)]
+
+    jsonl_file.write_text("\n".join(json.dumps(object) for object in objects) + "\n")
+
+    for workers_count in [1, 2, 3, 7]:
+        objects_workers = []
+
+        for worker_index in range(workers_count):
+            objects_worker = [object for _, object in services.timely.inputs.input_json(file=str(jsonl_file))(worker_index, workers_count, None)]
+
+            # workers read line ranges of about the same size
+            assert abs(len(objects_worker) - len(objects) / workers_count) <= 2
+
+            objects_workers += objects_worker
+
+        assert objects_workers == objects
+
+
+def test_input_resume(tmp_path):
+    jsonl_file = tmp_path / "entities.jsonl"
+    objects = [{"model": "person", "name": f"User {i}", "properties": []} for i in range(100)]
+
+    jsonl_file.write_text("\n".join(json.dumps(object) for object in objects) + "\n")
+
+    for workers_count in [1, 3]:
+        for worker_index in range(workers_count):
+            states_objects = list(services.timely.inputs.input_json(file=str(jsonl_file))(worker_index, workers_count, None))
+
+            # a worker resumed from a saved input state continues with the next object
+            for state, _ in states_objects[:-1]:
+                objects_resumed = [object for _, object in services.timely.inputs.input_json(file=str(jsonl_file))(worker_index, workers_count, state)]
+
+                assert objects_resumed == [object for state_, object in states_objects if state_ > state]
+
+
+def test_input_csv_resume(tmp_path):
+    csv_file = tmp_path / "users.csv"
+
+    csv_file.write_text("Name,Email,Record_Id\n" + "".join(f"User {i},user{i}@gmail.com,{i}\n" for i in range(50)))
+
+    for workers_count in [1, 3]:
+        for worker_index in range(workers_count):
+            states_rows = list(services.timely.inputs.input_csv(file=str(csv_file))(worker_index, workers_count, None))
+
+            # a worker resumed from a saved input state continues with the next row
+            for index, (state, _) in enumerate(states_rows):
+                assert list(services.timely.inputs.input_csv(file=str(csv_file))(worker_index, workers_count, state)) == states_rows[index + 1:]
+
+
+def test_input_csv_resume_quoted(tmp_path):
+    csv_file = tmp_path / "users.csv"
+
+    csv_file.write_text('Name,Email,Record_Id\nUser 1,user1@gmail.com,1\n"User\n2",user2@gmail.com,2\nUser 3,user3@gmail.com,3\n')
+
+    states_rows = list(services.timely.inputs.input_csv(file=str(csv_file))(0, 1, None))
+
+    assert [row["name"] for _, row in states_rows] == ["User 1", "User\n2", "User 3"]
+
+    # state after a row spanning lines is the offset after its last line
+    for index, (state, _) in enumerate(states_rows):
+        assert list(services.timely.inputs.input_csv(file=str(csv_file))(0, 1, state)) == states_rows[index + 1:]
+
+
+def test_input_csv_random_resume(tmp_path):
+    csv_file = tmp_path / "users.csv"
+
+    csv_file.write_text("Name,Email,Record_Id\n" + "".join(f"User {i},user{i}@gmail.com,{i}\n" for i in range(6)))
+
+    services.timely.inputs.input_csv_random_params(file=str(csv_file), count=4)
+
+    for workers_count in [1, 2]:
+        for worker_index in range(workers_count):
+            states_rows = list(services.timely.inputs.input_csv_random_generator(worker_index, workers_count, None))
+
+            assert len(states_rows) == 6 // workers_count * 4
+
+            # a worker resumed from a saved input state continues with the next random row, of the same or next template
+            for index, (state, _) in enumerate(states_rows):
+                assert list(services.timely.inputs.input_csv_random_generator(worker_index, workers_count, state)) == states_rows[index + 1:]
@@ -0,0 +1,83 @@
+import datetime
+
+import sqlmodel
+
+import models
+import services.work_queue
+
+
+def test_work_queue_claim(session: sqlmodel.Session):
+    for i in range(3):
+        assert services.work_queue.add(db_session=session, queue="test-claim", partition=0, msg="test", data={"i": i}) == 0
+
+    # other queue partition is never claimed
+    assert services.work_queue.add(db_session=session, queue="test-claim", partition=1, msg="test", data={}) == 0
+
+    work_objects_1 = services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2)
+
+    assert [work_object.data["i"] for work_object in work_objects_1] == [0, 1]
+    assert {work_object.state for work_object in work_objects_1} == {models.work_queue.STATE_PROCESSING}
+    assert {work_object.attempts for work_object in work_objects_1} == {1}
+    assert all(work_object.lease_expires_at for work_object in work_objects_1)
+
+    # claimed work objects are skipped by the next claim
+    work_objects_2 = services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2)
+
+    assert [work_object.data["i"] for work_object in work_objects_2] == [2]
+
+    work_objects_3 = services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2)
+
+    assert work_objects_3 == []
+
+
+def test_work_queue_claim_lease_expired(session: sqlmodel.Session):
+    for i in range(2):
+        assert services.work_queue.add(db_session=session, queue="test-claim", partition=0, msg="test", data={"i": i}) == 0
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2, retry_max=2)
+
+    assert [work_object.attempts for work_object in work_objects] == [1, 1]
+
+    # leased work objects are not reclaimed
+    assert services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2, retry_max=2) == []
+
+    # expire leases, e.g. crashed worker, the work object at retry_max attempts is marked as error
+    time_expired = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=60)
+
+    for work_object, attempts in zip(work_objects, [1, 2]):
+        work_object.attempts = attempts
+        work_object.lease_expires_at = time_expired
+        session.add(work_object)
+
+    session.commit()
+
+    work_objects_reclaimed = services.work_queue.claim(db_session=session, queue="test-claim", partition=0, limit=2, retry_max=2)
+
+    assert [work_object.id for work_object in work_objects_reclaimed] == [work_objects[0].id]
+    assert work_objects_reclaimed[0].attempts == 2
+
+    work_object_error = session.get(models.WorkQueue, work_objects[1].id)
+    session.refresh(work_object_error)
+
+    assert work_object_error.state == models.work_queue.STATE_ERROR
+    assert work_object_error.completed_at
+    assert work_object_error.lease_expires_at is None
+
+
+def test_work_queue_claim_retry_backoff(session: sqlmodel.Session):
+    assert services.work_queue.add(db_session=session, queue="test-claim", partition=0, msg="test", data={}) == 0
+
+    work_object = services.work_queue.claim(db_session=session, queue="test-claim", partition=0)[0]
+
+    assert services.work_queue.state_retry(db_session=session, work_object=work_object, retry_max=3, backoff=60) == 0
+
+    # queued work object is skipped until its backoff has passed
+    assert services.work_queue.claim(db_session=session, queue="test-claim", partition=0) == []
+
+    work_object.available_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+    session.add(work_object)
+    session.commit()
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-claim", partition=0)
+
+    assert [work_object.attempts for work_object in work_objects] == [2]
@@ -0,0 +1,36 @@
+import time
+
+import sqlmodel
+
+import models
+import services.work_queue
+
+
+def test_work_queue_gc(session: sqlmodel.Session):
+    for i in range(6):
+        assert services.work_queue.add(db_session=session, queue="test-gc", partition=0, msg="test", data={"i": i}) == 0
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-gc", partition=0, limit=6)
+    work_object_ids = [work_object.id for work_object in work_objects]
+
+    report = services.work_queue.state_bulk(db_session=session, ids=work_object_ids[0:5], state=models.work_queue.STATE_COMPLETED)
+
+    assert report.count == 5
+
+    # no work objects completed before a day ago
+    report = services.work_queue.gc(db_session=session, queue="test-gc", completed_before=int(time.time()) - 86400, chunk=2)
+
+    assert report.code == 0
+    assert report.count == 0
+    assert report.chunks == 1
+
+    report = services.work_queue.gc(db_session=session, queue="test-gc", completed_before=int(time.time()) + 86400, chunk=2)
+
+    assert report.code == 0
+    assert report.count == 5
+    assert report.chunks == 3
+
+    # processing work object is not collected
+    work_objects_left = session.exec(sqlmodel.select(models.WorkQueue).where(models.WorkQueue.name == "test-gc")).all()
+
+    assert [work_object.id for work_object in work_objects_left] == work_object_ids[5:]
@@ -0,0 +1,26 @@
+import sqlmodel
+
+import models
+import services.work_queue
+
+
+def test_work_queue_lease_extend(session: sqlmodel.Session):
+    for i in range(2):
+        assert services.work_queue.add(db_session=session, queue="test-lease", partition=0, msg="test", data={"i": i}) == 0
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-lease", partition=0, limit=2, lease=10)
+    work_object_ids = [work_object.id for work_object in work_objects]
+
+    leases = [work_object.lease_expires_at for work_object in work_objects]
+
+    # completed work objects are not extended
+    assert services.work_queue.state_completed(db_session=session, work_object=work_objects[1]) == 0
+
+    assert services.work_queue.lease_extend(db_session=session, ids=work_object_ids, lease=600) == 1
+
+    work_object_extended = session.get(models.WorkQueue, work_object_ids[0])
+    session.refresh(work_object_extended)
+
+    assert work_object_extended.lease_expires_at > leases[0]
+
+    assert services.work_queue.lease_extend(db_session=session, ids=[], lease=600) == 0
@@ -0,0 +1,69 @@
+import sqlmodel
+
+import models
+import services.work_queue
+
+
+def test_work_queue_state_retry(session: sqlmodel.Session):
+    for i in range(3):
+        assert services.work_queue.add(db_session=session, queue="test-update", partition=0, msg="test", data={"i": i}) == 0
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-update", partition=0, limit=3)
+
+    for work_object, attempts in zip(work_objects, [1, 3, 5]):
+        work_object.attempts = attempts
+        session.add(work_object)
+
+    session.commit()
+
+    for work_object in work_objects:
+        assert services.work_queue.state_retry(db_session=session, work_object=work_object, retry_max=5, backoff=60) == 0
+
+    for work_object in work_objects:
+        session.refresh(work_object)
+
+    # retried work objects are queued with exponential backoff, backoff * 2 ** (attempts - 1)
+    assert [work_object.state for work_object in work_objects[0:2]] == [models.work_queue.STATE_QUEUED] * 2
+    assert [work_object.lease_expires_at for work_object in work_objects[0:2]] == [None, None]
+    assert [work_object.processing_at for work_object in work_objects[0:2]] == [None, None]
+
+    backoff_delta = (work_objects[1].available_at - work_objects[0].available_at).total_seconds()
+
+    assert 180 - 5 < backoff_delta < 180 + 5
+
+    # work object with retry_max attempts is marked as error
+    assert work_objects[2].state == models.work_queue.STATE_ERROR
+    assert work_objects[2].completed_at
+
+
+def test_work_queue_state_bulk(session: sqlmodel.Session):
+    for i in range(5):
+        assert services.work_queue.add(db_session=session, queue="test-update", partition=0, msg="test", data={"i": i}) == 0
+
+    work_objects = services.work_queue.claim(db_session=session, queue="test-update", partition=0, limit=5)
+    work_object_ids = [work_object.id for work_object in work_objects]
+
+    report = services.work_queue.state_bulk(db_session=session, ids=work_object_ids, state=models.work_queue.STATE_COMPLETED, chunk=2)
+
+    assert report.code == 0
+    assert report.count == 5
+    assert report.chunks == 3
+
+    # work objects already in state are not updated
+    report = services.work_queue.state_bulk(db_session=session, ids=work_object_ids, state=models.work_queue.STATE_COMPLETED, chunk=2)
+
+    assert report.code == 0
+    assert report.count == 0
+
+    report = services.work_queue.state_bulk(db_session=session, ids=work_object_ids[0:2], state=models.work_queue.STATE_QUEUED)
+
+    assert report.code == 0
+    assert report.count == 2
+    assert report.chunks == 1
+
+    for work_object in work_objects:
+        session.refresh(work_object)
+
+    assert [work_object.state for work_object in work_objects] == [models.work_queue.STATE_QUEUED] * 2 + [models.work_queue.STATE_COMPLETED] * 3
+    assert all(work_object.completed_at for work_object in work_objects)
+    assert [work_object.lease_expires_at is None for work_object in work_objects] == [True, True, False, False, False]
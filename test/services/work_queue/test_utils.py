@@ -0,0 +1,38 @@
+import sqlmodel
+
+import models
+import services.work_queue
+
+
+def test_work_queue_cleanup(session: sqlmodel.Session):
+    for i in range(5):
+        assert services.work_queue.add(db_session=session, queue="test-cleanup", partition=0, msg="test", data={"i": i}) == 0
+
+    # leased work objects, e.g. owned by a running worker
+    work_objects_leased = services.work_queue.claim(db_session=session, queue="test-cleanup", partition=0, limit=2)
+
+    # processing work objects without a lease, e.g. left by a worker shutdown
+    work_objects = session.exec(
+        sqlmodel.select(models.WorkQueue)
+            .where(models.WorkQueue.name == "test-cleanup")
+            .where(models.WorkQueue.state == models.work_queue.STATE_QUEUED)
+            .order_by(models.WorkQueue.id.asc())  # type: ignore
+    ).all()
+    work_object_ids = [work_object.id for work_object in work_objects]
+
+    report = services.work_queue.state_bulk(db_session=session, ids=work_object_ids, state=models.work_queue.STATE_PROCESSING)
+
+    assert report.count == 3
+
+    report = services.work_queue.cleanup(db_session=session, queue="test-cleanup", partition=0, chunk=2)
+
+    assert report.code == 0
+    assert report.count == 3
+    assert report.chunks == 2
+
+    for work_object in work_objects + work_objects_leased:
+        session.refresh(work_object)
+
+    assert [work_object.state for work_object in work_objects] == [models.work_queue.STATE_QUEUED] * 3
+    assert [work_object.processing_at for work_object in work_objects] == [None] * 3
+    assert [work_object.state for work_object in work_objects_leased] == [models.work_queue.STATE_PROCESSING] * 2